@@ -0,0 +1,142 @@
+"""
+이벤트 루프 지연 벤치마크
+큰 문서의 구조 파싱 → 페이지 캐시 저장 → 캐시 조회를 처리하는 동안
+같은 루프의 가벼운 작업(헬스 체크 수준)이 얼마나 늦어지는지 CPU 풀 방식별로 비교합니다.
+
+- inline: 기존 방식 (모든 작업을 루프 스레드에서 실행)
+- thread / process: CPU_OFFLOAD_MIN_SIZE 이상 작업을 풀에서 실행
+
+LoopMonitor 가 기록한 최대 지연과 정지 위치(샘플링한 코드 경로)도 함께 출력합니다.
+
+사용법 (backend 디렉터리에서):
+    python -m benchmarks.bench_loop_lag
+    python -m benchmarks.bench_loop_lag --sizes 5m,20m --kinds inline,process --output result.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from services.cache_service import CacheService, MemoryLRUCache  # noqa: E402
+from services.confluence_service import ConfluenceService  # noqa: E402
+from services.cpu_pool import get_cpu_pool, shutdown_cpu_pool  # noqa: E402
+from services.loop_monitor import LoopMonitor  # noqa: E402
+
+from .corpus import generate_plain_text  # noqa: E402
+from .micro_bench import _parse_size  # noqa: E402
+
+DEFAULT_SIZES = "1m,5m,20m"
+DEFAULT_KINDS = "inline,thread,process"
+PROBE_INTERVAL = 0.005
+
+
+async def _probe(stop: asyncio.Event, delays: List[float]) -> None:
+    """PROBE_INTERVAL 마다 깨어나는 가벼운 작업 - 예정보다 늦게 깨어난 시간 기록"""
+    while not stop.is_set():
+        expected = time.perf_counter() + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+        delays.append(max(0.0, time.perf_counter() - expected))
+
+
+async def _run_case(kind: str, text: str) -> Dict:
+    os.environ["CPU_POOL_KIND"] = kind
+    shutdown_cpu_pool()
+    pool = get_cpu_pool()
+    pool.start()
+    monitor = LoopMonitor()
+    monitor.enabled = True
+    monitor.start()
+
+    cache = CacheService(MemoryLRUCache(max_bytes=512 * 1024 * 1024))
+    service = ConfluenceService(cache_service=cache)
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        # 프로세스 풀 기동/첫 호출 비용은 측정에서 제외
+        await service._parse_snapshot(text[: pool.min_size], "0", 1, "warmup")
+        await asyncio.sleep(0.5)
+
+        stop = asyncio.Event()
+        delays: List[float] = []
+        probe = asyncio.create_task(_probe(stop, delays))
+        await asyncio.sleep(0.05)
+
+        started_at = time.perf_counter()
+        snapshot = await service._parse_snapshot(text, "1", 1, "루프 지연 벤치마크")
+        await service._cache_snapshot("bench:1", snapshot, "")
+        cached = await cache.get_json("page", "bench:1")
+        elapsed = time.perf_counter() - started_at
+
+        await asyncio.sleep(0.1)
+        stop.set()
+        await probe
+    await monitor.aclose()
+    await service.aclose()
+    await cache.aclose()
+    assert cached["text"] == text
+
+    report = monitor.get_report()
+    delays.sort()
+    return {
+        "kind": pool.kind,
+        "chars": len(text),
+        "sections": len(snapshot),
+        "ms": round(elapsed * 1000, 1),
+        "probe_max_ms": round(delays[-1] * 1000, 1) if delays else 0.0,
+        "probe_p99_ms": (
+            round(delays[int(len(delays) * 0.99)] * 1000, 1) if delays else 0.0
+        ),
+        "loop_max_lag_ms": report["max_lag_ms"],
+        "stall_paths": [stall["path"] for stall in report["recent_stalls"]],
+    }
+
+
+def run(sizes: List[int], kinds: List[str]) -> Dict:
+    results = []
+    for size in sizes:
+        text = generate_plain_text(size)
+        for kind in kinds:
+            result = asyncio.run(_run_case(kind, text))
+            results.append({"size_bytes": size, **result})
+            print(
+                f"{kind:<8} {size / 1024 / 1024:>5.1f}MB  "
+                f"처리 {result['ms']:>7.1f}ms  "
+                f"루프 지연 최대 {result['probe_max_ms']:>7.1f}ms "
+                f"(p99 {result['probe_p99_ms']:>6.1f}ms)  "
+                f"정지 위치 {result['stall_paths'][:2]}"
+            )
+    shutdown_cpu_pool()
+    return {"timestamp": datetime.now().isoformat(), "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ConfluSum 이벤트 루프 지연 벤치마크")
+    parser.add_argument(
+        "--sizes", default=DEFAULT_SIZES, help="문서 크기 목록 (예: 1m,5m,20m)"
+    )
+    parser.add_argument(
+        "--kinds", default=DEFAULT_KINDS, help="CPU 풀 방식 (inline,thread,process)"
+    )
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    report = run(
+        [_parse_size(size) for size in args.sizes.split(",")],
+        args.kinds.split(","),
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
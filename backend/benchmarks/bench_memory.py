@@ -0,0 +1,164 @@
+"""
+Confluence 응답 처리 메모리 벤치마크
+전체 응답을 response.json() 으로 읽던 기존 방식과 스트리밍 필드 추출 방식의
+최대 메모리(tracemalloc peak), 처리 후 남는 메모리, 처리 시간을 비교합니다.
+
+응답은 httpx.MockTransport 로 64KB 청크 스트림을 흘려 실제 httpx 클라이언트 경로를 거칩니다.
+(응답 바이트 자체는 측정 전에 만들어 두므로 결과에는 처리 중 할당만 포함됨)
+
+사용법 (backend 디렉터리에서):
+    python -m benchmarks.bench_memory
+    python -m benchmarks.bench_memory --sizes 1m,20m --output result.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from services.json_stream import (  # noqa: E402
+    PAGE_FIELDS,
+    TextCleaner,
+    stream_json_fields,
+)
+from services.mcp_confluence_service import MCPConfluenceService  # noqa: E402
+
+from .corpus import generate_storage_html  # noqa: E402
+from .micro_bench import _parse_size  # noqa: E402
+
+DEFAULT_SIZES = "1m,5m,20m"
+CHUNK_SIZE = 64 * 1024
+API_URL = "https://bench.atlassian.net/rest/api/content/1?expand=body.storage,version"
+
+
+def _response_bytes(size: int) -> bytes:
+    """매크로가 포함된 storage 본문과 메타데이터로 구성된 Confluence 응답"""
+    data = {
+        "id": "1",
+        "type": "page",
+        "status": "current",
+        "title": "메모리 벤치마크 문서",
+        "space": {"key": "DEV", "name": "개발"},
+        "version": {"number": 7, "minorEdit": False},
+        "body": {
+            "storage": {
+                "value": generate_storage_html(size),
+                "representation": "storage",
+            }
+        },
+        "_links": {"base": "https://bench.atlassian.net/wiki"},
+    }
+    return json.dumps(data).encode("utf-8")
+
+
+def _client(body: bytes) -> httpx.AsyncClient:
+    async def stream():
+        for start in range(0, len(body), CHUNK_SIZE):
+            yield body[start : start + CHUNK_SIZE]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers={"content-type": "application/json"},
+            content=stream(),
+        )
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+async def _buffered(service: MCPConfluenceService, body: bytes) -> Dict:
+    """기존 방식 - 응답 전체를 읽어 dict 로 변환하고 raw_data 로 보관"""
+    async with _client(body) as client:
+        response = await client.get(API_URL)
+        data = response.json()
+        content = data["body"]["storage"].get("value", "")
+        return {
+            "title": data.get("title", ""),
+            "content": service._clean_html_content(content),
+            "version": data.get("version", {}).get("number"),
+            "raw_data": data,
+        }
+
+
+async def _streaming(service: MCPConfluenceService, body: bytes) -> Dict:
+    """현재 방식 - 스트리밍으로 필요한 필드만 추출, 본문은 받는 대로 정리"""
+    async with _client(body) as client:
+        response = await stream_json_fields(
+            client,
+            API_URL,
+            PAGE_FIELDS,
+            sinks={"body.storage.value": TextCleaner(service._clean_html_content)},
+        )
+        return service._process_confluence_response(response["fields"])
+
+
+def _measure(func: Callable[[], Dict]) -> Dict:
+    gc.collect()
+    tracemalloc.start()
+    started_at = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started_at
+    # result 를 보관한 상태의 현재 할당량 = 요청 이후에도 남는 메모리
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {"peak": peak, "retained": retained, "seconds": elapsed}
+
+
+def run(sizes: List[int]) -> Dict:
+    service = MCPConfluenceService()
+    results = []
+    for size in sizes:
+        body = _response_bytes(size)
+        for name, case in (("buffered", _buffered), ("streaming", _streaming)):
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                measured = _measure(lambda: asyncio.run(case(service, body)))
+            result = {
+                "case": name,
+                "size_bytes": size,
+                "response_bytes": len(body),
+                "peak_mb": round(measured["peak"] / 1024 / 1024, 2),
+                "retained_mb": round(measured["retained"] / 1024 / 1024, 2),
+                "ms": round(measured["seconds"] * 1000, 1),
+            }
+            results.append(result)
+            print(
+                f"{name:<10} {len(body) / 1024 / 1024:>7.1f}MB response  "
+                f"peak {result['peak_mb']:>8.2f}MB  "
+                f"retained {result['retained_mb']:>7.2f}MB  "
+                f"{result['ms']:>8.1f}ms"
+            )
+
+    return {"timestamp": datetime.now().isoformat(), "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ConfluSum 응답 처리 메모리 벤치마크")
+    parser.add_argument(
+        "--sizes", default=DEFAULT_SIZES, help="본문 크기 목록 (예: 1m,5m,20m)"
+    )
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    report = run([_parse_size(size) for size in args.sizes.split(",")])
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
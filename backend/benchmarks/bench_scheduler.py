@@ -0,0 +1,221 @@
+"""
+우선순위 스케줄러 벤치마크
+스페이스 크롤(대량 요약)이 도는 동안 interactive 요청의 대기 지연(p50/p95)을 비교합니다.
+
+업스트림 호출은 고정 지연(--latency-ms)의 sleep 으로 대신하고, 슬롯 수는 --capacity 입니다.
+- idle: 크롤 없이 interactive 요청만
+- fifo: 크롤도 interactive 우선순위 (기존처럼 도착 순서대로 슬롯 사용)
+- batch / background: 크롤을 해당 우선순위로 실행
+- join_inverted / join: background 크롤의 페이지 작업(조회 + 요약, 호출 2회)에 interactive 요청이
+  합류해 결과를 기다림 (추측 요약/공유 페이지 조회에 합류하는 경로)
+  join_inverted 는 우선순위를 올리지 않고 기다리기만 함 (크롤 대기열 뒤에서 기다리는 우선순위 역전)
+  join 은 joining 으로 합류해 페이지 작업을 interactive 로 올림
+
+사용법 (backend 디렉터리에서):
+    python -m benchmarks.bench_scheduler
+    python -m benchmarks.bench_scheduler --capacity 8 --crawl-jobs 400 --output result.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from services.scheduler import (  # noqa: E402
+    Preempted,
+    PriorityScheduler,
+    create_joinable_task,
+    joining,
+    request_priority,
+)
+
+from .load_test import _percentile  # noqa: E402
+
+MODES = ("idle", "fifo", "batch", "background", "join_inverted", "join")
+
+
+async def _call(scheduler: PriorityScheduler, latency: float) -> float:
+    """슬롯을 잡고 업스트림 호출 (반환: 요청 시작부터 완료까지 걸린 시간)"""
+    started_at = time.perf_counter()
+    async with scheduler.slot():
+        await asyncio.sleep(latency)
+    return time.perf_counter() - started_at
+
+
+async def _crawl(
+    scheduler: PriorityScheduler, jobs: int, latency: float, priority: str
+) -> Dict[str, int]:
+    """크롤 작업을 한꺼번에 제출 (밀려난 background 작업은 재시도하지 않음)"""
+    result = {"done": 0, "preempted": 0}
+
+    async def job():
+        try:
+            await _call(scheduler, latency)
+            result["done"] += 1
+        except Preempted:
+            result["preempted"] += 1
+
+    with request_priority(priority):
+        await asyncio.gather(*(job() for _ in range(jobs)))
+    return result
+
+
+async def _page(scheduler: PriorityScheduler, latency: float) -> None:
+    """페이지 하나 요약 (본문 조회 + Claude 호출)"""
+    await _call(scheduler, latency)
+    await _call(scheduler, latency)
+
+
+async def _join(
+    scheduler: PriorityScheduler, pages: List[asyncio.Task], latency: float, rng, boost
+) -> float:
+    """아직 끝나지 않은 크롤 페이지 하나에 합류해 결과 대기 (작업이 밀려나면 직접 실행)"""
+    started_at = time.perf_counter()
+    pending = [page for page in pages if not page.done()]
+    if not pending:
+        await _page(scheduler, latency)
+        return time.perf_counter() - started_at
+    page = rng.choice(pending)
+    try:
+        if boost:
+            with joining(page):
+                await asyncio.shield(page)
+        else:
+            await asyncio.shield(page)
+    except Preempted:
+        await _page(scheduler, latency)
+    return time.perf_counter() - started_at
+
+
+async def _run_join_mode(mode: str, args) -> Dict:
+    scheduler = PriorityScheduler("bench", args.capacity)
+    latency = args.latency_ms / 1000
+    rng = random.Random(42)
+
+    # background 크롤 페이지 작업을 합류 가능한 작업으로 한꺼번에 제출
+    with request_priority("background"):
+        pages = [
+            create_joinable_task(_page(scheduler, latency))
+            for _ in range(args.crawl_jobs)
+        ]
+    await asyncio.sleep(latency / 2)
+
+    tasks = []
+    started_at = time.perf_counter()
+    for _ in range(args.requests):
+        tasks.append(
+            asyncio.create_task(
+                _join(scheduler, pages, latency, rng, boost=mode == "join")
+            )
+        )
+        await asyncio.sleep(rng.expovariate(args.rps))
+    latencies = sorted(await asyncio.gather(*tasks))
+    interactive_s = time.perf_counter() - started_at
+
+    outcomes = await asyncio.gather(*pages, return_exceptions=True)
+    total_s = time.perf_counter() - started_at
+    return {
+        "mode": mode,
+        "interactive_p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+        "interactive_p95_ms": round(_percentile(latencies, 95) * 1000, 1),
+        "interactive_max_ms": round(latencies[-1] * 1000, 1),
+        "interactive_s": round(interactive_s, 2),
+        "crawl_done": sum(1 for outcome in outcomes if outcome is None),
+        "crawl_preempted": sum(
+            1 for outcome in outcomes if isinstance(outcome, Preempted)
+        ),
+        "total_s": round(total_s, 2),
+    }
+
+
+async def _run_mode(mode: str, args) -> Dict:
+    if mode.startswith("join"):
+        return await _run_join_mode(mode, args)
+
+    scheduler = PriorityScheduler("bench", args.capacity)
+    latency = args.latency_ms / 1000
+    rng = random.Random(42)
+
+    crawl_task: Optional[asyncio.Task] = None
+    if mode != "idle":
+        priority = "interactive" if mode == "fifo" else mode
+        crawl_task = asyncio.create_task(
+            _crawl(scheduler, args.crawl_jobs, latency, priority)
+        )
+        # 크롤이 슬롯과 대기열을 채운 뒤 interactive 요청 시작
+        await asyncio.sleep(latency / 2)
+
+    tasks = []
+    started_at = time.perf_counter()
+    for _ in range(args.requests):
+        tasks.append(asyncio.create_task(_call(scheduler, latency)))
+        await asyncio.sleep(rng.expovariate(args.rps))
+    latencies = sorted(await asyncio.gather(*tasks))
+    interactive_s = time.perf_counter() - started_at
+
+    crawl = {"done": 0, "preempted": 0}
+    if crawl_task is not None:
+        crawl = await crawl_task
+    total_s = time.perf_counter() - started_at
+    return {
+        "mode": mode,
+        "interactive_p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+        "interactive_p95_ms": round(_percentile(latencies, 95) * 1000, 1),
+        "interactive_max_ms": round(latencies[-1] * 1000, 1),
+        "interactive_s": round(interactive_s, 2),
+        "crawl_done": crawl["done"],
+        "crawl_preempted": crawl["preempted"],
+        "total_s": round(total_s, 2),
+    }
+
+
+def run(args) -> Dict:
+    results = []
+    for mode in args.modes.split(","):
+        result = asyncio.run(_run_mode(mode, args))
+        results.append(result)
+        print(
+            f"{mode:<13} interactive p50 {result['interactive_p50_ms']:>7.1f}ms  "
+            f"p95 {result['interactive_p95_ms']:>7.1f}ms  "
+            f"max {result['interactive_max_ms']:>7.1f}ms  "
+            f"크롤 완료 {result['crawl_done']:>4} / 밀려남 {result['crawl_preempted']:>4}  "
+            f"전체 {result['total_s']:.1f}s"
+        )
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "config": vars(args),
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ConfluSum 우선순위 스케줄러 벤치마크")
+    parser.add_argument("--capacity", type=int, default=8, help="동시 호출 슬롯 수")
+    parser.add_argument("--latency-ms", type=float, default=200, help="업스트림 지연")
+    parser.add_argument("--crawl-jobs", type=int, default=300, help="크롤 작업 수")
+    parser.add_argument("--requests", type=int, default=100, help="interactive 요청 수")
+    parser.add_argument(
+        "--rps", type=float, default=10, help="interactive 초당 요청 수"
+    )
+    parser.add_argument("--modes", default=",".join(MODES), help="비교할 모드 목록")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    report = run(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
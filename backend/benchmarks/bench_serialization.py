@@ -0,0 +1,157 @@
+"""
+API 응답 직렬화 / 압축 벤치마크
+기본 JSONResponse 와 FastJSONResponse 의 인코딩 시간, 그리고 인코딩별 전송 크기를 비교합니다.
+
+페이로드:
+- summary: /api/summarize 응답 (한국어 마크다운 요약)
+- stats: /api/stats 응답 (페르소나 통계 + 최근 피드백 10건)
+- batch: 요약 20건 묶음 (향후 배치 응답)
+
+사용법 (backend 디렉터리에서):
+    python -m benchmarks.bench_serialization
+    python -m benchmarks.bench_serialization --output result.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from responses import CompressionMiddleware, FastJSONResponse  # noqa: E402
+from responses import brotli, orjson  # noqa: E402
+
+from .corpus import generate_plain_text  # noqa: E402
+
+PERSONAS = ["general", "developer", "product_manager", "designer"]
+
+
+def _summary_payload(index: int = 0) -> Dict:
+    body = generate_plain_text(3 * 1024, seed=index)
+    return {
+        "summary": "## 핵심 요약\n\n" + body.replace(". ", ".\n- "),
+        "title": f"ConfluSum 설계 문서 {index}",
+        "url": f"https://company.atlassian.net/wiki/spaces/DEV/pages/{100000 + index}/Design",
+        "persona": PERSONAS[index % len(PERSONAS)],
+    }
+
+
+def _stats_payload() -> Dict:
+    now = datetime(2026, 1, 1, 12, 0, 0)
+    recent = [
+        {
+            "id": str(uuid.UUID(int=i)),
+            "url": f"https://company.atlassian.net/wiki/spaces/DEV/pages/{100000 + i}/Page",
+            "persona": PERSONAS[i % len(PERSONAS)],
+            "feedback": "positive" if i % 3 else "negative",
+            "timestamp": (now - timedelta(minutes=i)).isoformat(),
+        }
+        for i in range(10)
+    ]
+    persona_stats = {
+        persona: {"positive": 120, "negative": 30, "total": 150, "positive_rate": 80.0}
+        for persona in PERSONAS
+    }
+    return {
+        "total_feedback": 600,
+        "positive_count": 480,
+        "negative_count": 120,
+        "positive_rate": 80.0,
+        "negative_rate": 20.0,
+        "persona_stats": persona_stats,
+        "recent_feedback": recent,
+        "success_criteria_met": True,
+    }
+
+
+def _measure(func: Callable[[], bytes], min_time: float) -> float:
+    """호출당 평균 시간(초)"""
+    count = 0
+    started_at = time.perf_counter()
+    while True:
+        func()
+        count += 1
+        elapsed = time.perf_counter() - started_at
+        if elapsed >= min_time:
+            return elapsed / count
+
+
+def run(min_time: float) -> Dict:
+    compressor = CompressionMiddleware(app=None)
+    payloads = {
+        "summary": _summary_payload(),
+        "stats": _stats_payload(),
+        "batch": {"results": [_summary_payload(i) for i in range(20)]},
+    }
+
+    results = []
+    for name, payload in payloads.items():
+        baseline_body = JSONResponse(payload).body
+        fast_body = FastJSONResponse(payload).body
+        result = {
+            "payload": name,
+            "json_encode_us": round(
+                _measure(lambda: JSONResponse(payload).body, min_time) * 1e6, 1
+            ),
+            "fast_encode_us": round(
+                _measure(lambda: FastJSONResponse(payload).body, min_time) * 1e6, 1
+            ),
+            "json_bytes": len(baseline_body),
+            "fast_bytes": len(fast_body),
+            "gzip_bytes": len(compressor._compress(fast_body, "gzip")),
+            "gzip_us": round(
+                _measure(lambda: compressor._compress(fast_body, "gzip"), min_time)
+                * 1e6,
+                1,
+            ),
+        }
+        if brotli is not None:
+            result["br_bytes"] = len(compressor._compress(fast_body, "br"))
+            result["br_us"] = round(
+                _measure(lambda: compressor._compress(fast_body, "br"), min_time) * 1e6,
+                1,
+            )
+        results.append(result)
+
+        print(
+            f"{name:<8} encode {result['json_encode_us']:>8.1f}us -> "
+            f"{result['fast_encode_us']:>8.1f}us   "
+            f"bytes {result['json_bytes']:>7} -> gzip {result['gzip_bytes']:>6}"
+            + (f" / br {result['br_bytes']:>6}" if "br_bytes" in result else "")
+        )
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "orjson": orjson is not None,
+        "brotli": brotli is not None,
+        "gzip_level": compressor.gzip_level,
+        "brotli_quality": compressor.brotli_quality,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ConfluSum 응답 직렬화/압축 벤치마크")
+    parser.add_argument(
+        "--min-time", type=float, default=0.5, help="케이스별 최소 측정 시간(초)"
+    )
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    report = run(args.min_time)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+벤치마크용 Confluence storage-format 문서 생성기
+한국어/영어 본문, 헤더, 표, 매크로를 섞어 지정한 크기의 HTML을 만듭니다.
+"""
+
+import random
+from typing import List
+
+KOREAN_SENTENCES = [
+    "이 문서는 ConfluSum 서비스의 요약 파이프라인 설계를 설명합니다.",
+    "사용자는 Confluence URL을 입력하고 페르소나를 선택합니다.",
+    "응답 시간 목표는 평균 30초 이내이며 서버 로그로 측정합니다.",
+    "API 호출 실패 시 사용자에게 명확한 오류 메시지를 제공해야 합니다.",
+    "기획자는 일정과 리스크, 의사결정 포인트에 집중합니다.",
+    "디자이너는 사용자 플로우와 인터페이스 가이드라인을 확인합니다.",
+    "개발자는 API 명세와 데이터 구조, 성능 제약을 검토합니다.",
+]
+
+ENGLISH_SENTENCES = [
+    "The summarization pipeline fetches the page body through the REST API.",
+    "Each persona receives a prompt tailored to its focus areas.",
+    "Latency budgets are tracked per stage to find the slowest step.",
+    "Retries must respect the upstream rate limits and back off on 429.",
+    "Large tables and code macros are flattened into plain text.",
+]
+
+HEADINGS = [
+    "프로젝트 개요",
+    "기술 스택",
+    "API 명세",
+    "Performance Requirements",
+    "리스크 관리",
+    "Release Plan",
+    "사용자 플로우",
+    "Open Questions",
+]
+
+
+def _paragraph(rng: random.Random) -> str:
+    sentences = [
+        rng.choice(KOREAN_SENTENCES if rng.random() < 0.6 else ENGLISH_SENTENCES)
+        for _ in range(rng.randint(2, 5))
+    ]
+    return "<p>" + " ".join(sentences) + "&nbsp;&amp; 참고</p>"
+
+
+def _table(rng: random.Random) -> str:
+    rows = ["<tr><th>항목</th><th>Owner</th><th>상태</th></tr>"]
+    for i in range(rng.randint(3, 8)):
+        rows.append(
+            f"<tr><td>작업 {i + 1}</td><td>team-{rng.randint(1, 9)}</td>"
+            f"<td>{rng.choice(['진행 중', 'Done', '대기'])}</td></tr>"
+        )
+    return "<table><tbody>" + "".join(rows) + "</tbody></table>"
+
+
+def _macro(rng: random.Random) -> str:
+    name = rng.choice(["code", "info", "expand", "jira"])
+    body = rng.choice(ENGLISH_SENTENCES)
+    return (
+        f'<ac:structured-macro ac:name="{name}" ac:schema-version="1">'
+        f'<ac:parameter ac:name="title">{name} 매크로</ac:parameter>'
+        f"<ac:plain-text-body><![CDATA[{body}]]></ac:plain-text-body>"
+        "</ac:structured-macro>"
+    )
+
+
+def generate_storage_html(size_bytes: int, seed: int = 0) -> str:
+    """UTF-8 기준 약 size_bytes 크기의 Confluence storage HTML 생성"""
+    rng = random.Random(seed)
+    parts: List[str] = []
+    total = 0
+    section = 0
+    while total < size_bytes:
+        if section == 0 or rng.random() < 0.15:
+            heading = HEADINGS[section % len(HEADINGS)]
+            block = f"<h2>{section:02d}. {heading}</h2>"
+            section += 1
+        else:
+            roll = rng.random()
+            if roll < 0.7:
+                block = _paragraph(rng)
+            elif roll < 0.85:
+                block = _table(rng)
+            else:
+                block = _macro(rng)
+        parts.append(block)
+        total += len(block.encode("utf-8"))
+    return "\n".join(parts)
+
+
+def generate_plain_text(size_bytes: int, seed: int = 0) -> str:
+    """헤더 줄과 본문 줄로 구성된 (HTML 정리 이후 형태의) 텍스트 생성"""
+    rng = random.Random(seed)
+    lines: List[str] = ["ConfluSum 벤치마크 문서"]
+    total = 0
+    section = 0
+    while total < size_bytes:
+        if rng.random() < 0.1:
+            line = f"{section:02d}. {HEADINGS[section % len(HEADINGS)]}"
+            section += 1
+        elif rng.random() < 0.1:
+            line = f"## {rng.choice(HEADINGS)}"
+        else:
+            line = " ".join(
+                rng.choice(KOREAN_SENTENCES + ENGLISH_SENTENCES)
+                for _ in range(rng.randint(1, 4))
+            )
+        lines.append(line)
+        total += len(line.encode("utf-8")) + 1
+    return "\n".join(lines)
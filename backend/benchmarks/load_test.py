@@ -0,0 +1,282 @@
+"""
+엔드투엔드 부하 테스트
+로컬 Confluence/Anthropic 스텁과 ConfluSum API 서버를 띄우고
+/api/validate-url, /api/summarize, /api/feedback 을 목표 RPS로 호출합니다.
+
+네트워크 없이 실행 가능하며 p50/p95/p99 지연 시간과 처리량을 보고합니다.
+
+사용법 (backend 디렉터리에서):
+    python -m benchmarks.load_test --rps 20 --duration 30
+    python -m benchmarks.load_test --rps 50 --page-size-kb 500 \\
+        --claude-latency-ms 2000 --rate-limit-rate 0.05 --output result.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PERSONAS = ["general", "developer", "product_manager", "designer"]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(
+        len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1)))
+    )
+    return sorted_values[index]
+
+
+async def _wait_ready(url: str, timeout: float = 20.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                response = await client.get(url)
+                if response.status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"서버가 준비되지 않았습니다: {url}")
+
+
+def _start_process(args: List[str], env: Dict[str, str], cwd: str) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, *args],
+        env=env,
+        cwd=cwd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+class LoadGenerator:
+    """개방 루프(open-loop) 부하 생성기 - 응답 지연과 무관하게 목표 RPS로 요청 발행"""
+
+    def __init__(
+        self,
+        base_url: str,
+        rps: float,
+        duration: float,
+        mix: Dict[str, float],
+        pages: int,
+    ):
+        self.base_url = base_url
+        self.rps = rps
+        self.duration = duration
+        self.mix = mix
+        self.pages = pages
+        self.results: Dict[str, List[float]] = {name: [] for name in mix}
+        self.errors: Dict[str, Dict[str, int]] = {name: {} for name in mix}
+
+    def _page_url(self) -> str:
+        page_id = 100000 + random.randrange(self.pages)
+        return f"https://bench.atlassian.net/wiki/spaces/BENCH/pages/{page_id}/Bench"
+
+    def _build_request(self, endpoint: str):
+        url = self._page_url()
+        persona = random.choice(PERSONAS)
+        if endpoint == "validate":
+            return "/api/validate-url", {"url": url}
+        if endpoint == "summarize":
+            return "/api/summarize", {"url": url, "persona": persona}
+        return "/api/feedback", {
+            "url": url,
+            "persona": persona,
+            "feedback": random.choice(["positive", "negative"]),
+        }
+
+    async def _fire(self, client: httpx.AsyncClient, endpoint: str) -> None:
+        path, body = self._build_request(endpoint)
+        started_at = time.perf_counter()
+        try:
+            response = await client.post(path, json=body)
+            status = str(response.status_code)
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        elapsed = time.perf_counter() - started_at
+
+        if status == "200":
+            self.results[endpoint].append(elapsed)
+        else:
+            self.errors[endpoint][status] = self.errors[endpoint].get(status, 0) + 1
+
+    async def run(self) -> Dict:
+        endpoints = list(self.mix)
+        weights = [self.mix[name] for name in endpoints]
+        limits = httpx.Limits(max_connections=1000, max_keepalive_connections=200)
+        tasks = []
+
+        async with httpx.AsyncClient(
+            base_url=self.base_url, timeout=120.0, limits=limits
+        ) as client:
+            started_at = time.perf_counter()
+            total = int(self.rps * self.duration)
+            for i in range(total):
+                target = started_at + i / self.rps
+                delay = target - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                endpoint = random.choices(endpoints, weights)[0]
+                tasks.append(asyncio.create_task(self._fire(client, endpoint)))
+            await asyncio.gather(*tasks)
+            wall_time = time.perf_counter() - started_at
+
+        return self._report(wall_time)
+
+    def _report(self, wall_time: float) -> Dict:
+        report = {"wall_time_s": round(wall_time, 2), "endpoints": {}}
+        total_ok = 0
+        for endpoint, latencies in self.results.items():
+            latencies.sort()
+            total_ok += len(latencies)
+            report["endpoints"][endpoint] = {
+                "ok": len(latencies),
+                "errors": self.errors[endpoint],
+                "p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+                "p95_ms": round(_percentile(latencies, 95) * 1000, 1),
+                "p99_ms": round(_percentile(latencies, 99) * 1000, 1),
+                "max_ms": round((latencies[-1] if latencies else 0) * 1000, 1),
+            }
+        report["throughput_rps"] = round(total_ok / wall_time, 2) if wall_time else 0
+        return report
+
+
+async def run_load_test(args) -> Dict:
+    confluence_port = _free_port()
+    anthropic_port = _free_port()
+    app_port = _free_port()
+    workdir = tempfile.mkdtemp(prefix="conflusum-bench-")
+
+    def stub_args(kind: str, port: int, latency_ms: float) -> List[str]:
+        return [
+            "-m",
+            "benchmarks.stub_servers",
+            kind,
+            "--port",
+            str(port),
+            "--latency-ms",
+            str(latency_ms),
+            "--error-rate",
+            str(args.error_rate),
+            "--rate-limit-rate",
+            str(args.rate_limit_rate),
+            "--page-size-kb",
+            str(args.page_size_kb),
+        ]
+
+    base_env = dict(os.environ, PYTHONPATH=BACKEND_DIR)
+    processes = [
+        _start_process(
+            stub_args("confluence", confluence_port, args.stub_latency_ms),
+            base_env,
+            BACKEND_DIR,
+        ),
+        _start_process(
+            stub_args("anthropic", anthropic_port, args.claude_latency_ms),
+            base_env,
+            BACKEND_DIR,
+        ),
+    ]
+
+    # 앱은 임시 작업 디렉터리에서 실행 (피드백 파일 등이 저장소를 오염시키지 않도록)
+    app_env = dict(
+        base_env,
+        CONFLUENCE_BASE_URL=f"http://127.0.0.1:{confluence_port}",
+        CONFLUENCE_USERNAME="bench@example.com",
+        CONFLUENCE_API_TOKEN="bench-token",
+        ANTHROPIC_API_KEY="bench-key",
+        ANTHROPIC_API_URL=f"http://127.0.0.1:{anthropic_port}/v1/messages",
+        DEBUG="false",
+    )
+    processes.append(
+        _start_process(
+            [
+                "-m",
+                "uvicorn",
+                "main:app",
+                "--app-dir",
+                BACKEND_DIR,
+                "--port",
+                str(app_port),
+                "--log-level",
+                "warning",
+            ],
+            app_env,
+            workdir,
+        )
+    )
+
+    try:
+        await _wait_ready(f"http://127.0.0.1:{confluence_port}/health")
+        await _wait_ready(f"http://127.0.0.1:{anthropic_port}/health")
+        await _wait_ready(f"http://127.0.0.1:{app_port}/api/health")
+
+        mix = {
+            "validate": args.validate_weight,
+            "summarize": args.summarize_weight,
+            "feedback": args.feedback_weight,
+        }
+        generator = LoadGenerator(
+            f"http://127.0.0.1:{app_port}", args.rps, args.duration, mix, args.pages
+        )
+        report = await generator.run()
+        report["config"] = vars(args)
+        return report
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ConfluSum 엔드투엔드 부하 테스트")
+    parser.add_argument("--rps", type=float, default=10.0, help="목표 초당 요청 수")
+    parser.add_argument("--duration", type=float, default=20.0, help="측정 시간(초)")
+    parser.add_argument("--pages", type=int, default=50, help="서로 다른 페이지 수")
+    parser.add_argument("--page-size-kb", type=int, default=50)
+    parser.add_argument(
+        "--stub-latency-ms", type=float, default=80.0, help="Confluence 스텁 지연"
+    )
+    parser.add_argument(
+        "--claude-latency-ms", type=float, default=1500.0, help="Anthropic 스텁 지연"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--validate-weight", type=float, default=0.4)
+    parser.add_argument("--summarize-weight", type=float, default=0.4)
+    parser.add_argument("--feedback-weight", type=float, default=0.2)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_load_test(args))
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
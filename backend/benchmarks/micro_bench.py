@@ -0,0 +1,202 @@
+"""
+텍스트 추출 / 구조 파싱 마이크로벤치마크
+
+대상:
+- ConfluenceService._extract_text_from_html
+- MCPConfluenceService._clean_html_content
+- DocumentSnapshot.parse
+- ConfluenceService.parse_document_structure (호환 래퍼)
+- ClaudeService._generate_structured_prompt
+
+10KB ~ 10MB 크기의 한국어/영어 혼합 문서(표, 매크로 포함)를 생성해 측정하고
+결과를 JSON으로 저장해 커밋 간 회귀를 추적합니다.
+
+사용법 (backend 디렉터리에서):
+    python -m benchmarks.micro_bench
+    python -m benchmarks.micro_bench --sizes 10k,1m --compare benchmarks/results/<이전 결과>.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from services.claude_service import ClaudeService  # noqa: E402
+from services.confluence_service import ConfluenceService  # noqa: E402
+from services.document_snapshot import DocumentSnapshot  # noqa: E402
+from services.mcp_confluence_service import MCPConfluenceService  # noqa: E402
+
+from .corpus import generate_plain_text, generate_storage_html  # noqa: E402
+
+DEFAULT_SIZES = "10k,100k,1m,10m"
+DEFAULT_RESULTS_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "results"
+)
+
+
+def _parse_size(value: str) -> int:
+    value = value.strip().lower()
+    units = {"k": 1024, "m": 1024 * 1024}
+    if value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+def _git_commit() -> str:
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=BACKEND_DIR,
+                stderr=subprocess.DEVNULL,
+            )
+            .decode()
+            .strip()
+        )
+    except Exception:
+        return "unknown"
+
+
+def _measure(
+    func: Callable[[], object], min_time: float, max_repeats: int
+) -> List[float]:
+    """최소 min_time 초 또는 max_repeats 회까지 반복 측정"""
+    timings: List[float] = []
+    budget_started = time.perf_counter()
+    # 서비스 코드의 디버그 print 출력은 측정 중 버림
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        while len(timings) < max_repeats:
+            started_at = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started_at)
+            if time.perf_counter() - budget_started >= min_time and len(timings) >= 3:
+                break
+    return timings
+
+
+def run_benchmarks(sizes: List[int], min_time: float, max_repeats: int) -> Dict:
+    confluence_service = ConfluenceService()
+    mcp_service = MCPConfluenceService()
+    claude_service = ClaudeService()
+    persona_config = claude_service.persona_prompts["developer"]
+
+    results = []
+    for size in sizes:
+        html = generate_storage_html(size)
+        text = generate_plain_text(size)
+        snapshot = DocumentSnapshot.parse(text)
+
+        cases = {
+            "ConfluenceService._extract_text_from_html": (
+                lambda: confluence_service._extract_text_from_html(html),
+                len(html.encode("utf-8")),
+            ),
+            "MCPConfluenceService._clean_html_content": (
+                lambda: mcp_service._clean_html_content(html),
+                len(html.encode("utf-8")),
+            ),
+            "DocumentSnapshot.parse": (
+                lambda: DocumentSnapshot.parse(text),
+                len(text.encode("utf-8")),
+            ),
+            "ConfluenceService.parse_document_structure": (
+                lambda: confluence_service.parse_document_structure(text),
+                len(text.encode("utf-8")),
+            ),
+            "ClaudeService._generate_structured_prompt": (
+                lambda: claude_service._generate_structured_prompt(
+                    persona_config, "벤치마크 문서", snapshot
+                ),
+                len(text.encode("utf-8")),
+            ),
+        }
+
+        for name, (func, input_bytes) in cases.items():
+            timings = _measure(func, min_time, max_repeats)
+            median = statistics.median(timings)
+            result = {
+                "benchmark": name,
+                "size_bytes": size,
+                "input_bytes": input_bytes,
+                "repeats": len(timings),
+                "min_ms": round(min(timings) * 1000, 3),
+                "median_ms": round(median * 1000, 3),
+                "mean_ms": round(statistics.mean(timings) * 1000, 3),
+                "mb_per_s": round(input_bytes / median / 1_000_000, 2) if median else 0,
+            }
+            results.append(result)
+            print(
+                f"{name:<48} {size // 1024:>7}KB "
+                f"median {result['median_ms']:>10.3f}ms  {result['mb_per_s']:>8.2f}MB/s"
+            )
+
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(current: Dict, baseline_path: str) -> None:
+    """이전 결과 대비 중앙값 변화율 출력"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    previous = {
+        (r["benchmark"], r["size_bytes"]): r["median_ms"] for r in baseline["results"]
+    }
+    print(f"\n비교 기준: {baseline.get('commit')} ({baseline_path})")
+    for r in current["results"]:
+        before = previous.get((r["benchmark"], r["size_bytes"]))
+        if not before:
+            continue
+        change = (r["median_ms"] - before) / before * 100
+        print(
+            f"{r['benchmark']:<48} {r['size_bytes'] // 1024:>7}KB "
+            f"{before:>10.3f}ms -> {r['median_ms']:>10.3f}ms ({change:+.1f}%)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ConfluSum 마이크로벤치마크")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="예: 10k,100k,1m,10m")
+    parser.add_argument(
+        "--min-time", type=float, default=1.0, help="케이스별 최소 측정 시간(초)"
+    )
+    parser.add_argument("--max-repeats", type=int, default=50)
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: benchmarks/results/)")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    args = parser.parse_args()
+
+    sizes = [_parse_size(s) for s in args.sizes.split(",") if s.strip()]
+    report = run_benchmarks(sizes, args.min_time, args.max_repeats)
+
+    output = args.output
+    if not output:
+        os.makedirs(DEFAULT_RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(
+            DEFAULT_RESULTS_DIR, f"micro-{report['commit']}-{stamp}.json"
+        )
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+로컬 스텁 서버 (오프라인 부하 테스트용)
+- Confluence content REST API (/rest/api/content/{page_id})
+- Anthropic Messages API (/v1/messages)
+- Redis 프로토콜(RESP) 캐시 서버 (CACHE_BACKEND=redis 테스트용, GET/SET PX/DEL/DBSIZE)
+
+지연 시간, 오류율, 429 비율, 페이지 크기를 설정할 수 있습니다.
+
+사용법:
+    python -m benchmarks.stub_servers confluence --port 9001 --page-size-kb 200
+    python -m benchmarks.stub_servers anthropic --port 9002 --rate-limit-rate 0.05
+    python -m benchmarks.stub_servers redis --port 6380
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import zlib
+from dataclasses import dataclass
+from functools import lru_cache
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from .corpus import generate_storage_html
+
+
+@dataclass
+class StubConfig:
+    latency_ms: float = 50.0
+    jitter_ms: float = 20.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    page_size_kb: int = 50
+
+
+async def _simulate(config: StubConfig):
+    """지연 주입 후 오류/429 응답 여부 결정"""
+    delay = max(0.0, random.gauss(config.latency_ms, config.jitter_ms)) / 1000
+    await asyncio.sleep(delay)
+
+    roll = random.random()
+    if roll < config.rate_limit_rate:
+        return JSONResponse(
+            {"type": "error", "error": {"type": "rate_limit_error"}},
+            status_code=429,
+            headers={"retry-after": "1"},
+        )
+    if roll < config.rate_limit_rate + config.error_rate:
+        return JSONResponse(
+            {"type": "error", "error": {"type": "api_error"}}, status_code=500
+        )
+    return None
+
+
+@lru_cache(maxsize=32)
+def _page_body(page_id: str, size_bytes: int) -> str:
+    return generate_storage_html(size_bytes, seed=zlib.crc32(page_id.encode()))
+
+
+def create_confluence_app(config: StubConfig) -> FastAPI:
+    app = FastAPI(title="Confluence stub")
+
+    @app.get("/rest/api/content/{page_id}")
+    async def get_content(page_id: str, expand: str = ""):
+        error = await _simulate(config)
+        if error:
+            return error
+
+        data = {
+            "id": page_id,
+            "type": "page",
+            "title": f"벤치마크 문서 {page_id}",
+            "version": {"number": 1},
+        }
+        if "body.storage" in expand:
+            data["body"] = {
+                "storage": {
+                    "value": _page_body(page_id, config.page_size_kb * 1024),
+                    "representation": "storage",
+                }
+            }
+        return data
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    return app
+
+
+def create_anthropic_app(config: StubConfig) -> FastAPI:
+    app = FastAPI(title="Anthropic stub")
+
+    @app.post("/v1/messages")
+    async def create_message(request: Request):
+        payload = await request.json()
+        error = await _simulate(config)
+        if error:
+            return error
+
+        prompt = "".join(
+            m["content"] for m in payload.get("messages", []) if m.get("content")
+        )
+        output_tokens = min(payload.get("max_tokens", 1000), 400)
+        return {
+            "id": "msg_stub",
+            "type": "message",
+            "role": "assistant",
+            "model": payload.get("model", "claude-3-haiku-20240307"),
+            "content": [
+                {"type": "text", "text": "## 📄 요약\n" + "- 스텁 요약\n" * 20}
+            ],
+            "stop_reason": "end_turn",
+            "usage": {
+                # 한국어 위주 텍스트 기준 대략 2자당 1토큰
+                "input_tokens": len(prompt) // 2,
+                "output_tokens": output_tokens,
+                "cache_creation_input_tokens": 0,
+                "cache_read_input_tokens": 0,
+            },
+        }
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    return app
+
+
+class RedisStub:
+    """Redis 대용 인메모리 RESP 서버 (캐시 백엔드 테스트용 최소 명령 집합)"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                args = await self._read_command(reader)
+                if args is None:
+                    break
+                writer.write(self._execute(args))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_command(self, reader: asyncio.StreamReader):
+        line = await reader.readline()
+        if not line:
+            return None
+        count = int(line[1:-2])
+        args = []
+        for _ in range(count):
+            length = int((await reader.readline())[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    def _execute(self, args) -> bytes:
+        command = args[0].decode().upper()
+        if command == "PING":
+            return b"+PONG\r\n"
+        if command in ("AUTH", "SELECT", "FLUSHDB"):
+            if command == "FLUSHDB":
+                self.data.clear()
+            return b"+OK\r\n"
+        if command == "GET":
+            value = self._get(args[1])
+            if value is None:
+                return b"$-1\r\n"
+            return b"$%d\r\n%s\r\n" % (len(value), value)
+        if command == "SET":
+            expires_at = None
+            if len(args) >= 5 and args[3].upper() == b"PX":
+                expires_at = time.time() + int(args[4]) / 1000
+            elif len(args) >= 5 and args[3].upper() == b"EX":
+                expires_at = time.time() + int(args[4])
+            self.data[args[1]] = (args[2], expires_at)
+            return b"+OK\r\n"
+        if command == "DEL":
+            removed = sum(1 for key in args[1:] if self.data.pop(key, None))
+            return b":%d\r\n" % removed
+        if command == "DBSIZE":
+            return b":%d\r\n" % len(self.data)
+        return b"-ERR unknown command '%s'\r\n" % args[0]
+
+    def _get(self, key: bytes):
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self.data[key]
+            return None
+        return value
+
+
+async def run_redis_stub(host: str, port: int) -> None:
+    server = await asyncio.start_server(RedisStub().handle, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Confluence/Anthropic/Redis 스텁 서버")
+    parser.add_argument("kind", choices=["confluence", "anthropic", "redis"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--page-size-kb", type=int, default=50)
+    args = parser.parse_args()
+
+    config = StubConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        page_size_kb=args.page_size_kb,
+    )
+    if args.kind == "redis":
+        asyncio.run(run_redis_stub(args.host, args.port))
+        return
+    if args.kind == "confluence":
+        app = create_confluence_app(config)
+    else:
+        app = create_anthropic_app(config)
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
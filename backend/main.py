@@ -4,25 +4,120 @@ AI 기반 개인화 Confluence 요약 서비스
 """
 
 import os
+from contextlib import asynccontextmanager
+from typing import Optional
 
-import uvicorn
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import PlainTextResponse, Response
 from models import FeedbackRequest, SummarizationRequest, URLValidationRequest
+from responses import CompressionMiddleware, FastJSONResponse
+from services.cache_service import CacheService
 from services.claude_service import ClaudeService
 from services.confluence_service import ConfluenceService
+from services.cpu_pool import get_cpu_pool, shutdown_cpu_pool
+from services.disconnect import ClientDisconnected, cancel_on_disconnect
 from services.feedback_service import FeedbackService
+from services.loop_monitor import LoopMonitor
+from services.memory_service import MemoryService
+from services.metrics_service import MetricsMiddleware, metrics
+from services.profiling_service import ProfilingService
+from services.search_service import SearchService
+from services.summary_service import SummaryService
+from services.usage_service import UsageService
+from services.warmer_service import WarmerService
+from static_files import PrecompressedStaticFiles
 
 # Load environment variables
 load_dotenv()
 
+# Services (created in lifespan startup, one set per worker process)
+cache_service: CacheService = None
+confluence_service: ConfluenceService = None
+usage_service: UsageService = None
+claude_service: ClaudeService = None
+feedback_service: FeedbackService = None
+profiling_service: ProfilingService = None
+summary_service: SummaryService = None
+search_service: SearchService = None
+warmer_service: WarmerService = None
+loop_monitor: LoopMonitor = None
+memory_service: MemoryService = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    워커 시작 시 서비스/커넥션 풀 생성, 종료(SIGTERM 드레인 이후) 시 정리
+    """
+    global cache_service, confluence_service, usage_service, claude_service
+    global feedback_service, profiling_service, summary_service, search_service
+    global warmer_service, loop_monitor, memory_service
+
+    # CPU 풀 프로세스는 다른 스레드(모니터, 커넥션 풀 등)가 생기기 전에 fork
+    get_cpu_pool().start()
+    loop_monitor = LoopMonitor()
+    loop_monitor.start()
+    # tracemalloc 은 서비스 생성 전에 시작해 시작 시 할당도 기준 스냅샷에 포함
+    memory_service = MemoryService()
+    memory_service.start()
+
+    cache_service = CacheService()
+    search_service = SearchService(cache_service=cache_service)
+    confluence_service = ConfluenceService(
+        cache_service=cache_service, search_service=search_service
+    )
+    usage_service = UsageService()
+    claude_service = ClaudeService(
+        usage_service=usage_service, cache_service=cache_service
+    )
+    feedback_service = FeedbackService()
+    profiling_service = ProfilingService()
+    summary_service = SummaryService(
+        confluence_service, claude_service, cache_service=cache_service
+    )
+    warmer_service = WarmerService(
+        confluence_service,
+        claude_service,
+        summary_service,
+        cache_service=cache_service,
+    )
+    warmer_service.start()
+
+    # 메모리 모니터가 크기를 집계할 구조 (cache 는 예산 초과 시 축소 대상)
+    memory_service.register(
+        "cache", cache_service.memory_usage, trim=cache_service.trim
+    )
+    memory_service.register("confluence", confluence_service.memory_stats)
+    memory_service.register("summary", summary_service.memory_stats)
+    memory_service.register("usage", usage_service.memory_stats)
+    memory_service.register("feedback", feedback_service.memory_stats)
+    print(f"ConfluSum 워커 시작 (pid={os.getpid()})")
+
+    try:
+        yield
+    finally:
+        await warmer_service.aclose()
+        await summary_service.aclose()
+        await claude_service.aclose()
+        await usage_service.aclose()
+        await confluence_service.aclose()
+        feedback_service.close()
+        await cache_service.aclose()
+        shutdown_cpu_pool()
+        await loop_monitor.aclose()
+        await memory_service.aclose()
+        print(f"ConfluSum 워커 종료 (pid={os.getpid()})")
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="ConfluSum API",
     description="AI 기반 개인화 Confluence 문서 요약 서비스",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # Configure CORS
@@ -34,10 +129,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize services
-confluence_service = ConfluenceService()
-claude_service = ClaudeService()
-feedback_service = FeedbackService()
+# Negotiated br/gzip compression for API responses above COMPRESSION_MIN_SIZE
+app.add_middleware(CompressionMiddleware)
+
+# Request counters / latency histograms for /metrics
+app.add_middleware(MetricsMiddleware)
 
 
 @app.get("/api/health")
@@ -46,10 +142,19 @@ async def health_check():
     return {"status": "healthy", "service": "ConfluSum API"}
 
 
+def _client_id(http_request: Request) -> str:
+    """추측 요약용 클라이언트 식별자 (X-Client-Id 헤더, 없으면 IP)"""
+    client_id = http_request.headers.get("x-client-id")
+    if client_id:
+        return client_id
+    return http_request.client.host if http_request.client else ""
+
+
 @app.post("/api/validate-url")
-async def validate_url(request: URLValidationRequest):
+async def validate_url(request: URLValidationRequest, http_request: Request):
     """
     Confluence URL 유효성 검증
+    (SPECULATIVE_SUMMARY_ENABLED 시 예상 페르소나 요약을 백그라운드에서 미리 생성)
     """
     try:
         print(f"=== URL 검증 요청 ===")
@@ -58,6 +163,9 @@ async def validate_url(request: URLValidationRequest):
         result = await confluence_service.validate_url(request.url)
         print(f"검증 결과: {result}")
 
+        if result.get("valid"):
+            summary_service.speculate(request.url, _client_id(http_request))
+
         return result
     except Exception as e:
         print(f"URL 검증 중 오류: {str(e)}")
@@ -65,47 +173,39 @@ async def validate_url(request: URLValidationRequest):
 
 
 @app.post("/api/summarize")
-async def summarize_document(request: SummarizationRequest):
+async def summarize_document(request: SummarizationRequest, http_request: Request):
     """
     Confluence 문서 AI 요약 생성
+    (PROFILING_ENABLED 시 X-Profile 헤더 / ?profile= 쿼리로 요청 단위 프로파일링)
+    클라이언트 연결이 끊기면 진행 중인 조회/Claude 호출을 취소하고 499 로 기록
     """
     try:
-        print(f"=== 요약 요청 시작 ===")
-        print(f"URL: {request.url}")
-        print(f"페르소나: {request.persona}")
-
-        # 1. Confluence 문서 콘텐츠 가져오기
-        print("1. Confluence 문서 콘텐츠 가져오기 시작...")
-        document_content = await confluence_service.get_document_content(request.url)
-        print(f"문서 제목: {document_content.get('title', '없음')}")
-        print(f"문서 내용 길이: {len(document_content.get('content', ''))}")
-
-        # 2. Claude AI로 페르소나별 요약 생성 (헤더 구조 활용)
-        print("2. Claude AI 요약 생성 시작...")
-        summary = await claude_service.generate_summary(
-            content=document_content["content"],
-            persona=request.persona,
-            title=document_content.get("title", ""),
-            document_structure=document_content.get("structure"),
+        profile_mode = profiling_service.requested_mode(
+            http_request.headers, http_request.query_params
         )
-        print(f"생성된 요약 길이: {len(summary)}")
-
-        # 문서 구조 정보 출력 (디버깅용)
-        if document_content.get("structure"):
-            sections = document_content["structure"].get("sections", [])
-            print(f"문서 섹션 수: {len(sections)}")
-            print(f"주요 섹션: {sections[:5]}")  # 처음 5개 섹션만 출력
-
-        result = {
-            "summary": summary,
-            "title": document_content.get("title", ""),
-            "url": request.url,
-            "persona": request.persona,
-        }
-
-        print("=== 요약 요청 완료 ===")
+        client_id = _client_id(http_request)
+        warmer_service.record_request(request.url, request.persona)
+        if not profile_mode:
+            return await cancel_on_disconnect(
+                http_request,
+                summary_service.summarize(request.url, request.persona, client_id),
+            )
+
+        with profiling_service.profile(
+            url=request.url, persona=request.persona
+        ) as session:
+            result = await cancel_on_disconnect(
+                http_request,
+                summary_service.summarize(request.url, request.persona, client_id),
+            )
+        if session:
+            result["profile"] = session.report(inline=profile_mode == "return")
         return result
 
+    except ClientDisconnected:
+        # 받을 클라이언트가 없음 - 상태 코드는 메트릭 구분용 (nginx 관례)
+        print(f"클라이언트 연결 끊김으로 요약 취소: {request.url}")
+        return Response(status_code=499)
     except Exception as e:
         print(f"요약 생성 중 오류 발생: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -126,17 +226,151 @@ async def submit_feedback(request: FeedbackRequest):
 
 
 @app.get("/api/stats")
-async def get_stats():
+async def get_stats(
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    persona: Optional[str] = None,
+    url: Optional[str] = None,
+):
     """
     기본 통계 정보 (개발용)
+    since/until(ISO 날짜·시각), persona, url 로 기간/대상 필터링
     """
     try:
-        stats = await feedback_service.get_stats()
+        stats = await feedback_service.get_stats(
+            since=since, until=until, persona=persona, url=url
+        )
         return stats
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/usage")
+async def get_usage():
+    """
+    Claude 토큰 사용량 및 비용 통계 (개발용)
+    """
+    try:
+        return await usage_service.get_usage_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/cache")
+async def get_cache_stats():
+    """
+    공유 캐시 상태 및 이 요청에 응답한 워커(process_pid)의 히트율
+    process_* 값은 워커마다 다르며 여러 번 호출하면 다른 워커의 값이 섞여 보임
+    전체 히트율은 Prometheus 가 모든 워커의 /metrics 를 수집한 뒤
+    conflusum_cache_requests_total 을 worker 라벨을 빼고 합산해서 계산
+    (WORKERS>1 로 한 포트를 공유하면 한 번에 한 워커만 수집되므로 워커별 포트 필요)
+    """
+    try:
+        return await cache_service.get_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/search")
+async def search_pages(q: str = "", limit: int = 10):
+    """
+    조회했던 페이지 로컬 검색 (페이지, 일치한 섹션, 캐시된 페르소나별 요약)
+    """
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="검색어(q)를 입력해주세요.")
+    try:
+        return await search_service.search(
+            q,
+            limit=max(1, min(limit, 50)),
+            personas=list(claude_service.persona_prompts),
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/search/stats")
+async def get_search_stats():
+    """
+    검색 색인 상태 (색인된 페이지/섹션/토큰 수, 파일 크기)
+    """
+    try:
+        return await search_service.get_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/warmer")
+async def get_warmer_report():
+    """
+    캐시 워머 설정, 자주 요청되는 (페이지, 페르소나) 조합, 최근 워밍 실행 결과
+    """
+    try:
+        return await warmer_service.get_report()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/loop")
+async def get_loop_report():
+    """
+    이벤트 루프 지연/정지 기록(정지 중 샘플링한 코드 위치 포함)과 CPU 풀 상태
+    """
+    return {**loop_monitor.get_report(), "cpu_pool": get_cpu_pool().get_stats()}
+
+
+@app.get("/api/scheduler")
+async def get_scheduler_stats():
+    """
+    Claude/Confluence 호출 슬롯의 우선순위별 실행/대기 수 (현재 워커)
+    """
+    return {
+        "claude": claude_service.scheduler.get_stats(),
+        "confluence": confluence_service.scheduler.get_stats(),
+    }
+
+
+@app.get("/api/memory")
+async def get_memory_report(
+    request: Request, diff: str = "previous", limit: Optional[int] = None
+):
+    """
+    워커 메모리 사용량, 구조별 크기, tracemalloc 스냅샷 비교 (MEMORY_MONITOR_ENABLED=true 필요)
+    diff=previous: 마지막 조회 이후 증가분 / diff=baseline: 워커 시작 이후 증가분
+    MEMORY_ADMIN_TOKEN 을 설정하고 X-Admin-Token 헤더로 전달해야 조회 가능
+    """
+    if not memory_service.enabled:
+        raise HTTPException(status_code=404, detail="메모리 모니터가 꺼져 있습니다.")
+    if not memory_service.authorized(request.headers):
+        raise HTTPException(
+            status_code=403,
+            detail="관리자 토큰이 필요합니다. (MEMORY_ADMIN_TOKEN 설정 후 X-Admin-Token 헤더)",
+        )
+    if diff not in ("previous", "baseline"):
+        raise HTTPException(
+            status_code=400, detail="diff 는 previous 또는 baseline 이어야 합니다."
+        )
+    try:
+        return await memory_service.get_report(
+            diff=diff, limit=max(1, min(limit, 100)) if limit else None
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Prometheus 형식 메트릭 (요청 수, 엔드포인트/단계별 지연 시간, 캐시, Mock 폴백)
+    응답한 워커 하나의 값이며 worker 라벨로 구분 - 모든 워커를 수집해 합산해야 함
+    (metrics_service 모듈 설명 참고)
+    """
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 # Mount static files (React frontend) - AFTER API routes
 react_build_path = os.path.join(
     os.path.dirname(os.path.dirname(__file__)), "react-app", "build"
@@ -144,18 +378,59 @@ react_build_path = os.path.join(
 if os.path.exists(react_build_path):
     app.mount(
         "/static",
-        StaticFiles(directory=os.path.join(react_build_path, "static")),
+        PrecompressedStaticFiles(
+            directory=os.path.join(react_build_path, "static"), immutable=True
+        ),
         name="static",
     )
 
 # Mount the React app itself - LAST
 if os.path.exists(react_build_path):
-    app.mount("/", StaticFiles(directory=react_build_path, html=True), name="react-app")
+    app.mount(
+        "/",
+        PrecompressedStaticFiles(directory=react_build_path, html=True),
+        name="react-app",
+    )
+
+
+def _production_server_options() -> dict:
+    """
+    프로덕션 실행 옵션 (APP_ENV=production)
+    - WORKERS 개수만큼 프로세스 실행 (기본: CPU 코어 수)
+    - uvloop / httptools 가 설치되어 있으면 사용
+    - SIGTERM 수신 시 새 연결을 받지 않고 진행 중 요청을 GRACEFUL_SHUTDOWN_TIMEOUT 동안 대기
+    """
+    from importlib.util import find_spec
+
+    return {
+        "host": os.getenv("HOST", "0.0.0.0"),
+        "port": int(os.getenv("PORT", 8000)),
+        "workers": int(os.getenv("WORKERS", os.cpu_count() or 1)),
+        "loop": "uvloop" if find_spec("uvloop") else "asyncio",
+        "http": "httptools" if find_spec("httptools") else "h11",
+        "lifespan": "on",
+        "reload": False,
+        "proxy_headers": True,
+        "access_log": os.getenv("ACCESS_LOG", "false").lower() == "true",
+        "timeout_keep_alive": int(os.getenv("KEEP_ALIVE_TIMEOUT", 5)),
+        "timeout_graceful_shutdown": int(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", 30)),
+    }
+
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "main:app",
-        host=os.getenv("HOST", "127.0.0.1"),
-        port=int(os.getenv("PORT", 8000)),
-        reload=os.getenv("DEBUG", "True").lower() == "true",
-    )
+    import uvicorn
+
+    if os.getenv("APP_ENV", "development").lower() == "production":
+        options = _production_server_options()
+        print(
+            f"프로덕션 모드 실행: workers={options['workers']}, "
+            f"loop={options['loop']}, http={options['http']}"
+        )
+        uvicorn.run("main:app", **options)
+    else:
+        uvicorn.run(
+            "main:app",
+            host=os.getenv("HOST", "127.0.0.1"),
+            port=int(os.getenv("PORT", 8000)),
+            reload=os.getenv("DEBUG", "True").lower() == "true",
+        )
@@ -0,0 +1,171 @@
+"""
+API 응답 직렬화 / 압축
+- FastJSONResponse: orjson 이 설치되어 있으면 사용하는 기본 JSON 응답 클래스
+- CompressionMiddleware: Accept-Encoding 협상으로 일정 크기 이상의 API 응답을 brotli/gzip 압축
+- accepted_encodings: Accept-Encoding 협상 (API 응답 압축과 정적 파일 압축본 선택이 같이 사용)
+"""
+
+import gzip
+import json
+import os
+from typing import Any, List, Optional, Sequence
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성 - 없으면 표준 json 사용
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성 - 없으면 gzip 만 사용
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "text/plain",
+    "text/html",
+    "text/markdown",
+)
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson 기반 JSON 응답 (미설치 시 공백 없는 표준 json 인코딩)"""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(
+            content, ensure_ascii=False, separators=(",", ":"), default=str
+        ).encode("utf-8")
+
+
+def accepted_encodings(accept_encoding: str, available: Sequence[str]) -> List[str]:
+    """
+    available(서버 선호 순서) 중 클라이언트가 허용한 인코딩을 q 값 높은 순서로 반환
+    - 헤더에 없는 인코딩은 '*' 의 q 값을 따름 ('*' 도 없으면 허용하지 않음)
+    - q=0 은 거부, 잘못된 q 값도 거부로 취급
+    - q 값이 같으면 서버 선호 순서
+    빈 목록이면 원본(identity)으로 응답
+    """
+    qvalues = {}
+    for part in accept_encoding.lower().split(","):
+        name, *params = [item.strip() for item in part.split(";")]
+        if not name:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qvalues[name] = q
+
+    ranked = []
+    for order, encoding in enumerate(available):
+        q = qvalues.get(encoding, qvalues.get("*", 0.0))
+        if q > 0:
+            ranked.append((-q, order, encoding))
+    return [encoding for _, _, encoding in sorted(ranked)]
+
+
+def _choose_encoding(accept_encoding: str) -> Optional[str]:
+    """API 응답 압축 인코딩 (brotli 미설치 시 gzip 만)"""
+    available = ("br", "gzip") if brotli is not None else ("gzip",)
+    encodings = accepted_encodings(accept_encoding, available)
+    return encodings[0] if encodings else None
+
+
+class CompressionMiddleware:
+    """
+    /api, /metrics 응답을 협상된 인코딩으로 압축하는 순수 ASGI 미들웨어
+
+    - 단일 body 응답만 압축 (스트리밍 응답은 버퍼링하지 않고 그대로 전달)
+    - 이미 Content-Encoding 이 있는 응답, 작은 응답, 압축 비대상 타입은 건너뜀
+    - 정적 파일은 빌드 타임에 사전 압축되므로 대상이 아님
+    """
+
+    def __init__(self, app, paths=("/api/", "/metrics")):
+        self.app = app
+        self.paths = paths
+        self.minimum_size = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+        self.gzip_level = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+        self.brotli_quality = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = _choose_encoding(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+
+        async def send_wrapper(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                # body 크기를 알 때까지 헤더 전송 보류
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            body = message.get("body", b"")
+            if message.get("more_body", False) or not self._should_compress(
+                start, body
+            ):
+                await send(start)
+                await send(message)
+                return
+
+            compressed = self._compress(body, encoding)
+            headers = [
+                (name, value)
+                for name, value in start["headers"]
+                if name not in (b"content-length", b"vary")
+            ]
+            headers.append((b"content-encoding", encoding.encode("latin-1")))
+            headers.append((b"content-length", str(len(compressed)).encode("latin-1")))
+            headers.append((b"vary", self._vary(start["headers"])))
+            await send({**start, "headers": headers})
+            await send({**message, "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _should_compress(self, start, body: bytes) -> bool:
+        if len(body) < self.minimum_size:
+            return False
+        content_type = b""
+        for name, value in start["headers"]:
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type":
+                content_type = value
+        return content_type.decode("latin-1").startswith(COMPRESSIBLE_TYPES)
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    @staticmethod
+    def _vary(headers) -> bytes:
+        for name, value in headers:
+            if name == b"vary":
+                if b"accept-encoding" in value.lower():
+                    return value
+                return value + b", Accept-Encoding"
+        return b"Accept-Encoding"
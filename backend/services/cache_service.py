@@ -0,0 +1,576 @@
+"""
+캐시 서비스
+워커 간에 공유 가능한 캐시 백엔드 인터페이스와 구현체
+
+- memory: 프로세스 내 LRU (워커마다 별도, 개발/단일 프로세스용)
+- sqlite: 같은 호스트의 워커들이 공유하는 디스크 캐시 (WAL + mmap)
+- redis: Redis 프로토콜(RESP) 서버 - 여러 호스트가 공유 (Redis/Valkey/KeyDB 등)
+
+키 형식: conflusum:v1:{namespace}:{key}
+값은 bytes 로 저장하며 CacheService 가 JSON 직렬화와 네임스페이스별 TTL, 히트율 메트릭을 담당합니다.
+캐시 오류는 요청을 실패시키지 않고 미스로 처리합니다.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from .cpu_pool import run_cpu
+from .metrics_service import record_cache
+
+KEY_PREFIX = "conflusum:v1"
+
+
+class CacheBackend(ABC):
+    """
+    캐시 백엔드 인터페이스 (키: str, 값: bytes, TTL: 초)
+    get/set/delete 를 구현하지 않은 백엔드는 생성 시점에 TypeError
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """값 조회 (없거나 만료되었으면 None)"""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """값 저장 (ttl 이 None 이면 만료 없음)"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """값 삭제 (없으면 무시)"""
+
+    async def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+    def memory_usage(self) -> Optional[Dict[str, Any]]:
+        """이 프로세스 메모리에 들고 있는 캐시 크기 (메모리 모니터용, 프로세스 밖 저장소면 None)"""
+        return None
+
+    def trim(self, fraction: float) -> int:
+        """프로세스 메모리의 캐시를 max_bytes * fraction 이하로 줄임 (제거한 바이트 수)"""
+        return 0
+
+    async def aclose(self) -> None:
+        pass
+
+
+class MemoryLRUCache(CacheBackend):
+    """프로세스 내 LRU 캐시 (전체 값 크기 기준 제거)"""
+
+    name = "memory"
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: "OrderedDict[str, Tuple[Optional[float], bytes]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.time():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        if len(value) > self.max_bytes:
+            return
+        self._remove(key)
+        expires_at = time.time() + ttl if ttl else None
+        self._entries[key] = (expires_at, value)
+        self.total_bytes += len(value)
+        while self.total_bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+
+    async def delete(self, key: str) -> None:
+        self._remove(key)
+
+    async def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def memory_usage(self) -> Optional[Dict[str, Any]]:
+        """네임스페이스별 항목 수/값 크기 (키 문자열 등 객체 오버헤드 제외)"""
+        namespaces: Dict[str, Dict[str, int]] = {}
+        for key, (_, value) in self._entries.items():
+            namespace = key[len(KEY_PREFIX) + 1 :].split(":", 1)[0]
+            usage = namespaces.setdefault(namespace, {"entries": 0, "bytes": 0})
+            usage["entries"] += 1
+            usage["bytes"] += len(value)
+        return {
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "namespaces": namespaces,
+        }
+
+    def trim(self, fraction: float) -> int:
+        target = self.max_bytes * fraction
+        before = self.total_bytes
+        while self._entries and self.total_bytes > target:
+            self._remove(next(iter(self._entries)))
+        return before - self.total_bytes
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= len(entry[1])
+
+
+class SQLiteCache(CacheBackend):
+    """
+    호스트 내 워커 공유 디스크 캐시
+
+    - WAL 모드라 읽기는 쓰기를 막지 않고, mmap 으로 페이지 캐시를 워커 간 공유
+    - 조회 시각(accessed_at) 기준 근사 LRU, 전체 크기가 max_bytes 를 넘으면 오래된 항목부터 제거
+    - 블로킹 SQLite 호출은 스레드 풀에서 실행
+    """
+
+    name = "sqlite"
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS cache (
+        key TEXT PRIMARY KEY,
+        value BLOB NOT NULL,
+        size INTEGER NOT NULL,
+        expires_at REAL,
+        accessed_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache(accessed_at);
+    CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache(expires_at);
+    """
+
+    # 조회할 때마다 쓰기를 하지 않도록 accessed_at 갱신 간격 제한
+    TOUCH_INTERVAL_S = 60.0
+    # N 번 쓸 때마다 만료/용량 정리
+    EVICT_EVERY_SETS = 32
+
+    def __init__(
+        self,
+        db_path: str = "cache_data.db",
+        max_bytes: int = 512 * 1024 * 1024,
+        mmap_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.mmap_bytes = mmap_bytes
+        self._local = threading.local()
+        # 모든 스레드에서 연 연결 (aclose 에서 한꺼번에 닫음)
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._sets_since_evict = 0
+
+        conn = self._connection()
+        conn.executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        스레드별 연결 (sqlite3 연결은 스레드 간 공유 불가)
+        aclose 가 다른 스레드에서 닫을 수 있도록 check_same_thread 는 끔 (사용은 만든 스레드에서만)
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=5.0,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA mmap_size={self.mmap_bytes}")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        if len(value) > self.max_bytes:
+            return
+        self._sets_since_evict += 1
+        evict = self._sets_since_evict >= self.EVICT_EVERY_SETS
+        if evict:
+            self._sets_since_evict = 0
+        await asyncio.to_thread(self._set, key, value, ttl, evict)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(
+            lambda: self._connection().execute(
+                "DELETE FROM cache WHERE key = ?", (key,)
+            )
+        )
+
+    async def stats(self) -> Dict[str, Any]:
+        def _stats():
+            row = (
+                self._connection()
+                .execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache")
+                .fetchone()
+            )
+            return row
+
+        entries, total_bytes = await asyncio.to_thread(_stats)
+        return {
+            "backend": self.name,
+            "path": self.db_path,
+            "entries": entries,
+            "bytes": total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def memory_usage(self) -> Optional[Dict[str, Any]]:
+        # 값은 파일에 있지만 mmap 으로 읽은 페이지는 RSS(파일 매핑 분)에 포함됨
+        return {"mmap_limit_bytes": self.mmap_bytes}
+
+    def _get(self, key: str) -> Optional[bytes]:
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT value, expires_at, accessed_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at, accessed_at = row
+        now = time.time()
+        if expires_at is not None and expires_at <= now:
+            return None
+        if now - accessed_at > self.TOUCH_INTERVAL_S:
+            conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return value
+
+    def _set(self, key: str, value: bytes, ttl: Optional[float], evict: bool) -> None:
+        conn = self._connection()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, size, expires_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (key, value, len(value), now + ttl if ttl else None, now),
+        )
+        if evict:
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """만료 항목 삭제 후 용량 초과분을 오래된 순으로 제거 (목표: max_bytes 의 90%)"""
+        conn.execute(
+            "DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?",
+            (now,),
+        )
+        (total_bytes,) = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM cache"
+        ).fetchone()
+        target = self.max_bytes * 0.9
+        while total_bytes > self.max_bytes:
+            rows = conn.execute(
+                "SELECT key, size FROM cache ORDER BY accessed_at LIMIT 256"
+            ).fetchall()
+            if not rows:
+                break
+            victims = []
+            for key, size in rows:
+                victims.append((key,))
+                total_bytes -= size
+                if total_bytes <= target:
+                    break
+            conn.executemany("DELETE FROM cache WHERE key = ?", victims)
+            if total_bytes <= target:
+                break
+
+    async def aclose(self) -> None:
+        """to_thread 워커 스레드에서 연 연결까지 모두 닫음 (이후 호출은 새로 연결)"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+            self._local = threading.local()
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                print(f"캐시 DB 연결 종료 오류: {str(e)}")
+
+
+class _RedisError(Exception):
+    pass
+
+
+class RedisCache(CacheBackend):
+    """
+    RESP2 프로토콜 캐시 클라이언트 (asyncio 스트림, 의존성 없음)
+
+    크기 기반 제거는 서버 설정(maxmemory + allkeys-lru)에 맡깁니다.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, pool_size: int = 8, timeout: float = 1.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._command("GET", key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        if ttl:
+            await self._command("SET", key, value, "PX", str(int(ttl * 1000)))
+        else:
+            await self._command("SET", key, value)
+
+    async def delete(self, key: str) -> None:
+        await self._command("DEL", key)
+
+    async def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "server": f"{self.host}:{self.port}/{self.db}",
+            "entries": await self._command("DBSIZE"),
+        }
+
+    async def aclose(self) -> None:
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+    async def _connect(self):
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        try:
+            if self.password:
+                await self._roundtrip(reader, writer, ("AUTH", self.password))
+            if self.db:
+                await self._roundtrip(reader, writer, ("SELECT", str(self.db)))
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer
+
+    async def _command(self, *args) -> Any:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.pool_size)
+
+        async with self._semaphore:
+            reader, writer = self._idle.pop() if self._idle else await self._connect()
+            try:
+                reply = await self._roundtrip(reader, writer, args)
+            except BaseException:
+                # 응답을 끝까지 읽지 못한 연결은 재사용하지 않음
+                writer.close()
+                raise
+            self._idle.append((reader, writer))
+
+        if isinstance(reply, _RedisError):
+            raise reply
+        return reply
+
+    async def _roundtrip(self, reader, writer, args) -> Any:
+        writer.write(self._encode(args))
+        await writer.drain()
+        return await asyncio.wait_for(self._read_reply(reader), self.timeout)
+
+    @staticmethod
+    def _encode(args) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+
+    async def _read_reply(self, reader: asyncio.StreamReader) -> Any:
+        line = await reader.readuntil(b"\r\n")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode("utf-8")
+        if kind == b"-":
+            return _RedisError(f"Redis 오류: {payload.decode('utf-8')}")
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = await reader.readexactly(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(payload)
+            if length < 0:
+                return None
+            return [await self._read_reply(reader) for _ in range(length)]
+        raise _RedisError(f"알 수 없는 RESP 응답: {line!r}")
+
+
+def create_cache_backend() -> CacheBackend:
+    """CACHE_BACKEND 환경변수에 따라 백엔드 생성 (memory / sqlite / redis)"""
+    backend = os.getenv("CACHE_BACKEND", "sqlite").lower()
+    if backend == "redis":
+        return RedisCache(
+            os.getenv("CACHE_REDIS_URL", "redis://127.0.0.1:6379/0"),
+            pool_size=int(os.getenv("CACHE_REDIS_POOL_SIZE", "8")),
+            timeout=float(os.getenv("CACHE_REDIS_TIMEOUT", "1.0")),
+        )
+    if backend == "sqlite":
+        return SQLiteCache(
+            os.getenv("CACHE_DB_PATH", "cache_data.db"),
+            max_bytes=int(os.getenv("CACHE_MAX_BYTES", 512 * 1024 * 1024)),
+        )
+    return MemoryLRUCache(max_bytes=int(os.getenv("CACHE_MAX_BYTES", 64 * 1024 * 1024)))
+
+
+def _encode_json(value: Any) -> bytes:
+    """캐시 값 직렬화 (프로세스 풀에서도 실행되므로 모듈 최상위 함수)"""
+    return json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+class CacheService:
+    """네임스페이스/TTL/직렬화/메트릭을 담당하는 캐시 파사드"""
+
+    def __init__(self, backend: Optional[CacheBackend] = None):
+        self.backend = backend or create_cache_backend()
+        self.ttls = {
+            "page": float(os.getenv("CACHE_PAGE_TTL", "300")),
+            "summary": float(os.getenv("CACHE_SUMMARY_TTL", "86400")),
+            "persona": float(os.getenv("CACHE_PERSONA_TTL", "2592000")),
+        }
+        # 페이지 버전/페르소나 → 요약 (검색 결과에 붙이는 용도, 요약과 같은 TTL)
+        self.ttls["page_summary"] = self.ttls["summary"]
+        # 페이지/페르소나 → 마지막으로 생성된 요약 (버전 무관, 데드라인 초과 시 부분 결과용)
+        self.ttls["last_summary"] = float(os.getenv("CACHE_LAST_SUMMARY_TTL", "604800"))
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        print(f"캐시 백엔드: {self.backend.name}")
+
+    @staticmethod
+    def make_key(namespace: str, key: str) -> str:
+        return f"{KEY_PREFIX}:{namespace}:{key}"
+
+    @staticmethod
+    def page_key(url: str, page_id: str) -> str:
+        """
+        페이지 식별 키 (사이트 호스트 + 페이지 ID, 페이지 ID 가 없으면 빈 문자열)
+        다른 사이트/스페이스의 같은 숫자 ID 가 서로의 캐시를 쓰지 않도록 호스트 포함
+        """
+        if not page_id:
+            return ""
+        try:
+            host = urlparse(url).hostname or ""
+        except Exception:
+            host = ""
+        return f"{host}:{page_id}"
+
+    @staticmethod
+    def page_summary_key(page_key: str, version: Any, persona: str) -> str:
+        return f"{page_key}:{version}:{persona}"
+
+    @staticmethod
+    def last_summary_key(page_key: str, persona: str) -> str:
+        return f"{page_key}:{persona}"
+
+    async def get_json(
+        self, namespace: str, key: str, *, record: bool = True
+    ) -> Optional[Any]:
+        """
+        캐시 조회 (미스/오류 시 None, 손상된 값은 삭제하고 미스로 처리)
+        record=False: 있으면 쓰는 부가 조회(검색 결과에 요약 첨부 등) - 히트율 집계에서 제외
+        """
+        value = None
+        try:
+            data = await self.backend.get(self.make_key(namespace, key))
+            if data is not None:
+                # 큰 값(페이지 본문 등)의 역직렬화는 CPU 풀에서
+                value = await run_cpu(
+                    json.loads, data, size=len(data), stage="cache_decode"
+                )
+        except Exception as e:
+            self.errors += 1
+            print(f"캐시 조회 오류 ({namespace}): {str(e)}")
+            if isinstance(e, ValueError):
+                # 일부만 기록되었거나 손상된 값 - 다음 조회에서 다시 채우도록 제거
+                await self.delete(namespace, key)
+
+        hit = value is not None
+        if record:
+            record_cache(namespace, hit)
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return value
+
+    async def set_json(
+        self,
+        namespace: str,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        size_hint: int = 0,
+    ) -> None:
+        """
+        캐시 저장 (ttl 미지정 시 네임스페이스 기본값)
+        size_hint: 값의 대략적인 크기 - 기준 이상이면 직렬화를 CPU 풀에서 수행
+        """
+        try:
+            data = await run_cpu(
+                _encode_json, value, size=size_hint, stage="cache_encode"
+            )
+            await self.backend.set(
+                self.make_key(namespace, key), data, ttl or self.ttls.get(namespace)
+            )
+        except Exception as e:
+            self.errors += 1
+            print(f"캐시 저장 오류 ({namespace}): {str(e)}")
+
+    async def delete(self, namespace: str, key: str) -> None:
+        try:
+            await self.backend.delete(self.make_key(namespace, key))
+        except Exception as e:
+            self.errors += 1
+            print(f"캐시 삭제 오류 ({namespace}): {str(e)}")
+
+    async def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        try:
+            backend_stats = await self.backend.stats()
+        except Exception as e:
+            backend_stats = {"backend": self.backend.name, "error": str(e)}
+        return {
+            **backend_stats,
+            "process_pid": os.getpid(),
+            "process_hits": self.hits,
+            "process_misses": self.misses,
+            "process_errors": self.errors,
+            "process_hit_rate": round(self.hits / total * 100, 1) if total else 0.0,
+        }
+
+    def memory_usage(self) -> Optional[Dict[str, Any]]:
+        return self.backend.memory_usage()
+
+    def trim(self, fraction: float = 0.5) -> int:
+        """메모리 예산 초과 시 프로세스 내 캐시 축소 (제거한 바이트 수)"""
+        return self.backend.trim(fraction)
+
+    async def aclose(self) -> None:
+        await self.backend.aclose()
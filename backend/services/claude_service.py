@@ -3,18 +3,56 @@ Claude AI 서비스
 페르소나별 맞춤형 문서 요약 생성
 """
 
+import asyncio
+import hashlib
 import json
 import os
-from typing import Any, Dict
-
-import httpx
-
-
-class ClaudeService:
-    def __init__(self):
+import time
+from typing import Any, Dict, Optional, Union
+
+from .cache_service import CacheService
+from .deadline import DeadlineExceeded, stage_timeout, within_deadline
+from .document_snapshot import DocumentSnapshot
+from .http_client import PooledClientMixin
+from .metrics_service import (
+    record_cancelled,
+    record_fallback,
+    record_upstream,
+    stage_timer,
+)
+from .scheduler import Preempted, PriorityScheduler
+from .usage_service import UsageService
+
+
+class SummaryUnavailable(Exception):
+    """
+    fallback_to_mock=False 로 호출했을 때 API 오류로 요약을 만들지 못함
+    reason: Mock 폴백 메트릭과 같은 사유 (api_error / exception)
+    """
+
+    def __init__(self, reason: str, detail: str = ""):
+        super().__init__(f"Claude 요약 생성 실패 ({reason}) {detail}".strip())
+        self.reason = reason
+
+
+class ClaudeService(PooledClientMixin):
+    def __init__(
+        self,
+        usage_service: Optional[UsageService] = None,
+        cache_service: Optional[CacheService] = None,
+    ):
+        self.usage_service = usage_service
+        self.cache_service = cache_service
         self.api_key = os.getenv("ANTHROPIC_API_KEY", "")
-        self.api_url = "https://api.anthropic.com/v1/messages"
+        self.api_url = os.getenv(
+            "ANTHROPIC_API_URL", "https://api.anthropic.com/v1/messages"
+        )
         self.model = "claude-3-haiku-20240307"  # Fast and cost-effective for MVP
+        self.max_tokens = 1000
+        # 동시 Claude 호출 수 (워커당) - 요청 우선순위별로 나눠 씀
+        self.scheduler = PriorityScheduler(
+            "claude", int(os.getenv("CLAUDE_MAX_CONCURRENCY", "8"))
+        )
 
         # 페르소나별 프롬프트 템플릿
         self.persona_prompts = {
@@ -153,10 +191,14 @@ class ClaudeService:
         content: str,
         persona: str,
         title: str = "",
-        document_structure: Dict = None,
+        document_structure: Union[DocumentSnapshot, Dict, None] = None,
+        page_url: str = "",
+        fallback_to_mock: bool = True,
     ) -> str:
         """
         페르소나별 맞춤형 요약 생성
+        fallback_to_mock=False 이면 API 오류 시 Mock 요약 대신 SummaryUnavailable 발생
+        (호출한 쪽에서 이전 요약 등으로 대체, API 키 미설정/빈 문서는 그대로 Mock)
         """
         try:
             # 페르소나 프롬프트 가져오기
@@ -167,10 +209,12 @@ class ClaudeService:
             # API 키가 없거나 콘텐츠가 비어있으면 Mock 요약 반환
             if not self.api_key:
                 print("Claude API 키가 설정되지 않았습니다. Mock 요약을 반환합니다.")
+                record_fallback("claude", "no_api_key")
                 return self._generate_mock_summary(persona, title)
 
             if not content.strip():
                 print("문서 내용이 비어있습니다. Mock 요약을 반환합니다.")
+                record_fallback("claude", "empty_content")
                 return self._generate_mock_summary(persona, title)
 
             print(
@@ -178,15 +222,32 @@ class ClaudeService:
             )
 
             # 프롬프트 생성 (헤더 구조 활용)
-            if document_structure and document_structure.get("sections"):
-                prompt = self._generate_structured_prompt(
-                    persona_config, title, document_structure
-                )
-            else:
-                prompt = persona_config["prompt_template"].format(
-                    title=title or "제목 없음",
-                    content=content[:4000],  # Claude 토큰 제한 고려
-                )
+            with stage_timer("prompt_build"):
+                if isinstance(document_structure, dict):
+                    # 기존 구조 dict 호환
+                    document_structure = DocumentSnapshot.from_structure(
+                        document_structure, title
+                    )
+                if document_structure:
+                    prompt = self._generate_structured_prompt(
+                        persona_config, title, document_structure
+                    )
+                else:
+                    prompt = persona_config["prompt_template"].format(
+                        title=title or "제목 없음",
+                        content=content[:4000],  # Claude 토큰 제한 고려
+                    )
+
+            # 같은 모델/프롬프트 요약은 워커 간 공유 캐시에서 재사용
+            cache_key = self._summary_cache_key(prompt)
+            if self.cache_service:
+                cached = await self.cache_service.get_json("summary", cache_key)
+                if cached:
+                    print(f"요약 캐시 적중 - 페르소나: {persona}")
+                    await self._cache_page_summary(
+                        document_structure, persona, cached, page_url
+                    )
+                    return cached["summary"]
 
             # Claude API 호출
             headers = {
@@ -197,32 +258,132 @@ class ClaudeService:
 
             payload = {
                 "model": self.model,
-                "max_tokens": 1000,
+                "max_tokens": self.max_tokens,
                 "messages": [{"role": "user", "content": prompt}],
             }
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    self.api_url, headers=headers, json=payload
+            async with self.scheduler.slot("llm"):
+                started_at = time.perf_counter()
+                client = self._get_client()
+                # 요청 데드라인이 있으면 남은 시간까지만 대기
+                # 요청이 취소되면(클라이언트 연결 끊김 등) 연결을 닫아 생성을 중단
+                try:
+                    with stage_timer("claude_call"):
+                        response = await within_deadline(
+                            client.post(
+                                self.api_url,
+                                headers=headers,
+                                json=payload,
+                                timeout=stage_timeout(30.0, "llm"),
+                            ),
+                            "llm",
+                        )
+                except asyncio.CancelledError:
+                    print(f"Claude API 호출 취소 - 페르소나: {persona}")
+                    record_cancelled("claude")
+                    raise
+                latency_ms = (time.perf_counter() - started_at) * 1000
+            record_upstream("claude", response.status_code)
+
+            if response.status_code == 200:
+                result = response.json()
+                summary = result["content"][0]["text"]
+                self._record_usage(
+                    result.get("model", self.model),
+                    persona,
+                    page_url,
+                    result.get("usage"),
+                    latency_ms,
                 )
-
-                if response.status_code == 200:
-                    result = response.json()
-                    summary = result["content"][0]["text"]
-                    print(f"Claude API 호출 성공 - 요약 길이: {len(summary)}")
-                    return summary
-                else:
-                    print(
-                        f"Claude API 호출 실패: {response.status_code} - {response.text}"
+                print(f"Claude API 호출 성공 - 요약 길이: {len(summary)}")
+                if self.cache_service:
+                    cached = {
+                        "summary": summary,
+                        "model": self.model,
+                        "persona": persona,
+                    }
+                    await self.cache_service.set_json("summary", cache_key, cached)
+                    await self._cache_page_summary(
+                        document_structure, persona, cached, page_url
                     )
-                    # API 호출 실패 시 Mock 요약 반환
-                    return self._generate_mock_summary(persona, title)
+                return summary
+            else:
+                self._record_usage(
+                    self.model, persona, page_url, None, latency_ms, success=False
+                )
+                print(f"Claude API 호출 실패: {response.status_code} - {response.text}")
+                if not fallback_to_mock:
+                    raise SummaryUnavailable(
+                        "api_error", f"status={response.status_code}"
+                    )
+                # API 호출 실패 시 Mock 요약 반환
+                record_fallback("claude", "api_error")
+                return self._generate_mock_summary(persona, title)
 
+        except (DeadlineExceeded, SummaryUnavailable, Preempted):
+            # Mock 요약 대신 호출한 쪽에서 부분 결과/이전 요약으로 응답 (밀려난 background 작업은 포기)
+            raise
         except Exception as e:
             print(f"Claude 요약 생성 오류: {str(e)}")
+            if not fallback_to_mock:
+                raise SummaryUnavailable("exception", str(e)) from e
             # 오류 발생 시 Mock 요약 반환
+            record_fallback("claude", "exception")
             return self._generate_mock_summary(persona, title)
 
+    async def _cache_page_summary(
+        self, snapshot: Any, persona: str, cached: Dict[str, Any], page_url: str
+    ) -> None:
+        """
+        페이지 버전별 요약 별칭 저장 (검색 결과에서 프롬프트 없이 찾기 위함)
+        버전과 무관한 페이지/페르소나별 마지막 요약도 함께 저장 (데드라인 초과 시 부분 결과용)
+        키는 페이지 캐시와 같은 호스트 + 페이지 ID
+        """
+        if (
+            not isinstance(snapshot, DocumentSnapshot)
+            or not page_url
+            or snapshot.version is None
+        ):
+            return
+        page_key = CacheService.page_key(page_url, snapshot.page_id)
+        if not page_key:
+            return
+        await self.cache_service.set_json(
+            "page_summary",
+            CacheService.page_summary_key(page_key, snapshot.version, persona),
+            cached,
+        )
+        await self.cache_service.set_json(
+            "last_summary",
+            CacheService.last_summary_key(page_key, persona),
+            {**cached, "version": snapshot.version, "title": snapshot.title},
+        )
+
+    def _summary_cache_key(self, prompt: str) -> str:
+        """요약 캐시 키 (모델 + 최대 토큰 + 프롬프트 해시)"""
+        return hashlib.sha256(
+            f"{self.model}\n{self.max_tokens}\n{prompt}".encode("utf-8")
+        ).hexdigest()
+
+    def _record_usage(
+        self,
+        model: str,
+        persona: str,
+        page_url: str,
+        usage: Optional[Dict[str, Any]],
+        latency_ms: float,
+        success: bool = True,
+    ) -> None:
+        """Claude API 응답의 usage 블록을 사용량 서비스에 기록"""
+        if not self.usage_service:
+            return
+        try:
+            self.usage_service.record_usage(
+                model, persona, page_url, usage, latency_ms, success=success
+            )
+        except Exception as e:
+            print(f"Claude 사용량 기록 오류: {str(e)}")
+
     def _generate_mock_summary(self, persona: str, title: str) -> str:
         """Mock 요약 생성 (개발/테스트용)"""
 
@@ -312,24 +473,20 @@ class ClaudeService:
         return mock_summaries.get(persona, mock_summaries["developer"])
 
     def _generate_structured_prompt(
-        self, persona_config: Dict, title: str, document_structure: Dict
+        self, persona_config: Dict, title: str, snapshot: DocumentSnapshot
     ) -> str:
         """
         문서 구조를 활용한 구조화된 프롬프트 생성
+        (섹션 본문은 스냅샷에서 필요한 500자만 잘라 사용)
         """
         persona_name = persona_config["name"]
         focus_areas = persona_config["focus_areas"]
 
         # 헤더별 내용 정리
         sections_content = ""
-        for i, section in enumerate(
-            document_structure.get("sections", [])[:10]
-        ):  # 최대 10개 섹션
-            content = document_structure["content_by_section"].get(section, "")
-            if content.strip():
-                sections_content += (
-                    f"\n### {section}\n{content[:500]}\n"  # 각 섹션당 500자 제한
-                )
+        for section in snapshot.iter_sections(10):  # 최대 10개 섹션
+            if not section.is_blank():
+                sections_content += f"\n### {section.name}\n{section.head(500)}\n"  # 각 섹션당 500자 제한
 
         # 구조화된 프롬프트 템플릿
         structured_prompt = f"""당신은 경험 많은 {persona_name}입니다. 다음 Confluence 문서를 {persona_name} 관점에서 헤더 구조에 따라 체계적으로 요약해주세요.
@@ -3,20 +3,57 @@ Confluence 서비스
 문서 URL 검증 및 콘텐츠 추출
 """
 
+import asyncio
 import base64
 import json
 import os
 import re
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from urllib.parse import parse_qs, urlparse
 
-import httpx
-
+from .cache_service import CacheService
+from .deadline import (
+    DeadlineExceeded,
+    stage_timeout,
+    within_deadline,
+    without_deadline,
+)
+from .cpu_pool import run_cpu
+from .document_snapshot import DocumentSnapshot, scan_structure
+from .http_client import PooledClientMixin
+from .json_stream import (
+    PAGE_FIELDS,
+    PageTooLarge,
+    TextCleaner,
+    size_policy_from_env,
+    stream_json_fields,
+)
 from .mcp_confluence_service import MCPConfluenceService
-
-
-class ConfluenceService:
-    def __init__(self):
+from .scheduler import (
+    Preempted,
+    PriorityScheduler,
+    create_joinable_task,
+    current_priority,
+    joining,
+)
+from .search_service import SearchService
+from .metrics_service import (
+    record_cancelled,
+    record_fallback,
+    record_stage,
+    record_upstream,
+    stage_timer,
+)
+
+
+class ConfluenceService(PooledClientMixin):
+    def __init__(
+        self,
+        cache_service: Optional[CacheService] = None,
+        search_service: Optional[SearchService] = None,
+    ):
+        self.cache_service = cache_service
+        self.search_service = search_service
         self.base_url = os.getenv("CONFLUENCE_BASE_URL", "")
         self.username = os.getenv("CONFLUENCE_USERNAME", "")
         self.api_token = os.getenv("CONFLUENCE_API_TOKEN", "")
@@ -31,6 +68,36 @@ class ConfluenceService:
         # MCP Confluence 서비스 초기화
         self.mcp_service = MCPConfluenceService()
 
+        # 페이지 응답 크기 상한 (초과 시 truncate / reject)
+        self.max_response_bytes, self.oversize_policy = size_policy_from_env()
+
+        # 검증 시 본문 프리페치 여부, 진행 중인 페이지 조회(single-flight)
+        self.prefetch_on_validate = (
+            os.getenv("PREFETCH_ON_VALIDATE", "true").lower() == "true"
+        )
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._fetch_waiters: Dict[asyncio.Task, int] = {}
+        self._background_tasks = set()
+        # 동시 Confluence 호출 수 (워커당) - 요청 우선순위별로 나눠 씀
+        self.scheduler = PriorityScheduler(
+            "confluence", int(os.getenv("CONFLUENCE_MAX_CONCURRENCY", "16"))
+        )
+
+    async def aclose(self) -> None:
+        """진행 중인 프리페치 취소 및 커넥션 풀 종료"""
+        for task in list(self._background_tasks) + list(self._inflight.values()):
+            task.cancel()
+        await self.mcp_service.aclose()
+        await super().aclose()
+
+    def memory_stats(self) -> Dict[str, int]:
+        """메모리 모니터용 - 진행 중인 조회(본문을 들고 있음)와 백그라운드 작업 수"""
+        return {
+            "inflight_fetches": len(self._inflight),
+            "fetch_waiters": sum(self._fetch_waiters.values()),
+            "background_tasks": len(self._background_tasks),
+        }
+
     async def validate_url(self, url: str) -> Dict[str, Any]:
         """
         Confluence URL 유효성 검증
@@ -52,18 +119,45 @@ class ConfluenceService:
             page_id = self._extract_page_id(url)
             print(f"추출된 페이지 ID: {page_id}")
 
-            if not page_id:
-                page_id = "123456"  # 기본값
+            if not page_id or not self.base_url or not self.auth_header:
+                # 페이지 ID 를 알 수 없거나 API 정보가 없으면 Mock 페이지 정보 반환 (MVP용)
+                page_info = self._get_mock_page_info(page_id or "123456")
+                print(f"페이지 정보: {page_info}")
 
-            # Mock 페이지 정보 반환 (API 연동 없이)
-            page_info = self._get_mock_page_info(page_id)
+                return {
+                    "valid": True,
+                    "title": page_info.get("title", ""),
+                    "message": "유효한 Confluence 문서입니다.",
+                }
+
+            # 메타데이터/권한만 확인 (본문은 조회하지 않음)
+            page_info = await self._get_page_info(page_id)
+            status = page_info.get("status")
             print(f"페이지 정보: {page_info}")
 
-            return {
-                "valid": True,
-                "title": page_info.get("title", ""),
-                "message": "유효한 Confluence 문서입니다.",
-            }
+            if status == 200:
+                # 사용자가 페르소나를 고르는 동안 본문 조회/파싱을 미리 수행
+                if self.prefetch_on_validate:
+                    self._schedule_prefetch(url, page_id, page_info.get("version"))
+                return {
+                    "valid": True,
+                    "title": page_info.get("title", ""),
+                    "message": "유효한 Confluence 문서입니다.",
+                }
+
+            if status in (401, 403):
+                message = (
+                    "문서에 접근할 권한이 없습니다. Confluence 권한을 확인해주세요."
+                )
+            elif status == 404:
+                message = "문서를 찾을 수 없습니다. URL 또는 접근 권한을 확인해주세요."
+            elif status == 0:
+                message = "Confluence 서버에 연결할 수 없습니다."
+            else:
+                message = (
+                    f"Confluence 문서를 확인하지 못했습니다. (상태 코드: {status})"
+                )
+            return {"valid": False, "message": message}
 
         except Exception as e:
             print(f"URL 검증 중 예외 발생: {str(e)}")
@@ -75,65 +169,261 @@ class ConfluenceService:
                 "message": f"URL 검증 중 오류가 발생했습니다: {str(e)}",
             }
 
+    async def get_page_info(self, url: str) -> Dict[str, Any]:
+        """
+        URL 의 페이지 메타데이터(제목/버전) 조회 - 본문 제외
+        page_id 포함, status: HTTP 상태 코드 (페이지 ID 를 알 수 없으면 404, 연결 실패 시 0)
+        """
+        page_id = self._extract_page_id(url)
+        if not page_id:
+            return {"page_id": "", "status": 404}
+        return {**await self._get_page_info(page_id), "page_id": page_id}
+
     async def get_document_content(self, url: str) -> Dict[str, Any]:
         """
         Confluence 문서 콘텐츠 가져오기 (헤더 구조 포함)
+        같은 페이지 조회가 이미 진행 중이면(검증 시 프리페치 등) 그 결과를 함께 사용
+        """
+        page_id = self._extract_page_id(url)
+        cache_key = self._page_cache_key(url, page_id)
+        if not cache_key:
+            return await self._fetch_document(url, page_id, cache_key)
+
+        inflight = self._inflight.get(cache_key)
+        if inflight is None and self.cache_service:
+            cached = await self.cache_service.get_json("page", cache_key)
+            if cached and "text" in cached:
+                return self._document_from_snapshot(
+                    DocumentSnapshot.from_dict(cached), url
+                )
+            # 캐시 조회 중 다른 요청이 조회를 시작했을 수 있음
+            inflight = self._inflight.get(cache_key)
+        if inflight is None:
+            inflight = self._start_fetch(url, page_id, cache_key)
+
+        # 공유 조회의 우선순위는 기다리는 요청 중 가장 높은 것을 따르고,
+        # 데드라인은 각 요청이 기다리는 시간에만 적용 (조회 자체는 단계 기본 타임아웃)
+        try:
+            document = await self._join_fetch(cache_key, inflight)
+        except Preempted:
+            # background 작업이 시작한 조회가 대기 중 밀려남 - 더 높은 우선순위면 다시 조회
+            if current_priority() == "background":
+                raise
+            if self._inflight.get(cache_key) is inflight:
+                del self._inflight[cache_key]
+            inflight = self._inflight.get(cache_key) or self._start_fetch(
+                url, page_id, cache_key
+            )
+            document = await self._join_fetch(cache_key, inflight)
+        return {**document, "url": url}
+
+    async def _join_fetch(
+        self, cache_key: str, inflight: asyncio.Task
+    ) -> Dict[str, Any]:
+        """
+        공유 조회 결과 대기 (조회별 대기자 수 관리)
+        각 대기자는 자신의 데드라인까지만 기다림 (DeadlineExceeded)
+        워머/크롤이 시작한 조회라도 interactive 요청이 기다리면 interactive 로 올라감
+        데드라인이 지나도 조회는 끝까지 진행해 캐시를 채우지만, 기다리던 쪽이 모두 취소되면
+        (클라이언트 연결 끊김 등) 받을 곳이 없으므로 조회도 취소
+        """
+        self._fetch_waiters[inflight] = self._fetch_waiters.get(inflight, 0) + 1
+        try:
+            with joining(inflight):
+                return await within_deadline(asyncio.shield(inflight), "fetch")
+        except asyncio.CancelledError:
+            if self._fetch_waiters[inflight] == 1 and not inflight.done():
+                print(f"기다리는 요청이 없어 페이지 조회 취소: {cache_key}")
+                inflight.cancel()
+                record_cancelled("confluence")
+            raise
+        finally:
+            self._fetch_waiters[inflight] -= 1
+            if self._fetch_waiters[inflight] <= 0:
+                del self._fetch_waiters[inflight]
+
+    def _start_fetch(self, url: str, page_id: str, cache_key: str) -> asyncio.Task:
+        """
+        페이지별 단일 조회 태스크 시작 (single-flight)
+        태스크는 시작한 요청의 데드라인을 물려받지 않음 (다른 대기자가 더 늦은 데드라인을 가질 수 있음)
+        """
+        with without_deadline():
+            task = create_joinable_task(self._fetch_document(url, page_id, cache_key))
+        self._inflight[cache_key] = task
+
+        def _done(finished: asyncio.Task) -> None:
+            if self._inflight.get(cache_key) is finished:
+                del self._inflight[cache_key]
+
+        task.add_done_callback(_done)
+        return task
+
+    def _schedule_prefetch(self, url: str, page_id: str, version: Any) -> None:
+        """검증 직후 본문 조회/파싱을 백그라운드로 시작해 페이지 캐시를 미리 채움"""
+        self._spawn(self._prefetch(url, page_id, version))
+
+    def _spawn(self, coro) -> None:
+        """응답과 무관한 백그라운드 작업 (참조를 보관해 GC 로 사라지지 않게 함)"""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _prefetch(self, url: str, page_id: str, version: Any) -> None:
+        cache_key = self._page_cache_key(url, page_id)
+        if not cache_key or cache_key in self._inflight:
+            return
+        try:
+            if self.cache_service:
+                cached = await self.cache_service.get_json("page", cache_key)
+                # 캐시된 버전이 최신이면 다시 가져오지 않음
+                if cached and (version is None or cached.get("version") == version):
+                    return
+            if cache_key not in self._inflight:
+                print(f"페이지 프리페치 시작: {page_id}")
+                # 프리페치도 대기자로 남아 요청이 끊겨도 조회를 끝까지 진행
+                await self._join_fetch(
+                    cache_key, self._start_fetch(url, page_id, cache_key)
+                )
+        except Exception as e:
+            print(f"페이지 프리페치 오류: {str(e)}")
+
+    async def _fetch_document(
+        self, url: str, page_id: str, cache_key: str
+    ) -> Dict[str, Any]:
+        """
+        문서 조회 및 구조 파싱 (MCP → REST API → Mock 순서), 실제 문서는 페이지 캐시에 저장
         """
         try:
             # 1. MCP Atlassian을 통한 실제 문서 가져오기 시도
-            mcp_content = await self.mcp_service.get_document_content(url)
+            async with self.scheduler.slot("fetch"):
+                mcp_content = await self.mcp_service.get_document_content(url)
 
             if mcp_content and mcp_content.get("content"):
-                page_id = self._extract_page_id(url) or "extracted_from_mcp"
+                page_id = page_id or "extracted_from_mcp"
                 content = mcp_content.get("content", "")
                 print(f"파싱할 문서 내용 샘플 (처음 500자): {content[:500]}")
-                structure = self.parse_document_structure(content)
-                print(
-                    f"파싱된 구조: 섹션 수 {len(structure.get('sections', []))}, 섹션명: {structure.get('sections', [][:3])}"
+                snapshot = await self._parse_snapshot(
+                    content,
+                    page_id,
+                    mcp_content.get("version"),
+                    mcp_content.get("title", ""),
+                    mcp_content.get("truncated", False),
                 )
-
-                return {
-                    "title": mcp_content.get("title", ""),
-                    "content": content,
-                    "structure": structure,
-                    "url": url,
-                    "page_id": page_id,
-                }
+                await self._cache_snapshot(cache_key, snapshot, url)
+                return self._document_from_snapshot(snapshot, url)
 
             # 2. MCP 실패 시 기존 API 방식 시도
-            page_id = self._extract_page_id(url)
-
             if page_id:
-                content_data = await self._get_page_content(page_id)
+                async with self.scheduler.slot("fetch"):
+                    content_data = await self._get_page_content(page_id)
 
                 if content_data:
-                    clean_content = self._extract_text_from_html(
-                        content_data.get("body", "")
-                    )
+                    # API 응답은 스트리밍 중에 이미 정리됨 (Mock 은 HTML 본문)
+                    clean_content = content_data.get("text")
+                    if clean_content is None:
+                        with stage_timer("html_cleanup"):
+                            clean_content = self._extract_text_from_html(
+                                content_data.get("body", "")
+                            )
                     print(
                         f"파싱할 HTML 정리된 내용 샘플 (처음 500자): {clean_content[:500]}"
                     )
-                    structure = self.parse_document_structure(clean_content)
-                    print(
-                        f"파싱된 구조: 섹션 수 {len(structure.get('sections', []))}, 섹션명: {structure.get('sections', [][:3])}"
+                    snapshot = await self._parse_snapshot(
+                        clean_content,
+                        page_id,
+                        content_data.get("version"),
+                        content_data.get("title", ""),
+                        content_data.get("truncated", False),
                     )
-
-                    return {
-                        "title": content_data.get("title", ""),
-                        "content": clean_content,
-                        "structure": structure,
-                        "url": url,
-                        "page_id": page_id,
-                    }
+                    if not content_data.get("mock"):
+                        await self._cache_snapshot(cache_key, snapshot, url)
+                    return self._document_from_snapshot(snapshot, url)
 
             # 3. 모든 방법 실패 시 Mock 데이터 사용
+            record_fallback("confluence", "fetch_failed")
             return self._get_mock_document_content(url)
 
+        except PageTooLarge:
+            # 크기 상한 초과 - Mock 요약으로 대체하면 문서 내용이 없는 것처럼 보이므로 그대로 알림
+            record_fallback("confluence", "too_large")
+            raise
+        except (DeadlineExceeded, Preempted):
+            # 데드라인 초과/밀려난 background 조회는 Mock 으로 대체하지 않고 호출한 쪽에서 처리
+            raise
         except Exception as e:
             print(f"문서 콘텐츠 조회 오류: {str(e)}")
             # 오류 발생 시 Mock 데이터로 폴백
+            record_fallback("confluence", "exception")
             return self._get_mock_document_content(url)
 
+    def page_key(self, url: str) -> str:
+        """URL 의 페이지 식별 키 (사이트 호스트 + 페이지 ID, Confluence 페이지가 아니면 빈 문자열)"""
+        return self._page_cache_key(url, self._extract_page_id(url))
+
+    def _page_cache_key(self, url: str, page_id: str) -> str:
+        """페이지 캐시 키 (사이트 호스트 + 페이지 ID)"""
+        return CacheService.page_key(url, page_id)
+
+    async def _parse_snapshot(
+        self,
+        content: str,
+        page_id: str,
+        version: Any,
+        title: str,
+        truncated: bool = False,
+    ) -> DocumentSnapshot:
+        """
+        정리된 본문을 헤더 구조로 파싱한 스냅샷 생성
+        큰 문서는 구조 계산을 CPU 풀에서 수행 (이벤트 루프를 막지 않도록)
+        truncated: 응답 크기 상한에서 잘려 앞부분만 있는 문서
+        """
+        with stage_timer("parse_structure"):
+            scan = await run_cpu(
+                scan_structure, content, size=len(content), stage="parse_structure"
+            )
+            snapshot = DocumentSnapshot.from_scan(
+                content,
+                scan,
+                page_id=page_id,
+                version=version,
+                title=title,
+                truncated=truncated,
+            )
+        print(
+            f"파싱된 구조: 섹션 수 {len(snapshot)}, 섹션명: {list(snapshot.names[:3])}"
+        )
+        return snapshot
+
+    def _document_from_snapshot(
+        self, snapshot: DocumentSnapshot, url: str
+    ) -> Dict[str, Any]:
+        """
+        파이프라인에 전달하는 문서 dict
+        content 는 스냅샷 텍스트와 같은 문자열 객체(복사본 아님)
+        """
+        return {
+            "title": snapshot.title,
+            "content": snapshot.text,
+            "snapshot": snapshot,
+            "url": url,
+            "page_id": snapshot.page_id,
+            "version": snapshot.version,
+            "truncated": snapshot.truncated,
+        }
+
+    async def _cache_snapshot(
+        self, cache_key: str, snapshot: DocumentSnapshot, url: str
+    ) -> None:
+        """실제 조회한 문서 스냅샷을 페이지 캐시에 저장하고 검색 색인 갱신(백그라운드)"""
+        if not cache_key:
+            return
+        if self.search_service:
+            self._spawn(self.search_service.index_snapshot(cache_key, url, snapshot))
+        if self.cache_service:
+            await self.cache_service.set_json(
+                "page", cache_key, snapshot.to_dict(), size_hint=len(snapshot.text)
+            )
+
     def _is_confluence_url(self, url: str) -> bool:
         """Confluence URL 형식 검증"""
         try:
@@ -174,61 +464,107 @@ class ConfluenceService:
             return ""
 
     async def _get_page_info(self, page_id: str) -> Dict[str, Any]:
-        """Confluence API로 페이지 기본 정보 조회"""
-        try:
-            if not self.base_url or not self.auth_header:
-                # API 정보가 없을 때는 Mock 데이터 반환 (MVP용)
-                return self._get_mock_page_info(page_id)
+        """
+        Confluence API로 페이지 기본 정보(제목/버전) 조회 - 본문 제외
+        status: HTTP 상태 코드 (연결 실패 시 0)
+        """
+        if not self.base_url or not self.auth_header:
+            # API 정보가 없을 때는 Mock 데이터 반환 (MVP용)
+            return {**self._get_mock_page_info(page_id), "status": 200}
 
-            api_url = f"{self.base_url}/rest/api/content/{page_id}"
+        try:
+            api_url = f"{self.base_url}/rest/api/content/{page_id}?expand=version"
 
             headers = {
                 "Authorization": f"Basic {self.auth_header}",
                 "Accept": "application/json",
             }
 
-            async with httpx.AsyncClient() as client:
-                response = await client.get(api_url, headers=headers)
+            client = self._get_client()
+            async with self.scheduler.slot("metadata"):
+                with stage_timer("confluence_metadata"):
+                    response = await client.get(api_url, headers=headers, timeout=5.0)
+            record_upstream("confluence", response.status_code)
 
-                if response.status_code == 200:
-                    return response.json()
-                else:
-                    return None
+            if response.status_code != 200:
+                return {"id": page_id, "status": response.status_code}
 
-        except Exception:
-            # API 호출 실패 시 Mock 데이터 반환
-            return self._get_mock_page_info(page_id)
+            data = response.json()
+            return {
+                "id": data.get("id", page_id),
+                "title": data.get("title", ""),
+                "type": data.get("type", "page"),
+                "version": data.get("version", {}).get("number"),
+                "status": 200,
+            }
+
+        except Preempted:
+            raise
+        except Exception as e:
+            print(f"페이지 정보 조회 오류: {str(e)}")
+            return {"id": page_id, "status": 0}
 
     async def _get_page_content(self, page_id: str) -> Dict[str, Any]:
         """Confluence API로 페이지 콘텐츠 조회"""
         try:
             if not self.base_url or not self.auth_header:
                 # API 정보가 없을 때는 Mock 데이터 반환 (MVP용)
+                record_fallback("confluence", "no_credentials")
                 return self._get_mock_page_content(page_id)
 
-            api_url = f"{self.base_url}/rest/api/content/{page_id}?expand=body.storage"
+            api_url = f"{self.base_url}/rest/api/content/{page_id}?expand=body.storage,version"
 
             headers = {
                 "Authorization": f"Basic {self.auth_header}",
                 "Accept": "application/json",
             }
 
-            async with httpx.AsyncClient() as client:
-                response = await client.get(api_url, headers=headers)
+            client = self._get_client()
+            # 응답 전체를 올리지 않고 스트리밍으로 필요한 필드만 추출,
+            # 본문은 받는 대로 태그 경계 단위로 텍스트 정리
+            cleaner = TextCleaner(self._extract_text_from_html)
+            with stage_timer("confluence_fetch"):
+                response = await within_deadline(
+                    stream_json_fields(
+                        client,
+                        api_url,
+                        PAGE_FIELDS,
+                        headers=headers,
+                        timeout=stage_timeout(5.0, "fetch"),
+                        max_bytes=self.max_response_bytes,
+                        oversize_policy=self.oversize_policy,
+                        sinks={"body.storage.value": cleaner},
+                    ),
+                    "fetch",
+                )
+            record_upstream("confluence", response["status"])
 
-                if response.status_code == 200:
-                    data = response.json()
-                    return {
-                        "title": data.get("title", ""),
-                        "body": data.get("body", {})
-                        .get("storage", {})
-                        .get("value", ""),
-                    }
-                else:
-                    return None
+            if response["too_large"]:
+                print(
+                    f"페이지 응답이 {self.max_response_bytes} bytes 를 초과해 거부합니다."
+                )
+                raise PageTooLarge(self.max_response_bytes)
+            if response["status"] == 200:
+                fields = response["fields"]
+                if response["truncated"]:
+                    print(
+                        f"페이지 응답이 {self.max_response_bytes} bytes 에서 잘렸습니다."
+                    )
+                record_stage("html_cleanup", cleaner.seconds)
+                return {
+                    "title": fields.get("title") or "",
+                    "text": fields.get("body.storage.value") or "",
+                    "version": fields.get("version.number"),
+                    "truncated": response["truncated"],
+                }
+            else:
+                return None
 
+        except (DeadlineExceeded, PageTooLarge):
+            raise
         except Exception:
             # API 호출 실패 시 Mock 데이터 반환
+            record_fallback("confluence", "exception")
             return self._get_mock_page_content(page_id)
 
     def _extract_text_from_html(self, html_content: str) -> str:
@@ -252,99 +588,9 @@ class ConfluenceService:
     def parse_document_structure(self, content: str) -> Dict[str, Any]:
         """
         문서 내용을 헤더 구조로 파싱
+        (호환용 - 파이프라인은 DocumentSnapshot.parse 결과를 그대로 사용)
         """
-        try:
-            import re
-
-            # 헤더 패턴 정의 (다양한 형식 지원)
-            header_patterns = [
-                (r"^#{1,6}\s+(.+)$", "markdown"),  # Markdown headers
-                (r"^(\d{2}\.\s+.+)$", "double_digit"),  # 00. 01. 10. etc.
-                (r"^(\d{1,2}\.\s+.+)$", "numbered"),  # 1. 2. 3. ... 99.
-                (
-                    r"^([가-힣]+)\s*:\s*(.*)$",
-                    "korean_colon",
-                ),  # Korean sections with colon
-                (
-                    r"^([A-Z][a-z]+)\s*:\s*(.*)$",
-                    "english_colon",
-                ),  # English sections with colon
-                (r"^\*{1,3}\s*(.+)$", "bullet"),  # Bullet points
-                (r"^(.+)\n={3,}$", "underline_equal"),  # Underlined with =
-                (r"^(.+)\n-{3,}$", "underline_dash"),  # Underlined with -
-            ]
-
-            lines = content.split("\n")
-            structure = {"title": "", "sections": [], "content_by_section": {}}
-
-            current_section = None
-            current_content = []
-
-            for i, line in enumerate(lines):
-                line = line.strip()
-                if not line:
-                    continue
-
-                # 특정 라인 디버깅
-                if "00." in line or "들어가기" in line:
-                    print(f"디버깅 라인 {i}: '{line}'")
-
-                # 헤더 검출
-                header_found = False
-                for pattern_tuple in header_patterns:
-                    pattern, pattern_type = pattern_tuple
-                    match = re.match(pattern, line, re.MULTILINE)
-                    if match:
-                        print(f"헤더 감지: '{line}' -> 패턴 타입: {pattern_type}")
-                        # 이전 섹션 저장
-                        if current_section:
-                            structure["content_by_section"][current_section] = (
-                                "\n".join(current_content)
-                            )
-
-                        # 새 섹션 시작
-                        if pattern_type == "markdown":
-                            current_section = match.group(1).strip()
-                        elif pattern_type in ["numbered", "double_digit"]:
-                            current_section = match.group(1).strip()
-                        elif pattern_type in ["korean_colon", "english_colon"]:
-                            if len(match.groups()) >= 2 and match.group(2).strip():
-                                current_section = f"{match.group(1).strip()}: {match.group(2).strip()}"
-                            else:
-                                current_section = match.group(1).strip()
-                        elif pattern_type == "bullet":
-                            current_section = match.group(1).strip()
-                        else:  # underline types
-                            current_section = match.group(1).strip()
-
-                        structure["sections"].append(current_section)
-                        current_content = []
-                        header_found = True
-                        break
-
-                # 헤더가 아니면 현재 섹션의 내용으로 추가
-                if not header_found:
-                    if not structure["title"] and not current_section:
-                        structure["title"] = line  # 첫 번째 줄을 제목으로 사용
-                    else:
-                        current_content.append(line)
-
-            # 마지막 섹션 저장
-            if current_section:
-                structure["content_by_section"][current_section] = "\n".join(
-                    current_content
-                )
-
-            return structure
-
-        except Exception as e:
-            print(f"문서 구조 파싱 오류: {str(e)}")
-            # 파싱 실패 시 전체 내용을 하나의 섹션으로 처리
-            return {
-                "title": "",
-                "sections": ["전체 내용"],
-                "content_by_section": {"전체 내용": content},
-            }
+        return DocumentSnapshot.parse(content).to_structure()
 
     def _get_mock_page_info(self, page_id: str) -> Dict[str, Any]:
         """Mock 페이지 정보 (개발/테스트용)"""
@@ -389,19 +635,18 @@ class ConfluenceService:
         - 요약 품질 개선을 위한 지속적인 프롬프트 튜닝
         """
 
-        return {"title": "ConfluSum 프로젝트 개발 문서", "body": mock_content}
+        return {
+            "title": "ConfluSum 프로젝트 개발 문서",
+            "body": mock_content,
+            "mock": True,
+        }
 
     def _get_mock_document_content(self, url: str) -> Dict[str, Any]:
         """Mock 문서 콘텐츠 반환 (URL 기반, 헤더 구조 포함)"""
         page_id = self._extract_page_id(url) or "123456"
         content_data = self._get_mock_page_content(page_id)
         clean_content = self._extract_text_from_html(content_data.get("body", ""))
-        structure = self.parse_document_structure(clean_content)
-
-        return {
-            "title": content_data.get("title", ""),
-            "content": clean_content,
-            "structure": structure,
-            "url": url,
-            "page_id": page_id,
-        }
+        snapshot = DocumentSnapshot.parse(
+            clean_content, page_id=page_id, title=content_data.get("title", "")
+        )
+        return self._document_from_snapshot(snapshot, url)
@@ -0,0 +1,150 @@
+"""
+CPU 작업 풀
+큰 문서의 헤더 구조 파싱, 대용량 캐시 값 직렬화처럼 이벤트 루프를 오래 붙잡는 CPU 작업을
+입력 크기가 CPU_OFFLOAD_MIN_SIZE 이상일 때만 별도 실행기로 넘깁니다.
+
+- process (기본): 프로세스 풀
+  GIL 을 잡은 채 도는 C 코드(json 인코딩/디코딩 등)도 루프와 병렬로 실행됨
+  인자/결과는 pickle 로 전달되므로 모듈 최상위 함수만 넘길 수 있음
+  fork 가능한 플랫폼에서는 워커 시작 시(다른 스레드가 생기기 전) 풀 프로세스를 한 번에 fork
+  (spawn 은 __main__ 모듈을 다시 실행하므로 main 가드가 없는 스크립트/테스트에서 깨짐)
+  풀 프로세스가 비정상 종료되면 그 작업은 스레드로 실행하고, 이미 다른 스레드(uvicorn,
+  루프 모니터, SQLite 기록 등)가 도는 중이므로 새 풀은 fork 대신 forkserver/spawn 으로 생성
+- thread: 스레드 풀 - 순수 파이썬 루프는 GIL 전환 간격(5ms)마다 루프가 끼어들 수 있음
+- inline: 오프로드하지 않음 (비교/디버깅용)
+
+작은 입력은 전달 비용이 작업보다 크므로 항상 현재 스레드에서 바로 실행합니다.
+풀은 워커 프로세스(uvicorn 워커)마다 하나이며 환경 변수는 처음 사용할 때 읽습니다.
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from .metrics_service import record_cpu_task
+
+
+class CpuPool:
+    def __init__(self):
+        self.kind = os.getenv("CPU_POOL_KIND", "process").lower()
+        if self.kind not in ("process", "thread", "inline"):
+            self.kind = "process"
+        self.workers = max(1, int(os.getenv("CPU_POOL_WORKERS", "2")))
+        # 이 크기(문자 수/바이트) 미만 입력은 오프로드하지 않음
+        self.min_size = int(os.getenv("CPU_OFFLOAD_MIN_SIZE", str(256 * 1024)))
+        self._executor: Optional[Executor] = None
+        self.offloaded = 0
+        self.inline = 0
+        # 프로세스 풀을 다시 만든 횟수 (0 이 아니면 fork 사용 안 함)
+        self.restarts = 0
+
+    def start(self) -> None:
+        """
+        프로세스 풀 미리 시작 (첫 큰 문서가 워커 기동 시간을 기다리지 않도록)
+        fork 방식은 첫 작업 제출 시 모든 풀 프로세스를 만들므로 다른 스레드보다 먼저 호출할 것
+        """
+        if self.kind != "process":
+            return
+        executor = self._get_executor()
+        for _ in range(self.workers):
+            executor.submit(os.getpid)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None and self.kind == "process":
+            try:
+                context = multiprocessing.get_context(self._start_method())
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=context)
+            except Exception as e:
+                print(f"CPU 프로세스 풀 생성 실패, 스레드 풀 사용: {str(e)}")
+                self.kind = "thread"
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                self.workers, thread_name_prefix="cpu-pool"
+            )
+        return self._executor
+
+    def _start_method(self) -> Optional[str]:
+        """
+        풀 프로세스 시작 방식
+        처음(워커 시작 시)에는 fork, 다시 만들 때는 다른 스레드가 있으므로 forkserver → spawn
+        """
+        methods = multiprocessing.get_all_start_methods()
+        if self.restarts == 0:
+            return "fork" if "fork" in methods else None
+        return "forkserver" if "forkserver" in methods else "spawn"
+
+    async def run(
+        self, func: Callable[..., Any], *args: Any, size: int = 0, stage: str = "cpu"
+    ) -> Any:
+        """
+        func(*args) 실행 - size 가 기준 이상이면 풀에서, 아니면 현재 스레드에서
+        stage: 메트릭 라벨 (parse_structure, cache_encode 등)
+        """
+        if self.kind == "inline" or size < self.min_size:
+            self.inline += 1
+            record_cpu_task(stage, "inline")
+            return func(*args)
+
+        executor = self._get_executor()
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                executor, func, *args
+            )
+        except BrokenProcessPool:
+            # 워커 프로세스가 비정상 종료됨 - 다음 작업부터 새 풀 사용
+            # 이번 작업도 큰 입력이므로 이벤트 루프가 아닌 스레드에서 실행
+            print(f"CPU 프로세스 풀 오류 ({stage}) - 풀을 다시 만듭니다.")
+            if self._executor is executor:
+                self._executor = None
+                self.restarts += 1
+            executor.shutdown(wait=False)
+            self.offloaded += 1
+            record_cpu_task(stage, "thread")
+            return await asyncio.to_thread(func, *args)
+
+        self.offloaded += 1
+        record_cpu_task(stage, self.kind)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "min_size": self.min_size,
+            "offloaded": self.offloaded,
+            "inline": self.inline,
+            "restarts": self.restarts,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_pool: Optional[CpuPool] = None
+
+
+def get_cpu_pool() -> CpuPool:
+    """프로세스 전역 CPU 풀 (load_dotenv 이후 처음 사용할 때 생성)"""
+    global _pool
+    if _pool is None:
+        _pool = CpuPool()
+    return _pool
+
+
+async def run_cpu(
+    func: Callable[..., Any], *args: Any, size: int = 0, stage: str = "cpu"
+) -> Any:
+    """get_cpu_pool().run 단축 함수"""
+    return await get_cpu_pool().run(func, *args, size=size, stage=stage)
+
+
+def shutdown_cpu_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
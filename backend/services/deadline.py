@@ -0,0 +1,129 @@
+"""
+요청 데드라인
+/api/summarize 요청 하나의 전체 처리 시간 상한을 contextvar 로 전파합니다.
+
+각 단계(문서 조회, 파싱, Claude 호출)는 자체 타임아웃과 남은 시간 중 짧은 쪽을 사용하므로
+Confluence 30초 + 재조회 + Claude 30초처럼 단계별 타임아웃이 누적되지 않습니다.
+데드라인이 지나면 DeadlineExceeded 가 발생하고, 요약 서비스가 부분 결과로 응답합니다.
+
+with request_deadline(30.0):
+    timeout = stage_timeout(30.0, "llm")                    # httpx 타임아웃
+    response = await within_deadline(client.post(...), "llm")  # 단계 전체 상한
+
+데드라인이 설정되지 않은 컨텍스트(프리페치, 추측 요약, 캐시 워머 등)에서는 기존 동작과 같습니다.
+"""
+
+import asyncio
+import os
+import time
+from contextvars import ContextVar
+from typing import Awaitable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# 요청 데드라인 (time.monotonic 기준 절대 시각, 없으면 None)
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+def default_deadline_seconds() -> float:
+    """요청당 기본 데드라인 (SUMMARY_DEADLINE_SECONDS, PRD 목표 30초, 0 이면 사용 안 함)"""
+    return float(os.getenv("SUMMARY_DEADLINE_SECONDS", "30"))
+
+
+class DeadlineExceeded(Exception):
+    """요청 데드라인 초과 (stage: 초과가 감지된 단계)"""
+
+    def __init__(self, stage: str = ""):
+        super().__init__(
+            f"요청 처리 시간 초과 ({stage})" if stage else "요청 처리 시간 초과"
+        )
+        self.stage = stage
+
+
+class request_deadline:
+    """
+    현재 컨텍스트에 데드라인 설정 (이미 더 이른 데드라인이 있으면 그대로 유지)
+    seconds 가 0 이하이면 아무것도 하지 않음
+    """
+
+    __slots__ = ("seconds", "_token")
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self._token = None
+
+    def __enter__(self):
+        if self.seconds > 0:
+            deadline = time.monotonic() + self.seconds
+            current = _deadline.get()
+            if current is None or deadline < current:
+                self._token = _deadline.set(deadline)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._token is not None:
+            _deadline.reset(self._token)
+            self._token = None
+        return False
+
+
+class without_deadline:
+    """
+    현재 컨텍스트의 데드라인 해제
+    요청 중에 만든 백그라운드 작업(재검증, 공유 페이지 조회 등)은 컨텍스트를 복사하므로
+    이 안에서 만들어야 요청 데드라인을 물려받지 않음
+    """
+
+    __slots__ = ("_token",)
+
+    def __init__(self):
+        self._token = None
+
+    def __enter__(self):
+        self._token = _deadline.set(None)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _deadline.reset(self._token)
+        return False
+
+
+def remaining() -> Optional[float]:
+    """남은 시간 (초, 데드라인이 없으면 None, 지났으면 0 이하)"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def stage_timeout(default: float, stage: str = "") -> float:
+    """단계 타임아웃 = min(단계 기본값, 남은 시간) (남은 시간이 없으면 DeadlineExceeded)"""
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded(stage)
+    return min(default, left)
+
+
+async def within_deadline(awaitable: Awaitable[T], stage: str = "") -> T:
+    """
+    남은 시간 안에 awaitable 완료 대기 (초과 시 취소하고 DeadlineExceeded)
+    httpx 타임아웃은 읽기 1회 단위라 응답 전체 시간은 이것으로 제한
+    공유 작업을 기다릴 때는 asyncio.shield 로 감싸서 넘길 것
+    """
+    left = remaining()
+    if left is None:
+        return await awaitable
+    if left <= 0:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise DeadlineExceeded(stage)
+    try:
+        return await asyncio.wait_for(awaitable, left)
+    except Exception:
+        # wait_for 시간 초과 또는 남은 시간으로 줄인 단계 타임아웃(httpx 등)이 먼저 발생한 경우
+        # (이벤트 루프 타이머는 시계 해상도만큼 일찍 깨어날 수 있어 약간의 여유를 둠)
+        if remaining() < 0.01:
+            raise DeadlineExceeded(stage) from None
+        raise
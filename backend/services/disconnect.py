@@ -0,0 +1,62 @@
+"""
+클라이언트 연결 끊김 감지
+uvicorn 은 클라이언트가 연결을 끊어도 엔드포인트 실행을 멈추지 않으므로,
+탭을 닫거나 프록시가 타임아웃으로 끊은 요청도 Confluence 조회와 Claude 호출을 끝까지 진행합니다.
+
+cancel_on_disconnect 는 ASGI receive 로 http.disconnect 를 기다리다가 먼저 도착하면
+작업 태스크를 취소합니다. 취소는 아래로 전파되어 진행 중인 httpx 요청을 닫습니다.
+- 공유 페이지 조회는 같은 조회를 기다리는 다른 요청(또는 프리페치)이 없을 때만 취소
+- 추측 요약은 다른 요청이 이어받을 수 있도록 계속 진행 (결과는 캐시에 저장됨)
+"""
+
+import asyncio
+from typing import Awaitable, TypeVar
+
+from fastapi import Request
+
+from .metrics_service import record_disconnect
+
+T = TypeVar("T")
+
+
+class ClientDisconnected(Exception):
+    """작업이 끝나기 전에 클라이언트 연결이 끊김"""
+
+
+async def wait_for_disconnect(request: Request) -> None:
+    """http.disconnect 수신까지 대기 (본문을 이미 읽은 엔드포인트에서만 사용)"""
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def cancel_on_disconnect(request: Request, awaitable: Awaitable[T]) -> T:
+    """
+    awaitable 실행 중 클라이언트 연결이 끊기면 취소하고 ClientDisconnected
+    (완료 직후 끊긴 경우에는 결과를 그대로 반환)
+    """
+    work = asyncio.ensure_future(awaitable)
+    watcher = asyncio.create_task(wait_for_disconnect(request))
+    try:
+        await asyncio.wait({work, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        work.cancel()
+        raise
+    finally:
+        watcher.cancel()
+
+    if work.done():
+        return work.result()
+
+    work.cancel()
+    try:
+        await work
+    except asyncio.CancelledError:
+        pass
+    except Exception:
+        # 취소 도중 발생한 오류 - 받을 클라이언트가 없으므로 무시
+        pass
+    route = request.scope.get("route")
+    record_disconnect(route.path if route is not None else request.url.path)
+    raise ClientDisconnected()
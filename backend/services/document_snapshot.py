@@ -0,0 +1,283 @@
+"""
+문서 스냅샷
+조회한 Confluence 문서를 파이프라인 전체가 참조로 공유하는 불변 객체
+
+본문은 정리된 텍스트 문자열 하나로만 보관하고 섹션은 (시작, 끝) 오프셋 배열로 표현합니다.
+섹션 내용은 SectionView 로 노출되며 필요한 길이만큼만 문자열로 만듭니다.
+(이전에는 원문, 정리된 문자열, 섹션별로 다시 합친 문자열이 요청마다 각각 존재했음)
+"""
+
+import re
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# 헤더 패턴 (ConfluenceService.parse_document_structure 와 동일한 규칙)
+HEADER_PATTERNS = [
+    (re.compile(r"^#{1,6}\s+(.+)$"), "markdown"),  # Markdown headers
+    (re.compile(r"^(\d{2}\.\s+.+)$"), "double_digit"),  # 00. 01. 10. etc.
+    (re.compile(r"^(\d{1,2}\.\s+.+)$"), "numbered"),  # 1. 2. 3. ... 99.
+    (re.compile(r"^([가-힣]+)\s*:\s*(.*)$"), "korean_colon"),
+    (re.compile(r"^([A-Z][a-z]+)\s*:\s*(.*)$"), "english_colon"),
+    (re.compile(r"^\*{1,3}\s*(.+)$"), "bullet"),  # Bullet points
+]
+
+_NON_SPACE = re.compile(r"\S")
+
+# 구조 파싱 실패 시 사용하는 단일 섹션 이름
+FALLBACK_SECTION = "전체 내용"
+
+
+def _normalize(text: str) -> str:
+    """앞뒤 공백을 제거한 비어 있지 않은 줄만 남김 (기존 content_by_section 형식)"""
+    return "\n".join(line.strip() for line in text.split("\n") if line.strip())
+
+
+def _header_name(line: str) -> Optional[str]:
+    """헤더 줄이면 섹션 이름, 아니면 None"""
+    for pattern, pattern_type in HEADER_PATTERNS:
+        match = pattern.match(line)
+        if not match:
+            continue
+        if pattern_type in ("korean_colon", "english_colon") and match.group(2).strip():
+            return f"{match.group(1).strip()}: {match.group(2).strip()}"
+        return match.group(1).strip()
+    return None
+
+
+# (섹션 이름, 섹션별 [본문 시작, 본문 끝] 오프셋, 첫 섹션 이전 첫 줄)
+StructureScan = Tuple[List[str], array, str]
+
+
+def scan_structure(text: str) -> Optional[StructureScan]:
+    """
+    헤더 구조 계산 (실패 시 None)
+    본문을 참조하지 않는 결과만 반환하므로 프로세스 풀에서 실행해도 본문이 되돌아오지 않음
+    """
+    try:
+        names: List[str] = []
+        # 반복되는 섹션 이름은 같은 문자열 객체를 공유
+        interned: Dict[str, str] = {}
+        offsets = array("q")
+        lead = ""
+        length = len(text)
+        position = 0
+
+        while position <= length:
+            newline = text.find("\n", position)
+            line_end = length if newline == -1 else newline
+            line = text[position:line_end].strip()
+
+            if line:
+                name = _header_name(line)
+                if name is not None:
+                    # 이전 섹션은 이 헤더 줄 직전에서 끝남
+                    if offsets:
+                        offsets[-1] = position
+                    names.append(interned.setdefault(name, name))
+                    offsets.append(line_end + 1 if newline != -1 else length)
+                    offsets.append(length)
+                elif not lead and not names:
+                    lead = line
+
+            if newline == -1:
+                break
+            position = newline + 1
+
+        return names, offsets, lead
+
+    except Exception as e:
+        print(f"문서 구조 파싱 오류: {str(e)}")
+        return None
+
+
+class SectionView:
+    """스냅샷 텍스트의 섹션 구간 (문자열 복사 없이 오프셋만 보관)"""
+
+    __slots__ = ("_text", "name", "start", "end")
+
+    def __init__(self, text: str, name: str, start: int, end: int):
+        self._text = text
+        self.name = name
+        self.start = start
+        self.end = end
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def __str__(self) -> str:
+        return _normalize(self._text[self.start : self.end])
+
+    def is_blank(self) -> bool:
+        return _NON_SPACE.search(self._text, self.start, self.end) is None
+
+    def head(self, limit: int) -> str:
+        """정리된 섹션 내용의 앞 limit 글자 (필요한 구간만 잘라서 정리)"""
+        window = limit * 2
+        while True:
+            end = min(self.end, self.start + window)
+            text = _normalize(self._text[self.start : end])
+            if len(text) >= limit or end == self.end:
+                return text[:limit]
+            window *= 4
+
+
+class DocumentSnapshot:
+    """
+    불변 문서 스냅샷 (page_id, version, title, 텍스트 버퍼 1개, 섹션 오프셋 배열)
+
+    - lead: 첫 섹션 이전의 첫 줄 (기존 구조의 "title")
+    - names: 섹션 이름 (문서 순서, 중복 가능)
+    - offsets: 섹션별 [본문 시작, 본문 끝] 이 연속으로 저장된 array
+    - truncated: 응답 크기 상한에서 잘려 문서 앞부분만 담긴 경우 True
+    """
+
+    __slots__ = (
+        "page_id",
+        "version",
+        "title",
+        "lead",
+        "text",
+        "names",
+        "offsets",
+        "truncated",
+    )
+
+    def __init__(
+        self,
+        text: str,
+        names: Tuple[str, ...] = (),
+        offsets: Optional[array] = None,
+        lead: str = "",
+        page_id: str = "",
+        version: Optional[int] = None,
+        title: str = "",
+        truncated: bool = False,
+    ):
+        setter = object.__setattr__
+        setter(self, "text", text)
+        setter(self, "names", tuple(names))
+        setter(self, "offsets", offsets if offsets is not None else array("q"))
+        setter(self, "lead", lead)
+        setter(self, "page_id", page_id)
+        setter(self, "version", version)
+        setter(self, "title", title)
+        setter(self, "truncated", truncated)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("DocumentSnapshot 은 변경할 수 없습니다.")
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def parse(
+        cls,
+        text: str,
+        page_id: str = "",
+        version: Optional[int] = None,
+        title: str = "",
+    ) -> "DocumentSnapshot":
+        """정리된 텍스트를 헤더 구조로 파싱 (본문은 복사하지 않고 오프셋만 기록)"""
+        return cls.from_scan(
+            text, scan_structure(text), page_id=page_id, version=version, title=title
+        )
+
+    @classmethod
+    def from_scan(
+        cls,
+        text: str,
+        scan: Optional[StructureScan],
+        page_id: str = "",
+        version: Optional[int] = None,
+        title: str = "",
+        truncated: bool = False,
+    ) -> "DocumentSnapshot":
+        """
+        scan_structure 결과로 스냅샷 생성
+        (CPU 풀에서 구조만 계산하고 본문은 이 프로세스의 문자열을 그대로 사용)
+        """
+        if scan is None:
+            # 파싱 실패 시 전체 내용을 하나의 섹션으로 처리
+            return cls(
+                text,
+                (FALLBACK_SECTION,),
+                array("q", (0, len(text))),
+                page_id=page_id,
+                version=version,
+                title=title,
+                truncated=truncated,
+            )
+        names, offsets, lead = scan
+        return cls(text, names, offsets, lead, page_id, version, title, truncated)
+
+    @property
+    def sections(self) -> List[SectionView]:
+        offsets = self.offsets
+        return [
+            SectionView(self.text, name, offsets[2 * i], offsets[2 * i + 1])
+            for i, name in enumerate(self.names)
+        ]
+
+    def iter_sections(self, limit: Optional[int] = None) -> Iterator[SectionView]:
+        offsets = self.offsets
+        for i, name in enumerate(self.names[:limit]):
+            yield SectionView(self.text, name, offsets[2 * i], offsets[2 * i + 1])
+
+    def to_structure(self) -> Dict[str, Any]:
+        """기존 parse_document_structure 형식 (호환용 - 섹션 문자열을 새로 만듦)"""
+        return {
+            "title": self.lead,
+            "sections": list(self.names),
+            "content_by_section": {
+                section.name: str(section) for section in self.iter_sections()
+            },
+        }
+
+    @classmethod
+    def from_structure(
+        cls, structure: Dict[str, Any], title: str = ""
+    ) -> "DocumentSnapshot":
+        """기존 구조 dict 로부터 스냅샷 생성 (호환용)"""
+        parts: List[str] = []
+        offsets = array("q")
+        position = 0
+        content_by_section = structure.get("content_by_section", {})
+        for name in structure.get("sections", []):
+            content = content_by_section.get(name, "")
+            offsets.append(position)
+            offsets.append(position + len(content))
+            parts.append(content)
+            position += len(content) + 1
+        return cls(
+            "\n".join(parts),
+            structure.get("sections", []),
+            offsets,
+            lead=structure.get("title", ""),
+            title=title,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """캐시 저장용 직렬화 (본문은 한 번만 포함)"""
+        return {
+            "page_id": self.page_id,
+            "version": self.version,
+            "title": self.title,
+            "lead": self.lead,
+            "text": self.text,
+            "names": list(self.names),
+            "offsets": self.offsets.tolist(),
+            "truncated": self.truncated,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DocumentSnapshot":
+        return cls(
+            data["text"],
+            data.get("names", ()),
+            array("q", data.get("offsets", ())),
+            lead=data.get("lead", ""),
+            page_id=data.get("page_id", ""),
+            version=data.get("version"),
+            title=data.get("title", ""),
+            truncated=data.get("truncated", False),
+        )
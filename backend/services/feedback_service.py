@@ -3,34 +3,75 @@
 사용자 피드백 수집 및 통계 관리
 """
 
-import json
+import asyncio
 import os
+from collections import deque
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import uuid
 
+from .feedback_store import SQLiteFeedbackStore
+
+# 메모리에 유지하는 최근 피드백 수 (링 버퍼)
+RECENT_FEEDBACK_LIMIT = 50
+
 class FeedbackService:
     def __init__(self):
         self.feedback_file = "feedback_data.json"
-        self.feedback_data = self._load_feedback_data()
+        self.store = SQLiteFeedbackStore(
+            db_path=os.getenv("FEEDBACK_DB_PATH", "feedback_data.db"),
+            fsync_policy=os.getenv("FEEDBACK_FSYNC", "normal"),
+            legacy_json_path=self.feedback_file,
+            checkpoint_interval_s=float(os.getenv("FEEDBACK_CHECKPOINT_INTERVAL", "300")),
+        )
 
-    def _load_feedback_data(self) -> List[Dict[str, Any]]:
-        """저장된 피드백 데이터 로드"""
-        try:
-            if os.path.exists(self.feedback_file):
-                with open(self.feedback_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return []
-        except Exception:
-            return []
+        # 쓰기 시 갱신되는 누적 카운터 (통계 조회 O(1))
+        self.total_count = 0
+        self.feedback_counts = {"positive": 0, "negative": 0}
+        self.persona_counts: Dict[str, Dict[str, int]] = {}
+        self.recent_feedback = deque(maxlen=RECENT_FEEDBACK_LIMIT)
+        # 카운터에 반영된 마지막 저장소 seq (다른 워커의 쓰기 추적용)
+        self.last_seq = 0
+        self._rebuild_counters()
 
-    def _save_feedback_data(self) -> None:
-        """피드백 데이터 저장"""
-        try:
-            with open(self.feedback_file, 'w', encoding='utf-8') as f:
-                json.dump(self.feedback_data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"피드백 저장 오류: {e}")
+    def _rebuild_counters(self) -> None:
+        """저장소에서 카운터와 최근 피드백 버퍼 재구성 (시작 시 1회)"""
+        self.last_seq, counts, recent = self.store.load_snapshot(RECENT_FEEDBACK_LIMIT)
+        for persona, feedback, count in counts:
+            self._count(persona, feedback, count)
+        self.recent_feedback.extend(recent)
+
+    async def _sync(self) -> None:
+        """
+        마지막 seq 이후 커밋된 피드백을 카운터/최근 버퍼에 반영
+        (이 프로세스와 다른 워커 프로세스의 쓰기 모두 포함, 새 행만 읽음)
+        SQLite 조회는 스레드에서 실행하며, 동시에 실행된 _sync 가 먼저 반영한 행은 건너뜀
+        """
+        rows = await asyncio.to_thread(self.store.load_since, self.last_seq)
+        for row in rows:
+            seq = row.pop("seq")
+            if seq <= self.last_seq:
+                continue
+            self.last_seq = seq
+            self._count(row["persona"], row["feedback"])
+            self.recent_feedback.append(row)
+
+    def _count(self, persona: str, feedback: str, amount: int = 1) -> None:
+        self.total_count += amount
+        if feedback in self.feedback_counts:
+            self.feedback_counts[feedback] += amount
+
+        counts = self.persona_counts.get(persona)
+        if counts is None:
+            counts = {"positive": 0, "negative": 0, "total": 0}
+            self.persona_counts[persona] = counts
+        counts["total"] += amount
+        if feedback in ("positive", "negative"):
+            counts[feedback] += amount
+
+    def close(self) -> None:
+        """피드백 저장소 종료"""
+        self.store.close()
 
     async def save_feedback(self, url: str, persona: str, feedback: str) -> str:
         """
@@ -48,20 +89,33 @@ class FeedbackService:
                 "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             }
             
-            self.feedback_data.append(feedback_entry)
-            self._save_feedback_data()
+            # 추가 전용 로그에 커밋된 뒤 저장소 기준으로 카운터/최근 피드백 반영
+            await self.store.append(feedback_entry)
+            await self._sync()
             
             return feedback_id
             
         except Exception as e:
             raise Exception(f"피드백 저장 실패: {str(e)}")
 
-    async def get_stats(self) -> Dict[str, Any]:
+    async def get_stats(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        persona: Optional[str] = None,
+        url: Optional[str] = None,
+    ) -> Dict[str, Any]:
         """
         피드백 통계 조회
+        - 조건 없음: 누적 카운터 기반 O(1)
+        - 기간/페르소나/URL 조건: 시간/일 롤업 기반 (since 포함, until 미포함)
         """
+        if since or until or persona or url:
+            return await self._get_filtered_stats(since, until, persona, url)
+
         try:
-            total_feedback = len(self.feedback_data)
+            await self._sync()
+            total_feedback = self.total_count
             
             if total_feedback == 0:
                 return {
@@ -72,38 +126,23 @@ class FeedbackService:
                     "recent_feedback": []
                 }
             
-            # 긍정/부정 피드백 수 계산
-            positive_count = sum(1 for f in self.feedback_data if f.get("feedback") == "positive")
-            negative_count = sum(1 for f in self.feedback_data if f.get("feedback") == "negative")
+            positive_count = self.feedback_counts["positive"]
+            negative_count = self.feedback_counts["negative"]
             
             positive_rate = (positive_count / total_feedback) * 100
             negative_rate = (negative_count / total_feedback) * 100
             
-            # 페르소나별 통계
+            # 페르소나별 통계 (긍정률 포함)
             persona_stats = {}
-            for feedback in self.feedback_data:
-                persona = feedback.get("persona", "unknown")
-                if persona not in persona_stats:
-                    persona_stats[persona] = {"positive": 0, "negative": 0, "total": 0}
-                
-                persona_stats[persona]["total"] += 1
-                if feedback.get("feedback") == "positive":
-                    persona_stats[persona]["positive"] += 1
-                elif feedback.get("feedback") == "negative":
-                    persona_stats[persona]["negative"] += 1
-            
-            # 페르소나별 긍정률 계산
-            for persona in persona_stats:
-                total = persona_stats[persona]["total"]
-                positive = persona_stats[persona]["positive"]
-                persona_stats[persona]["positive_rate"] = (positive / total * 100) if total > 0 else 0
+            for persona, counts in self.persona_counts.items():
+                total = counts["total"]
+                persona_stats[persona] = {
+                    **counts,
+                    "positive_rate": (counts["positive"] / total * 100) if total > 0 else 0,
+                }
             
             # 최근 피드백 (최대 10개)
-            recent_feedback = sorted(
-                self.feedback_data,
-                key=lambda x: x.get("timestamp", ""),
-                reverse=True
-            )[:10]
+            recent_feedback = self._recent(10)
             
             return {
                 "total_feedback": total_feedback,
@@ -119,35 +158,115 @@ class FeedbackService:
         except Exception as e:
             raise Exception(f"통계 조회 실패: {str(e)}")
 
+    async def _get_filtered_stats(
+        self,
+        since: Optional[str],
+        until: Optional[str],
+        persona: Optional[str],
+        url: Optional[str],
+    ) -> Dict[str, Any]:
+        """롤업 테이블 기반 조건부 통계"""
+        since = self._normalize_time(since, "since")
+        until = self._normalize_time(until, "until")
+
+        try:
+            persona_totals, recent_feedback = await asyncio.to_thread(
+                self._query_filtered, since, until, persona, url
+            )
+
+            persona_stats = {}
+            positive_count = negative_count = total_feedback = 0
+            for name, counts in persona_totals.items():
+                total = counts["total"]
+                if not total:
+                    continue
+                persona_stats[name] = {
+                    **counts,
+                    "positive_rate": counts["positive"] / total * 100,
+                }
+                positive_count += counts["positive"]
+                negative_count += counts["negative"]
+                total_feedback += total
+
+            return {
+                "total_feedback": total_feedback,
+                "positive_count": positive_count,
+                "negative_count": negative_count,
+                "positive_rate": round(positive_count / total_feedback * 100, 1) if total_feedback else 0,
+                "negative_rate": round(negative_count / total_feedback * 100, 1) if total_feedback else 0,
+                "persona_stats": persona_stats,
+                "recent_feedback": recent_feedback,
+                "filters": {"since": since, "until": until, "persona": persona, "url": url},
+                "last_updated": datetime.now().isoformat()
+            }
+
+        except Exception as e:
+            raise Exception(f"통계 조회 실패: {str(e)}")
+
+    def _query_filtered(self, since, until, persona, url) -> tuple:
+        return (
+            self.store.query_window(since, until, persona, url),
+            self.store.load_recent_filtered(10, since, until, persona, url),
+        )
+
+    def _normalize_time(self, value: Optional[str], name: str) -> Optional[str]:
+        """ISO 날짜/시각 문자열을 저장 형식(로컬 naive ISO)으로 정규화"""
+        if not value:
+            return None
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError(f"{name} 값이 올바른 ISO 날짜/시각 형식이 아닙니다: {value}")
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone().replace(tzinfo=None)
+        return parsed.isoformat()
+
+    def _recent(self, limit: int) -> List[Dict[str, Any]]:
+        """링 버퍼에서 최근 피드백 limit개 (최신순, O(k))"""
+        result = []
+        for entry in reversed(self.recent_feedback):
+            if len(result) >= limit:
+                break
+            result.append(entry)
+        return result
+
     async def get_feedback_by_persona(self, persona: str) -> List[Dict[str, Any]]:
         """특정 페르소나의 피드백 조회"""
         try:
-            return [f for f in self.feedback_data if f.get("persona") == persona]
+            return await asyncio.to_thread(self.store.load_by_persona, persona)
         except Exception as e:
             raise Exception(f"페르소나별 피드백 조회 실패: {str(e)}")
 
     async def get_recent_feedback(self, limit: int = 50) -> List[Dict[str, Any]]:
         """최근 피드백 조회"""
         try:
-            return sorted(
-                self.feedback_data,
-                key=lambda x: x.get("timestamp", ""),
-                reverse=True
-            )[:limit]
+            if limit <= RECENT_FEEDBACK_LIMIT:
+                await self._sync()
+                return self._recent(limit)
+            return await asyncio.to_thread(self.store.load_recent, limit)
         except Exception as e:
             raise Exception(f"최근 피드백 조회 실패: {str(e)}")
 
-    def get_success_rate(self) -> float:
+    async def get_success_rate(self) -> float:
         """성공률 (긍정 피드백 비율) 계산"""
         try:
-            if not self.feedback_data:
+            await self._sync()
+            if not self.total_count:
                 return 0.0
             
-            positive_count = sum(1 for f in self.feedback_data if f.get("feedback") == "positive")
-            return (positive_count / len(self.feedback_data)) * 100
+            return (self.feedback_counts["positive"] / self.total_count) * 100
         except Exception:
             return 0.0
 
-    def is_success_criteria_met(self) -> bool:
+    async def is_success_criteria_met(self) -> bool:
         """성공 기준 달성 여부 (70% 이상 긍정 피드백)"""
-        return self.get_success_rate() >= 70.0
\ No newline at end of file
+        return await self.get_success_rate() >= 70.0
+
+    def memory_stats(self) -> Dict[str, int]:
+        """메모리 모니터용 - 피드백 본문은 SQLite 에 있고 메모리에는 카운터와 최근 버퍼만 유지"""
+        return {
+            "recent_feedback": len(self.recent_feedback),
+            "recent_limit": RECENT_FEEDBACK_LIMIT,
+            "personas": len(self.persona_counts),
+            "total_count": self.total_count,
+        }
@@ -0,0 +1,563 @@
+"""
+피드백 저장소
+SQLite(WAL) 기반 추가 전용(append-only) 피드백 로그
+
+- 저장은 백그라운드 writer 스레드가 모아서 한 트랜잭션으로 커밋 (group commit)
+- fsync 정책은 FEEDBACK_FSYNC (always / normal / off) 로 설정
+- 주기적으로 WAL 체크포인트(TRUNCATE)를 수행해 로그 크기를 일정하게 유지
+- 기존 feedback_data.json 은 최초 1회 가져오기(import)
+- 시간/일 단위 롤업(페르소나 x URL)을 같은 트랜잭션에서 갱신해
+  기간 조건 통계를 원본 스캔 없이 계산
+- 여러 uvicorn 워커 프로세스가 같은 DB 파일을 공유 (WAL + busy timeout),
+  각 프로세스는 seq 이후의 새 행만 읽어 다른 워커의 쓰기를 따라잡음
+"""
+
+import asyncio
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+FSYNC_POLICIES = {
+    # 커밋마다 fsync
+    "always": "FULL",
+    # WAL 기준: 커밋은 OS 버퍼까지, fsync는 체크포인트 시점
+    "normal": "NORMAL",
+    # fsync 없음 (테스트/벤치마크용)
+    "off": "OFF",
+}
+
+FEEDBACK_COLUMNS = ("id", "url", "persona", "feedback", "timestamp", "created_at")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feedback (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    url TEXT NOT NULL,
+    persona TEXT NOT NULL,
+    feedback TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_feedback_timestamp ON feedback (timestamp);
+CREATE INDEX IF NOT EXISTS idx_feedback_persona_ts ON feedback (persona, timestamp);
+CREATE INDEX IF NOT EXISTS idx_feedback_url_ts ON feedback (url, timestamp);
+CREATE TABLE IF NOT EXISTS feedback_rollup (
+    granularity TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    persona TEXT NOT NULL,
+    url TEXT NOT NULL,
+    positive INTEGER NOT NULL DEFAULT 0,
+    negative INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (granularity, bucket, persona, url)
+);
+CREATE INDEX IF NOT EXISTS idx_rollup_persona
+    ON feedback_rollup (granularity, persona, bucket);
+CREATE INDEX IF NOT EXISTS idx_rollup_url ON feedback_rollup (granularity, url, bucket);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# 롤업 단위별 버킷 키 길이 (ISO 타임스탬프 접두사)
+#   hour: "2025-07-31T14", day: "2025-07-31"
+ROLLUP_KEY_LENGTH = {"hour": 13, "day": 10}
+
+ROLLUP_UPSERT = """
+INSERT INTO feedback_rollup (granularity, bucket, persona, url, positive, negative, total)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (granularity, bucket, persona, url) DO UPDATE SET
+    positive = positive + excluded.positive,
+    negative = negative + excluded.negative,
+    total = total + excluded.total
+"""
+
+_STOP = object()
+
+
+class SQLiteFeedbackStore:
+    def __init__(
+        self,
+        db_path: str,
+        fsync_policy: str = "normal",
+        legacy_json_path: Optional[str] = None,
+        batch_max: int = 256,
+        batch_wait_ms: float = 2.0,
+        checkpoint_interval_s: float = 300.0,
+    ):
+        self.db_path = db_path
+        self.synchronous = FSYNC_POLICIES.get(fsync_policy.lower(), "NORMAL")
+        self.legacy_json_path = legacy_json_path
+        self.batch_max = batch_max
+        self.batch_wait_s = batch_wait_ms / 1000
+        self.checkpoint_interval_s = checkpoint_interval_s
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        # 스레드별 읽기 전용 커넥션 (조회마다 connect 비용을 피함)
+        self._readers = threading.local()
+
+        conn = self._connect()
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+        self._import_legacy_json()
+        self._build_rollups()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _import_legacy_json(self) -> None:
+        """기존 JSON 파일을 1회 가져오기 (원본 파일은 그대로 둠)"""
+        if not self.legacy_json_path or not os.path.exists(self.legacy_json_path):
+            return
+
+        conn = self._connect()
+        conn.isolation_level = None
+        try:
+            # 여러 워커가 동시에 시작해도 한 프로세스만 가져오도록 쓰기 잠금 선점
+            conn.execute("BEGIN IMMEDIATE")
+            imported = conn.execute(
+                "SELECT value FROM meta WHERE key = 'legacy_json_imported'"
+            ).fetchone()
+            if imported:
+                conn.execute("ROLLBACK")
+                return
+
+            try:
+                with open(self.legacy_json_path, "r", encoding="utf-8") as f:
+                    entries = json.load(f)
+            except Exception as e:
+                # 손상된 파일을 빈 데이터로 취급하지 않고 그대로 보존
+                conn.execute("ROLLBACK")
+                print(f"기존 피드백 파일을 읽을 수 없어 가져오지 않습니다: {e}")
+                return
+
+            conn.executemany(
+                "INSERT OR IGNORE INTO feedback "
+                "(id, url, persona, feedback, timestamp, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [self._to_row(entry) for entry in entries],
+            )
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('legacy_json_imported', ?)",
+                (str(len(entries)),),
+            )
+            conn.execute("COMMIT")
+            print(f"기존 피드백 {len(entries)}건을 {self.db_path}로 가져왔습니다.")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _build_rollups(self) -> None:
+        """롤업 테이블을 원본에서 1회 재구성 (기존 DB 업그레이드 시)"""
+        conn = self._connect()
+        conn.isolation_level = None
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            built = conn.execute(
+                "SELECT value FROM meta WHERE key = 'rollups_built'"
+            ).fetchone()
+            if built:
+                conn.execute("ROLLBACK")
+                return
+
+            conn.execute("DELETE FROM feedback_rollup")
+            for granularity, length in ROLLUP_KEY_LENGTH.items():
+                conn.execute(
+                    "INSERT INTO feedback_rollup "
+                    "(granularity, bucket, persona, url, positive, negative, total) "
+                    "SELECT ?, substr(timestamp, 1, ?), persona, url, "
+                    "SUM(feedback = 'positive'), SUM(feedback = 'negative'), COUNT(*) "
+                    "FROM feedback GROUP BY 2, persona, url",
+                    (granularity, length),
+                )
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('rollups_built', ?)",
+                (datetime.now().isoformat(),),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _to_row(self, entry: Dict[str, Any]) -> tuple:
+        return tuple(entry.get(column, "") or "" for column in FEEDBACK_COLUMNS)
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._readers, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._readers.conn = conn
+        return conn
+
+    def _query(self, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        conn = self._reader()
+        return [dict(row) for row in conn.execute(sql, params).fetchall()]
+
+    def load_snapshot(self, recent_limit: int) -> tuple:
+        """
+        (마지막 seq, (persona, feedback, count) 집계, 최근 피드백) 를
+        하나의 읽기 트랜잭션에서 일관되게 조회
+        """
+        conn = self._reader()
+        conn.execute("BEGIN")
+        try:
+            last_seq = conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM feedback"
+            ).fetchone()[0]
+            counts = [
+                (row["persona"], row["feedback"], row["count"])
+                for row in conn.execute(
+                    "SELECT persona, feedback, COUNT(*) AS count FROM feedback "
+                    "WHERE seq <= ? GROUP BY persona, feedback",
+                    (last_seq,),
+                )
+            ]
+            recent = [
+                dict(row)
+                for row in conn.execute(
+                    f"SELECT {', '.join(FEEDBACK_COLUMNS)} FROM feedback "
+                    "WHERE seq <= ? ORDER BY timestamp DESC LIMIT ?",
+                    (last_seq, recent_limit),
+                )
+            ]
+            recent.reverse()
+            return last_seq, counts, recent
+        finally:
+            conn.execute("COMMIT")
+
+    def load_since(self, seq: int) -> List[Dict[str, Any]]:
+        """seq 이후에 (어느 워커에서든) 커밋된 피드백"""
+        return self._query(
+            f"SELECT seq, {', '.join(FEEDBACK_COLUMNS)} FROM feedback "
+            "WHERE seq > ? ORDER BY seq",
+            (seq,),
+        )
+
+    def load_recent(self, limit: int) -> List[Dict[str, Any]]:
+        """최근 피드백 limit개 (오래된 것 → 최신 순)"""
+        rows = self._query(
+            f"SELECT {', '.join(FEEDBACK_COLUMNS)} FROM feedback "
+            "ORDER BY timestamp DESC LIMIT ?",
+            (limit,),
+        )
+        rows.reverse()
+        return rows
+
+    def load_by_persona(self, persona: str) -> List[Dict[str, Any]]:
+        """특정 페르소나 피드백 (시간순, persona+timestamp 인덱스 사용)"""
+        return self._query(
+            f"SELECT {', '.join(FEEDBACK_COLUMNS)} FROM feedback "
+            "WHERE persona = ? ORDER BY timestamp",
+            (persona,),
+        )
+
+    def _filter_clause(self, persona: Optional[str], url: Optional[str]) -> tuple:
+        clause, params = "", []
+        if persona:
+            clause += " AND persona = ?"
+            params.append(persona)
+        if url:
+            clause += " AND url = ?"
+            params.append(url)
+        return clause, params
+
+    def query_window(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        persona: Optional[str] = None,
+        url: Optional[str] = None,
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        [since, until) 구간의 페르소나별 (positive, negative, total) 집계
+
+        구간을 나눠 온전한 일/시간은 롤업에서, 시간 단위로 잘리는
+        양 끝만 원본 테이블(타임스탬프 인덱스)에서 계산합니다.
+        """
+        clause, filter_params = self._filter_clause(persona, url)
+        totals: Dict[str, Dict[str, int]] = {}
+
+        def add(rows) -> None:
+            for row in rows:
+                counts = totals.setdefault(
+                    row[0], {"positive": 0, "negative": 0, "total": 0}
+                )
+                counts["positive"] += row[1] or 0
+                counts["negative"] += row[2] or 0
+                counts["total"] += row[3] or 0
+
+        conn = self._reader()
+        conn.execute("BEGIN")
+        try:
+            for kind, start, end in _split_window(since, until):
+                if kind == "raw":
+                    sql = (
+                        "SELECT persona, SUM(feedback = 'positive'), "
+                        "SUM(feedback = 'negative'), COUNT(*) FROM feedback "
+                        "WHERE 1 = 1"
+                    )
+                    column = "timestamp"
+                    params: list = []
+                else:
+                    sql = (
+                        "SELECT persona, SUM(positive), SUM(negative), SUM(total) "
+                        "FROM feedback_rollup WHERE granularity = ?"
+                    )
+                    column = "bucket"
+                    params = [kind]
+                if start is not None:
+                    sql += f" AND {column} >= ?"
+                    params.append(start)
+                if end is not None:
+                    sql += f" AND {column} < ?"
+                    params.append(end)
+                add(
+                    conn.execute(
+                        sql + clause + " GROUP BY persona", params + filter_params
+                    )
+                )
+        finally:
+            conn.execute("COMMIT")
+        return totals
+
+    def load_recent_filtered(
+        self,
+        limit: int,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        persona: Optional[str] = None,
+        url: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """조건에 맞는 최근 피드백 limit개 (최신순)"""
+        clause, params = self._filter_clause(persona, url)
+        sql = f"SELECT {', '.join(FEEDBACK_COLUMNS)} FROM feedback WHERE 1 = 1"
+        if since:
+            sql += " AND timestamp >= ?"
+            params.insert(0, since)
+        if until:
+            sql += " AND timestamp < ?"
+            params.insert(1 if since else 0, until)
+        return self._query(
+            sql + clause + " ORDER BY timestamp DESC LIMIT ?", (*params, limit)
+        )
+
+    async def append(self, entry: Dict[str, Any]) -> None:
+        """
+        피드백 1건 추가 - writer 스레드가 커밋을 마칠 때까지 대기
+        (동시에 들어온 저장 요청은 한 트랜잭션으로 묶임)
+        """
+        self._ensure_writer()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put((entry, future, loop))
+        await future
+
+    def _ensure_writer(self) -> None:
+        if self._writer and self._writer.is_alive():
+            return
+        with self._writer_lock:
+            if self._writer and self._writer.is_alive():
+                return
+            self._writer = threading.Thread(
+                target=self._writer_loop, name="feedback-writer", daemon=True
+            )
+            self._writer.start()
+
+    def _writer_loop(self) -> None:
+        conn = self._connect()
+        last_checkpoint = time.monotonic()
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=self.checkpoint_interval_s)
+                except queue.Empty:
+                    item = None
+
+                if item is _STOP:
+                    break
+
+                if item is not None:
+                    batch = [item]
+                    stop_after = self._collect_batch(batch)
+                    self._commit_batch(conn, batch)
+                    if stop_after:
+                        break
+
+                if time.monotonic() - last_checkpoint >= self.checkpoint_interval_s:
+                    self._checkpoint(conn)
+                    last_checkpoint = time.monotonic()
+        finally:
+            self._checkpoint(conn)
+            conn.close()
+
+    def _collect_batch(self, batch: list) -> bool:
+        """대기 중인 요청을 batch_max까지 모음, 종료 신호를 만나면 True"""
+        deadline = time.monotonic() + self.batch_wait_s
+        while len(batch) < self.batch_max:
+            timeout = deadline - time.monotonic()
+            try:
+                item = (
+                    self._queue.get(timeout=timeout)
+                    if timeout > 0
+                    else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                return False
+            if item is _STOP:
+                return True
+            batch.append(item)
+        return False
+
+    def _commit_batch(self, conn: sqlite3.Connection, batch: list) -> None:
+        error = None
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO feedback "
+                    "(id, url, persona, feedback, timestamp, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [self._to_row(entry) for entry, _, _ in batch],
+                )
+                conn.executemany(
+                    ROLLUP_UPSERT, self._rollup_rows([e for e, _, _ in batch])
+                )
+        except Exception as e:
+            print(f"피드백 저장 오류: {e}")
+            error = e
+
+        for _, future, loop in batch:
+            loop.call_soon_threadsafe(self._resolve, future, error)
+
+    def _rollup_rows(self, entries: List[Dict[str, Any]]) -> List[tuple]:
+        """배치를 (단위, 버킷, 페르소나, URL) 별로 합산한 롤업 증분"""
+        increments: Counter = Counter()
+        for entry in entries:
+            feedback = entry.get("feedback", "")
+            for granularity, length in ROLLUP_KEY_LENGTH.items():
+                key = (
+                    granularity,
+                    entry.get("timestamp", "")[:length],
+                    entry.get("persona", ""),
+                    entry.get("url", ""),
+                )
+                increments[key + ("total",)] += 1
+                if feedback in ("positive", "negative"):
+                    increments[key + (feedback,)] += 1
+
+        rows = []
+        for key in {k[:4] for k in increments}:
+            rows.append(
+                key
+                + (
+                    increments[key + ("positive",)],
+                    increments[key + ("negative",)],
+                    increments[key + ("total",)],
+                )
+            )
+        return rows
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, error: Optional[Exception]) -> None:
+        if future.done():
+            return
+        if error:
+            future.set_exception(error)
+        else:
+            future.set_result(None)
+
+    def _checkpoint(self, conn: sqlite3.Connection) -> None:
+        """WAL 내용을 본 DB에 반영하고 WAL 파일을 비움 (compaction)"""
+        try:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except Exception as e:
+            print(f"피드백 WAL 체크포인트 오류: {e}")
+
+    def close(self) -> None:
+        """writer 스레드 종료 (대기 중인 저장은 모두 커밋 후 종료)"""
+        if self._writer and self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join(timeout=10)
+
+
+def _split_window(since: Optional[str], until: Optional[str]) -> List[tuple]:
+    """
+    [since, until) 구간을 (종류, 시작, 끝) 조각으로 분할
+    종류: "raw" (원본 타임스탬프 비교) / "hour" / "day" (롤업 버킷 비교)
+    """
+    if since is None and until is None:
+        return [("day", None, None)]
+
+    def hour_key(dt: datetime) -> str:
+        return dt.strftime("%Y-%m-%dT%H")
+
+    def day_key(dt: datetime) -> str:
+        return dt.strftime("%Y-%m-%d")
+
+    start = datetime.fromisoformat(since) if since else None
+    end = datetime.fromisoformat(until) if until else None
+    if start and end and start >= end:
+        return []
+
+    pieces = []
+    # 시작 쪽: since ~ 다음 정시 (원본), 정시 ~ 다음 자정 (시간 롤업)
+    if start:
+        hour_start = start.replace(minute=0, second=0, microsecond=0)
+        if hour_start < start:
+            hour_start += timedelta(hours=1)
+        day_start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        if day_start < start:
+            day_start += timedelta(days=1)
+    else:
+        hour_start = day_start = None
+
+    # 끝 쪽: 마지막 자정 ~ 마지막 정시 (시간 롤업), 정시 ~ until (원본)
+    if end:
+        hour_end = end.replace(minute=0, second=0, microsecond=0)
+        day_end = end.replace(hour=0, minute=0, second=0, microsecond=0)
+    else:
+        hour_end = day_end = None
+
+    # 구간이 짧아 온전한 시간/일이 없는 경우
+    if start and end and hour_start >= hour_end:
+        return [("raw", since, until)]
+    if start and end and day_start >= day_end:
+        pieces.append(("raw", since, hour_start.isoformat()))
+        pieces.append(("hour", hour_key(hour_start), hour_key(hour_end)))
+        pieces.append(("raw", hour_end.isoformat(), until))
+        return pieces
+
+    if start:
+        pieces.append(("raw", since, hour_start.isoformat()))
+        pieces.append(("hour", hour_key(hour_start), day_key(day_start)))
+    pieces.append(
+        (
+            "day",
+            day_key(day_start) if start else None,
+            day_key(day_end) if end else None,
+        )
+    )
+    if end:
+        pieces.append(("hour", day_key(day_end), hour_key(hour_end)))
+        pieces.append(("raw", hour_end.isoformat(), until))
+    return pieces
@@ -0,0 +1,38 @@
+"""
+공용 HTTP 클라이언트
+서비스별로 재사용하는 커넥션 풀 기반 httpx.AsyncClient 생성
+"""
+
+import os
+
+import httpx
+
+
+def create_http_client(timeout: float = 30.0) -> httpx.AsyncClient:
+    """
+    커넥션 풀 설정이 적용된 AsyncClient 생성
+    (요청마다 클라이언트를 만들면 TCP/TLS 핸드셰이크를 매번 다시 수행함)
+    """
+    limits = httpx.Limits(
+        max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", "20")),
+        keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+    )
+    return httpx.AsyncClient(timeout=timeout, limits=limits)
+
+
+class PooledClientMixin:
+    """서비스에 지연 생성되는 공용 클라이언트와 aclose()를 제공"""
+
+    _client: httpx.AsyncClient = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = create_http_client()
+        return self._client
+
+    async def aclose(self) -> None:
+        """커넥션 풀 종료"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
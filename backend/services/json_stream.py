@@ -0,0 +1,355 @@
+"""
+JSON 스트리밍 필드 추출
+Confluence 응답 전체를 response.json() 으로 올리지 않고, 바이트 스트림에서
+필요한 경로(title, body.storage.value, version.number 등)의 값만 증분 추출합니다.
+
+- 대상이 아닌 문자열/값은 디코딩하지 않고 건너뜀
+- 대상 문자열은 청크 경계(멀티바이트 UTF-8, 이스케이프)를 넘어 이어서 디코딩
+- 본문 HTML 은 TextCleaner 로 받는 대로 정리해 원문 전체를 보관하지 않음
+- 응답 크기 상한 초과 시 truncate(잘라서 사용) / reject(거부) 정책 적용
+"""
+
+import codecs
+import json
+import os
+import re
+import time
+from json.decoder import scanstring
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+# Confluence 페이지 조회 시 추출하는 필드
+PAGE_FIELDS = ("title", "body.storage.value", "version.number")
+
+_WHITESPACE = b" \t\r\n"
+# 문자열 본문(이스케이프 포함) + 닫는 따옴표 (시작 위치에서 match)
+_STRING_BODY = re.compile(rb'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_SCALAR_END = re.compile(rb"[\s,\]}]")
+
+
+class PageTooLarge(Exception):
+    """페이지 응답이 크기 상한을 넘어 거부됨 (CONFLUENCE_OVERSIZE_POLICY=reject)"""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(
+            f"문서가 너무 커서 요약할 수 없습니다. ({max_bytes / (1024 * 1024):.1f}MB 초과)"
+        )
+        self.max_bytes = max_bytes
+
+
+class TextCleaner:
+    """
+    대상 문자열 조각을 받아 HTML 태그 경계(">" 직후)에서 잘라 정리 함수에 넘기는 증분 정리기
+    clean 은 태그를 공백으로 바꾸고 공백을 합친 뒤 strip 하는 함수여야 하며,
+    구간별 결과를 공백 하나로 이어 붙임 (원본 HTML 전체와 정규식 중간 결과를 동시에 메모리에 두지 않기 위함)
+
+    태그만 ">" 로 끝나면 결과는 전체를 한 번에 정리한 값과 같지만, 본문이나 CDATA 에
+    이스케이프되지 않은 ">" 가 있고 그 위치에서 잘리면 그 자리에 공백이 하나 더 들어감
+    (예: "a>b" → "a> b")
+    """
+
+    def __init__(self, clean: Callable[[str], str], segment_chars: int = 64 * 1024):
+        self.clean = clean
+        self.segment_chars = segment_chars
+        self.seconds = 0.0
+        self._pending: List[str] = []
+        self._pending_chars = 0
+        self._parts: List[str] = []
+
+    def write(self, text: str) -> None:
+        self._pending.append(text)
+        self._pending_chars += len(text)
+        if self._pending_chars >= self.segment_chars:
+            self._flush(final=False)
+
+    def getvalue(self) -> str:
+        self._flush(final=True)
+        return " ".join(self._parts)
+
+    def _flush(self, final: bool) -> None:
+        text = "".join(self._pending)
+        cut = len(text) if final else text.rfind(">") + 1
+        if cut <= 0:
+            return
+        self._pending = [text[cut:]] if cut < len(text) else []
+        self._pending_chars = len(text) - cut
+
+        started_at = time.perf_counter()
+        cleaned = self.clean(text[:cut])
+        self.seconds += time.perf_counter() - started_at
+        if cleaned:
+            self._parts.append(cleaned)
+
+
+class _StringState:
+    """진행 중인 문자열 값 (target 이 None 이면 건너뛰기만 함)"""
+
+    __slots__ = ("target", "sink", "pieces", "decoder", "carry")
+
+    def __init__(self, target: Optional[str], sink: Optional[TextCleaner] = None):
+        self.target = target
+        self.sink = sink
+        self.pieces: List[str] = []
+        self.decoder = (
+            codecs.getincrementaldecoder("utf-8")(errors="replace") if target else None
+        )
+        # 조각 끝에 걸린 서로게이트 쌍의 앞쪽 절반
+        self.carry = ""
+
+    def emit(self, text: str) -> None:
+        if self.sink is not None:
+            self.sink.write(text)
+        else:
+            self.pieces.append(text)
+
+
+class JsonFieldExtractor:
+    """
+    JSON 바이트 청크를 받아 지정한 점(.) 경로의 스칼라 값만 추출하는 증분 파서
+    (배열 내부 값은 대상이 아님, 입력은 올바른 JSON 이라고 가정)
+
+    extractor = JsonFieldExtractor(["title", "body.storage.value"])
+    (sinks 로 경로별 TextCleaner 를 주면 해당 문자열은 모아 두지 않고 바로 정리)
+    for chunk in chunks:
+        extractor.feed(chunk)
+    values = extractor.close()
+    """
+
+    def __init__(
+        self,
+        paths: Iterable[str],
+        sinks: Optional[Dict[str, TextCleaner]] = None,
+    ):
+        self.paths = {tuple(path.split(".")): path for path in paths}
+        self.sinks = sinks or {}
+        self.values: Dict[str, Any] = {}
+        self.truncated = False
+        self._buffer = b""
+        # 컨테이너 스택: [객체 여부, 현재 키]
+        self._stack: List[list] = []
+        self._expect_key = False
+        self._string: Optional[_StringState] = None
+
+    def feed(self, chunk: bytes) -> None:
+        data = self._buffer + chunk if self._buffer else chunk
+        self._buffer = b""
+        index = self._parse(data)
+        if index < len(data):
+            # 토큰이 청크 경계에 걸림 - 남은 부분만 보관
+            self._buffer = data[index:]
+
+    def close(self, truncated: bool = False) -> Dict[str, Any]:
+        """
+        추출 결과 반환
+        truncated: 스트림을 중간에 끊은 경우 진행 중인 대상 문자열을 부분 값으로 확정
+        """
+        if self._string is not None and self._string.target:
+            self._finish_string()
+            truncated = True
+        self.truncated = truncated
+        return self.values
+
+    def _current_target(self) -> Optional[str]:
+        path = tuple(entry[1] for entry in self._stack)
+        return self.paths.get(path)
+
+    def _parse(self, data: bytes) -> int:
+        i = 0
+        n = len(data)
+        while i < n:
+            if self._string is not None:
+                i = self._continue_string(data, i)
+                if self._string is not None:
+                    return i
+                continue
+
+            c = data[i]
+            if c in _WHITESPACE:
+                i += 1
+            elif c == 0x2C:  # ,
+                if self._stack and self._stack[-1][0]:
+                    self._expect_key = True
+                i += 1
+            elif c == 0x3A:  # :
+                self._expect_key = False
+                i += 1
+            elif c == 0x7B:  # {
+                self._stack.append([True, None])
+                self._expect_key = True
+                i += 1
+            elif c == 0x5B:  # [
+                self._stack.append([False, None])
+                self._expect_key = False
+                i += 1
+            elif c in (0x7D, 0x5D):  # } ]
+                if self._stack:
+                    self._stack.pop()
+                self._expect_key = False
+                i += 1
+            elif c == 0x22:  # "
+                if self._expect_key:
+                    end = self._find_string_end(data, i + 1)
+                    if end < 0:
+                        return i
+                    self._stack[-1][1] = json.loads(data[i : end + 1])
+                    self._expect_key = False
+                    i = end + 1
+                else:
+                    target = self._current_target()
+                    self._string = _StringState(target, self.sinks.get(target))
+                    i += 1
+            else:
+                match = _SCALAR_END.search(data, i)
+                if match is None:
+                    return i
+                target = self._current_target()
+                if target:
+                    self.values[target] = json.loads(data[i : match.start()])
+                i = match.start()
+        return n
+
+    @staticmethod
+    def _find_string_end(data: bytes, start: int) -> int:
+        """이스케이프를 고려한 닫는 따옴표 위치 (없으면 -1)"""
+        # 빠른 경로: 모든 따옴표가 \" 형태면 청크 안에서 문자열이 끝나지 않음
+        if data.count(b'"', start) == data.count(b'\\"', start) and (
+            data.find(b'\\\\"', start) < 0
+        ):
+            return -1
+        match = _STRING_BODY.match(data, start)
+        return match.end() - 1 if match else -1
+
+    def _continue_string(self, data: bytes, i: int) -> int:
+        """
+        진행 중인 문자열을 청크 단위로 처리 (이스케이프 해석은 구간 전체를 한 번에)
+        문자열이 끝나지 않았으면 청크 끝의 미완성 이스케이프만 남기고 소비한 위치 반환
+        """
+        state = self._string
+        n = len(data)
+        end = self._find_string_end(data, i)
+        if end >= 0:
+            cut = end
+        else:
+            # 청크 끝 근처의 역슬래시 연속 구간부터는 다음 청크와 함께 처리
+            cut = n
+            backslash = data.find(b"\\", max(i, n - 6), n)
+            if backslash >= 0:
+                while backslash > i and data[backslash - 1] == 0x5C:
+                    backslash -= 1
+                cut = backslash
+
+        if state.target and cut > i:
+            segment = data[i:cut]
+            text = state.decoder.decode(segment)
+            if b"\\" in segment:
+                text = scanstring(text + '"', 0, False)[0]
+            if state.carry or b"\\ud" in segment or b"\\uD" in segment:
+                text = _join_surrogates(state, text)
+            state.emit(text)
+
+        if end >= 0:
+            self._finish_string()
+            return end + 1
+        return cut
+
+    def _finish_string(self) -> None:
+        state = self._string
+        self._string = None
+        if not state.target:
+            return
+        # 짝이 없는 서로게이트는 대체 문자로
+        state.emit(
+            state.decoder.decode(b"", final=True) + ("\ufffd" if state.carry else "")
+        )
+        if state.sink is not None:
+            self.values[state.target] = state.sink.getvalue()
+        else:
+            self.values[state.target] = "".join(state.pieces)
+
+
+def _join_surrogates(state: _StringState, text: str) -> str:
+    """\\uD83D\\uDE00 처럼 이스케이프된 서로게이트 쌍을 실제 문자로 결합"""
+    text = state.carry + text
+    state.carry = ""
+    if text and "\ud800" <= text[-1] <= "\udbff":
+        state.carry = text[-1]
+        text = text[:-1]
+    return text.encode("utf-16", "surrogatepass").decode("utf-16", "replace")
+
+
+async def stream_json_fields(
+    client: httpx.AsyncClient,
+    url: str,
+    paths: Iterable[str],
+    headers: Optional[Dict[str, str]] = None,
+    timeout: float = 30.0,
+    max_bytes: int = 0,
+    oversize_policy: str = "truncate",
+    sinks: Optional[Dict[str, TextCleaner]] = None,
+) -> Dict[str, Any]:
+    """
+    GET 응답을 스트리밍으로 읽으며 지정한 필드만 추출
+
+    반환: {"status", "fields", "truncated", "too_large", "error_text"}
+    - sinks 에 지정한 경로의 문자열은 TextCleaner 로 바로 정리되어 fields 에 정리된 값이 들어감
+    - max_bytes 초과 시 truncate 정책이면 그 지점까지 읽은 값으로 확정(truncated=True),
+      reject 정책이면 읽기를 멈추고 too_large=True
+    """
+    result = {
+        "status": 0,
+        "fields": {},
+        "truncated": False,
+        "too_large": False,
+        "error_text": "",
+    }
+    async with client.stream("GET", url, headers=headers, timeout=timeout) as response:
+        result["status"] = response.status_code
+        if response.status_code != 200:
+            result["error_text"] = await _read_prefix(response, 200)
+            return result
+
+        declared = int(response.headers.get("content-length") or 0)
+        if max_bytes and declared > max_bytes and oversize_policy == "reject":
+            result["too_large"] = True
+            return result
+
+        extractor = JsonFieldExtractor(paths, sinks)
+        received = 0
+        truncated = False
+        async for chunk in response.aiter_bytes():
+            received += len(chunk)
+            if max_bytes and received > max_bytes:
+                if oversize_policy == "reject":
+                    result["too_large"] = True
+                    return result
+                extractor.feed(chunk[: len(chunk) - (received - max_bytes)])
+                truncated = True
+                break
+            extractor.feed(chunk)
+
+        result["fields"] = extractor.close(truncated=truncated)
+        result["truncated"] = extractor.truncated
+        return result
+
+
+async def _read_prefix(response: httpx.Response, limit: int) -> str:
+    """오류 응답 본문 앞부분만 읽기 (로그용)"""
+    data = b""
+    async for chunk in response.aiter_bytes():
+        data += chunk
+        if len(data) >= limit:
+            break
+    return data[:limit].decode("utf-8", "replace")
+
+
+def size_policy_from_env() -> Tuple[int, str]:
+    """
+    응답 크기 상한 설정 (CONFLUENCE_MAX_RESPONSE_BYTES, CONFLUENCE_OVERSIZE_POLICY)
+    상한이 0 이면 제한 없음, 정책은 truncate(기본) 또는 reject
+    """
+    max_bytes = int(os.getenv("CONFLUENCE_MAX_RESPONSE_BYTES", str(20 * 1024 * 1024)))
+    policy = os.getenv("CONFLUENCE_OVERSIZE_POLICY", "truncate").lower()
+    if policy not in ("truncate", "reject"):
+        policy = "truncate"
+    return max_bytes, policy
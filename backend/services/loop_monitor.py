@@ -0,0 +1,159 @@
+"""
+이벤트 루프 지연 모니터
+루프 안의 하트비트 코루틴과 루프 밖의 감시 스레드로 루프 정지를 감지하고 원인 코드를 기록합니다.
+
+- 하트비트: LOOP_MONITOR_INTERVAL 마다 깨어나 예정 시각과의 차이(지연)를 히스토그램에 기록
+- 감시 스레드: 하트비트가 LOOP_STALL_THRESHOLD 이상 늦어지면 루프 스레드의 스택을 샘플링
+- 하트비트가 다시 돌면 정지 시간과 가장 많이 샘플링된 스택(백엔드 코드 위주)을 정지 기록으로 남김
+
+동기 CPU 작업(큰 문서 파싱, 대용량 JSON 직렬화 등)이 루프를 막아 헬스 체크와
+캐시 적중 응답까지 늦어지는 상황을 찾기 위함입니다.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .metrics_service import record_loop_lag, record_loop_stall
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STACK_DEPTH = 8
+# 정지 한 번에 보관하는 스택 샘플 수
+MAX_SAMPLES = 20
+
+
+def _format_stack(frame) -> Tuple[str, ...]:
+    """
+    안쪽 프레임부터 백엔드 코드 위치만 "경로:줄 함수" 형식으로 (없으면 가장 안쪽 프레임들)
+    """
+    backend, others = [], []
+    while frame is not None and len(backend) < STACK_DEPTH:
+        filename = frame.f_code.co_filename
+        if filename.startswith(BACKEND_DIR) and "site-packages" not in filename:
+            location = os.path.relpath(filename, BACKEND_DIR)
+            backend.append(f"{location}:{frame.f_lineno} {frame.f_code.co_name}")
+        elif len(others) < STACK_DEPTH:
+            location = os.path.basename(filename)
+            others.append(f"{location}:{frame.f_lineno} {frame.f_code.co_name}")
+        frame = frame.f_back
+    return tuple(backend or others)
+
+
+class LoopMonitor:
+    def __init__(self):
+        self.enabled = os.getenv("LOOP_MONITOR_ENABLED", "true").lower() == "true"
+        self.interval = float(os.getenv("LOOP_MONITOR_INTERVAL", "0.05"))
+        self.threshold = float(os.getenv("LOOP_STALL_THRESHOLD", "0.1"))
+
+        self.stalls: deque = deque(maxlen=int(os.getenv("LOOP_STALL_HISTORY", "50")))
+        self.stalls_total = 0
+        self.max_lag = 0.0
+        # 최근 약 1분간의 지연 (평균/최대 계산용)
+        self._lags: deque = deque(maxlen=max(1, int(60 / max(self.interval, 0.001))))
+
+        self._beat = 0.0
+        self._samples: List[Tuple[str, ...]] = []
+        self._lock = threading.Lock()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """하트비트 태스크와 감시 스레드 시작 (실행 중인 이벤트 루프 안에서 호출)"""
+        if not self.enabled or self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(
+            target=self._watch, name="loop-monitor", daemon=True
+        )
+        self._thread.start()
+
+    async def aclose(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._beat = now
+            with self._lock:
+                samples, self._samples = self._samples, []
+
+            lag = max(0.0, now - expected)
+            self._lags.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            record_loop_lag(lag)
+            if lag >= self.threshold:
+                self._record_stall(lag, samples)
+
+    def _watch(self) -> None:
+        """루프 밖 스레드 - 하트비트가 기준 이상 늦으면 루프 스레드 스택 샘플링"""
+        overdue = self.interval + self.threshold
+        while not self._stop.wait(self.interval):
+            if time.monotonic() - self._beat < overdue:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = _format_stack(frame)
+            del frame
+            with self._lock:
+                if len(self._samples) < MAX_SAMPLES:
+                    self._samples.append(stack)
+
+    def _record_stall(self, lag: float, samples: List[Tuple[str, ...]]) -> None:
+        if samples:
+            stack, count = Counter(samples).most_common(1)[0]
+        else:
+            # 감시 스레드가 샘플링하기 전에 끝난 짧은 정지
+            stack, count = (), 0
+        path = stack[0] if stack else "unknown"
+        self.stalls_total += 1
+        self.stalls.append(
+            {
+                "at": datetime.now().isoformat(timespec="seconds"),
+                "duration_ms": round(lag * 1000, 1),
+                "path": path,
+                "stack": list(stack),
+                "samples": len(samples),
+                "matching_samples": count,
+            }
+        )
+        record_loop_stall(path)
+        print(f"이벤트 루프 정지 {lag * 1000:.0f}ms - {path}")
+
+    def get_report(self, limit: int = 20) -> Dict[str, Any]:
+        """최근 지연 통계와 정지 기록 (최신순)"""
+        lags = list(self._lags)
+        return {
+            "enabled": self.enabled,
+            "interval_ms": self.interval * 1000,
+            "threshold_ms": self.threshold * 1000,
+            "recent_lag_ms": {
+                "avg": round(sum(lags) / len(lags) * 1000, 2) if lags else 0.0,
+                "max": round(max(lags) * 1000, 2) if lags else 0.0,
+            },
+            "max_lag_ms": round(self.max_lag * 1000, 2),
+            "stalls_total": self.stalls_total,
+            "recent_stalls": list(self.stalls)[::-1][:limit],
+        }
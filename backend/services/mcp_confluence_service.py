@@ -8,9 +8,16 @@ from typing import Dict, Any, Optional
 import re
 from urllib.parse import urlparse
 
-class MCPConfluenceService:
+from .deadline import DeadlineExceeded, stage_timeout, within_deadline
+from .http_client import PooledClientMixin
+from .json_stream import PAGE_FIELDS, PageTooLarge, TextCleaner, size_policy_from_env, stream_json_fields
+from .metrics_service import record_stage, record_upstream, stage_timer
+
+class MCPConfluenceService(PooledClientMixin):
     def __init__(self):
         self.mcp_command = ["mcp", "run", "mcp-atlassian"]
+        # 응답 크기 상한 (초과 시 truncate / reject)
+        self.max_response_bytes, self.oversize_policy = size_policy_from_env()
     
     async def get_document_content(self, url: str) -> Optional[Dict[str, Any]]:
         """
@@ -19,7 +26,6 @@ class MCPConfluenceService:
         """
         try:
             import os
-            import httpx
             import base64
             
             # 환경변수에서 인증 정보 가져오기
@@ -42,7 +48,7 @@ class MCPConfluenceService:
                 return None
 
             # API URL 구성
-            api_url = f"{confluence_url}/rest/api/content/{page_id}?expand=body.storage"
+            api_url = f"{confluence_url}/rest/api/content/{page_id}?expand=body.storage,version"
             print(f"API 호출 URL: {api_url}")
             
             # Basic Auth 헤더 생성
@@ -55,25 +61,50 @@ class MCPConfluenceService:
             }
             
             print("Confluence API 호출 시작...")
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(api_url, headers=headers)
+            client = self._get_client()
+            # 응답 전체를 올리지 않고 스트리밍으로 필요한 필드만 추출
+            # (본문 HTML 은 받는 대로 태그 경계 단위로 정리)
+            cleaner = TextCleaner(self._clean_html_content)
+            # 요청 데드라인이 있으면 남은 시간까지만 대기
+            with stage_timer("confluence_fetch"):
+                response = await within_deadline(
+                    stream_json_fields(
+                        client, api_url, PAGE_FIELDS,
+                        headers=headers,
+                        timeout=stage_timeout(30.0, "fetch"),
+                        max_bytes=self.max_response_bytes,
+                        oversize_policy=self.oversize_policy,
+                        sinks={"body.storage.value": cleaner}
+                    ),
+                    "fetch"
+                )
+            status = response["status"]
+            record_upstream("confluence", status)
                 
-                print(f"API 응답 상태: {response.status_code}")
+            print(f"API 응답 상태: {status}")
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    print(f"API 응답 데이터 키: {list(data.keys()) if isinstance(data, dict) else 'Not a dict'}")
-                    result = self._process_confluence_response(data)
-                    print(f"처리된 결과 - 제목: {result.get('title', '없음')[:50]}..., 내용 길이: {len(result.get('content', ''))}")
-                    return result
-                elif response.status_code == 401:
-                    print(f"Confluence API 인증 실패: {response.status_code} - 인증 정보를 확인해주세요")
-                elif response.status_code == 404:
-                    print(f"Confluence 페이지를 찾을 수 없습니다: {response.status_code} - 페이지 ID나 권한을 확인해주세요")
-                else:
-                    print(f"Confluence API 호출 실패: {response.status_code} - {response.text[:200]}")
-                return None
+            if response["too_large"]:
+                # REST 경로로 같은 본문을 다시 받지 않도록 바로 중단
+                print(f"Confluence 응답이 너무 큽니다: {self.max_response_bytes} bytes 초과 - 요청을 거부합니다")
+                raise PageTooLarge(self.max_response_bytes)
+            elif status == 200:
+                record_stage("html_cleanup", cleaner.seconds)
+                result = self._process_confluence_response(response["fields"])
+                if response["truncated"]:
+                    print(f"Confluence 응답이 {self.max_response_bytes} bytes 에서 잘렸습니다 - 앞부분만 사용합니다")
+                    result["truncated"] = True
+                print(f"처리된 결과 - 제목: {result.get('title', '없음')[:50]}..., 내용 길이: {len(result.get('content', ''))}")
+                return result
+            elif status == 401:
+                print(f"Confluence API 인증 실패: {status} - 인증 정보를 확인해주세요")
+            elif status == 404:
+                print(f"Confluence 페이지를 찾을 수 없습니다: {status} - 페이지 ID나 권한을 확인해주세요")
+            else:
+                print(f"Confluence API 호출 실패: {status} - {response['error_text']}")
+            return None
                 
+        except (DeadlineExceeded, PageTooLarge):
+            raise
         except Exception as e:
             print(f"Confluence API 호출 오류: {str(e)}")
             return None
@@ -101,28 +132,21 @@ class MCPConfluenceService:
         except Exception:
             return None
     
-    def _process_confluence_response(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Confluence API 응답 데이터 처리"""
+    def _process_confluence_response(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Confluence API 응답에서 추출한 필드 처리 (본문은 스트리밍 중 정리된 텍스트)
+        원본 응답은 보관하지 않음 - 대용량 페이지에서 요청마다 사본이 남던 문제
+        """
         try:
-            title = data.get("title", "")
-            
-            # 본문 내용 추출
-            content = ""
-            if "body" in data and "storage" in data["body"]:
-                content = data["body"]["storage"].get("value", "")
-            
-            # HTML 태그 제거 및 텍스트 정리
-            clean_content = self._clean_html_content(content)
-            
             return {
-                "title": title,
-                "content": clean_content,
-                "raw_data": data
+                "title": fields.get("title") or "",
+                "content": fields.get("body.storage.value") or "",
+                "version": fields.get("version.number")
             }
             
         except Exception as e:
             print(f"Confluence 응답 처리 오류: {str(e)}")
-            return {"title": "", "content": "", "raw_data": data}
+            return {"title": "", "content": ""}
     
     def _process_mcp_response(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """MCP 응답 데이터 처리"""
@@ -153,13 +177,12 @@ class MCPConfluenceService:
             
             return {
                 "title": title,
-                "content": clean_content,
-                "raw_data": data
+                "content": clean_content
             }
             
         except Exception as e:
             print(f"MCP 응답 처리 오류: {str(e)}")
-            return {"title": "", "content": "", "raw_data": data}
+            return {"title": "", "content": ""}
     
     def _clean_html_content(self, html_content: str) -> str:
         """HTML 콘텐츠에서 텍스트 추출 및 정리"""
@@ -0,0 +1,340 @@
+"""
+메모리 모니터
+워커 프로세스별 메모리 사용량(RSS)과 메모리를 붙잡는 주요 구조(캐시, 집계, 진행 중 작업)의 크기를
+기록하고, tracemalloc 스냅샷 비교로 메모리가 늘어난 할당 위치를 찾습니다.
+
+MEMORY_MONITOR_ENABLED=true 일 때만 동작합니다. (기본 꺼짐)
+- MEMORY_LOG_INTERVAL 마다 RSS/추적 할당량/가장 많이 늘어난 위치를 한 줄로 출력
+- MEMORY_TRACEMALLOC=true 이면 tracemalloc 시작 (모든 할당에 추적 비용이 있어 따로 켬)
+- RSS 가 MEMORY_BUDGET_MB 를 넘으면 프로세스 내 캐시를 줄이고 GC 실행 (trim)
+  MEMORY_BUDGET_ACTION=restart 이면 그래도 넘을 때 SIGTERM 으로 워커를 정상 종료
+  (APP_ENV=production 다중 워커에서 uvicorn 이 새 워커를 띄움)
+- /api/memory 로 현재 상태와 스냅샷 비교 결과 조회 (X-Admin-Token 필요, MEMORY_ADMIN_TOKEN 미설정 시 거부)
+
+OOM 으로 워커가 종료되었을 때 어느 구조/코드가 메모리를 늘렸는지 추적하기 위함입니다.
+"""
+
+import asyncio
+import gc
+import hmac
+import inspect
+import os
+import signal
+import sys
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .metrics_service import record_memory, record_memory_budget
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MB = 1024 * 1024
+
+# 스냅샷 비교에서 제외할 할당 위치 (모니터 자신과 임포트 시스템)
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def read_process_memory() -> Dict[str, int]:
+    """
+    현재 프로세스 메모리 (바이트)
+    Linux: /proc/self/status 의 VmRSS/RssAnon(힙 등)/RssFile(mmap 파일), 그 외: 최대 RSS
+    """
+    memory: Dict[str, int] = {}
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name in ("VmRSS", "VmHWM", "RssAnon", "RssFile"):
+                    memory[name] = int(value.split()[0]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    if "VmRSS" in memory:
+        return {
+            "rss": memory["VmRSS"],
+            "peak_rss": memory.get("VmHWM", 0),
+            "rss_anon": memory.get("RssAnon", 0),
+            "rss_file": memory.get("RssFile", 0),
+        }
+
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS 는 바이트, 그 외는 KB 단위
+        peak = peak if sys.platform == "darwin" else peak * 1024
+    except (ImportError, OSError):
+        peak = 0
+    return {"rss": peak, "peak_rss": peak}
+
+
+def _format_traceback(traceback: tracemalloc.Traceback) -> Tuple[str, List[str]]:
+    """
+    안쪽 프레임부터 "경로:줄" 목록과 대표 위치
+    (대표 위치: 가장 안쪽의 백엔드 코드 프레임, 없으면 가장 안쪽 프레임)
+    """
+    frames, path = [], ""
+    for frame in reversed(traceback):
+        filename = frame.filename
+        if filename.startswith(BACKEND_DIR) and "site-packages" not in filename:
+            location = f"{os.path.relpath(filename, BACKEND_DIR)}:{frame.lineno}"
+            path = path or location
+        else:
+            location = f"{os.path.basename(filename)}:{frame.lineno}"
+        frames.append(location)
+    return path or (frames[0] if frames else "unknown"), frames
+
+
+class MemoryService:
+    def __init__(self):
+        self.enabled = os.getenv("MEMORY_MONITOR_ENABLED", "false").lower() == "true"
+        self.tracemalloc_enabled = (
+            os.getenv("MEMORY_TRACEMALLOC", "false").lower() == "true"
+        )
+        self.frames = max(1, int(os.getenv("MEMORY_TRACEMALLOC_FRAMES", "10")))
+        self.interval = float(os.getenv("MEMORY_LOG_INTERVAL", "300"))
+        self.top_n = int(os.getenv("MEMORY_SNAPSHOT_TOP", "20"))
+        # 워커당 RSS 예산 (0 이면 사용 안 함)
+        self.budget_bytes = int(float(os.getenv("MEMORY_BUDGET_MB", "0")) * MB)
+        self.budget_action = os.getenv("MEMORY_BUDGET_ACTION", "trim").lower()
+        self.admin_token = os.getenv("MEMORY_ADMIN_TOKEN", "")
+
+        # 메모리 구조별 크기 조회 / 예산 초과 시 줄이는 함수
+        self._sources: Dict[str, Callable[[], Any]] = {}
+        self._trimmers: Dict[str, Callable[[], int]] = {}
+        # RSS 추이 (약 하루치, 증가 속도 계산용)
+        self.samples: deque = deque(maxlen=int(os.getenv("MEMORY_HISTORY", "288")))
+        self.budget_events: deque = deque(maxlen=20)
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        # 비교 기준 - 주기 기록용과 /api/memory 용을 따로 둠 (조회가 주기 로그의 기준을 바꾸지 않도록)
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self._report_previous: Optional[tracemalloc.Snapshot] = None
+        self._restarting = False
+        self._task: Optional[asyncio.Task] = None
+
+    def register(
+        self,
+        name: str,
+        stats: Callable[[], Any],
+        trim: Optional[Callable[[], int]] = None,
+    ) -> None:
+        """
+        메모리 구조 등록
+        stats: 항목 수/크기 dict 를 반환 (코루틴 함수 가능)
+        trim: 예산 초과 시 호출, 줄인 바이트 수 반환
+        """
+        self._sources[name] = stats
+        if trim is not None:
+            self._trimmers[name] = trim
+
+    def start(self) -> None:
+        """tracemalloc 과 주기 기록 태스크 시작 (실행 중인 이벤트 루프 안에서 호출)"""
+        if not self.enabled or self._task is not None:
+            return
+        if self.tracemalloc_enabled and not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        if tracemalloc.is_tracing():
+            self._baseline = self._take_snapshot()
+            self._previous = self._baseline
+        self._sample()
+        self._task = asyncio.create_task(self._run())
+        print(
+            f"메모리 모니터 시작 (tracemalloc={tracemalloc.is_tracing()}, "
+            f"예산={self.budget_bytes // MB}MB)"
+        )
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.tracemalloc_enabled and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._baseline = self._previous = self._report_previous = None
+
+    def authorized(self, headers) -> bool:
+        """
+        관리 엔드포인트 접근 확인 (토큰 미설정 시 거부)
+        보고서에 파일 경로/스택/pid 가 들어 있고 조회마다 스냅샷과 gc 순회를 수행하므로
+        """
+        if not self.admin_token:
+            return False
+        return hmac.compare_digest(
+            headers.get("x-admin-token", "").encode(), self.admin_token.encode()
+        )
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                sample = self._sample()
+                growth = []
+                if tracemalloc.is_tracing():
+                    growth, self._previous = await self._growth(self._previous, limit=1)
+                self._log(sample, growth[0] if growth else None)
+                if self.budget_bytes and sample["rss"] > self.budget_bytes:
+                    self._enforce_budget(sample["rss"])
+            except Exception as e:
+                print(f"메모리 모니터 오류: {str(e)}")
+
+    def _sample(self, history: bool = True) -> Dict[str, int]:
+        """현재 메모리 기록 (history: 주기 기록이면 증가 속도 계산용 추이에 추가)"""
+        sample = read_process_memory()
+        traced = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else None
+        record_memory(sample["rss"], traced)
+        if history:
+            self.samples.append((time.time(), sample["rss"]))
+        if traced is not None:
+            sample["traced"], sample["traced_peak"] = traced
+        return sample
+
+    def _log(self, sample: Dict[str, int], top: Optional[Dict[str, Any]]) -> None:
+        line = f"메모리 RSS {sample['rss'] / MB:.0f}MB"
+        if "traced" in sample:
+            line += f" (Python 할당 {sample['traced'] / MB:.0f}MB)"
+        rate = self._growth_rate()
+        if rate is not None:
+            line += f", 시간당 {rate / MB:+.1f}MB"
+        if top is not None:
+            line += f" - 최대 증가 {top['path']} {top['size_diff_kb']:+.0f}KB"
+        print(line)
+
+    def _growth_rate(self) -> Optional[float]:
+        """기록된 기간 동안의 시간당 RSS 증가량 (바이트)"""
+        if len(self.samples) < 2:
+            return None
+        (start, first), (end, last) = self.samples[0], self.samples[-1]
+        if end - start <= 0:
+            return None
+        return (last - first) / (end - start) * 3600
+
+    def _enforce_budget(self, rss: int) -> None:
+        """예산 초과 - 프로세스 내 캐시 축소/GC, restart 정책이면 그래도 넘을 때 워커 종료"""
+        freed = {}
+        for name, trim in self._trimmers.items():
+            try:
+                freed[name] = trim()
+            except Exception as e:
+                print(f"메모리 축소 오류 ({name}): {str(e)}")
+        collected = gc.collect()
+        after = read_process_memory()["rss"]
+        action = "trim"
+        if (
+            self.budget_action == "restart"
+            and after > self.budget_bytes
+            and not self._restarting
+        ):
+            action = "restart"
+
+        record_memory_budget(action)
+        self.budget_events.append(
+            {
+                "at": datetime.now().isoformat(timespec="seconds"),
+                "action": action,
+                "rss_before_mb": round(rss / MB, 1),
+                "rss_after_mb": round(after / MB, 1),
+                "freed_bytes": freed,
+                "gc_collected": collected,
+            }
+        )
+        print(
+            f"메모리 예산 초과: RSS {rss / MB:.0f}MB > {self.budget_bytes / MB:.0f}MB "
+            f"→ 캐시 축소 {sum(freed.values()) / MB:.1f}MB, 축소 후 {after / MB:.0f}MB"
+        )
+        if action == "restart":
+            # 진행 중 요청을 드레인한 뒤 종료 (uvicorn 이 새 워커 시작)
+            self._restarting = True
+            print(f"메모리 예산 초과로 워커를 재시작합니다 (pid={os.getpid()})")
+            os.kill(os.getpid(), signal.SIGTERM)
+
+    def _take_snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+    async def _growth(
+        self, since: Optional[tracemalloc.Snapshot], limit: int
+    ) -> Tuple[List[Dict[str, Any]], tracemalloc.Snapshot]:
+        """
+        since 스냅샷 대비 늘어난 할당 위치 (증가량 순)와 새 스냅샷 (다음 비교 기준으로 쓸 수 있음)
+        """
+        snapshot = await asyncio.to_thread(self._take_snapshot)
+        if since is None:
+            return [], snapshot
+
+        key_type = "traceback" if self.frames > 1 else "lineno"
+        stats = await asyncio.to_thread(snapshot.compare_to, since, key_type)
+        growth = []
+        for stat in stats:
+            if stat.size_diff <= 0:
+                continue
+            path, frames = _format_traceback(stat.traceback)
+            growth.append(
+                {
+                    "path": path,
+                    "size_diff_kb": round(stat.size_diff / 1024, 1),
+                    "size_kb": round(stat.size / 1024, 1),
+                    "count_diff": stat.count_diff,
+                    "traceback": frames,
+                }
+            )
+            if len(growth) >= limit:
+                break
+        return growth, snapshot
+
+    async def _source_stats(self) -> Dict[str, Any]:
+        sources = {}
+        for name, stats in self._sources.items():
+            try:
+                value = stats()
+                if inspect.isawaitable(value):
+                    value = await value
+                sources[name] = value
+            except Exception as e:
+                sources[name] = {"error": str(e)}
+        return sources
+
+    async def get_report(
+        self, diff: str = "previous", limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        현재 메모리 상태, 구조별 크기, 스냅샷 비교 결과
+        diff: previous (마지막 조회 이후, 첫 조회는 모니터 시작 이후) / baseline (모니터 시작 이후)
+        조회용 비교 기준은 주기 로그의 기준과 별개
+        """
+        limit = limit or self.top_n
+        sample = self._sample(history=False)
+        rate = self._growth_rate()
+        report: Dict[str, Any] = {
+            "pid": os.getpid(),
+            "process_mb": {key: round(value / MB, 1) for key, value in sample.items()},
+            "budget_mb": (
+                round(self.budget_bytes / MB, 1) if self.budget_bytes else None
+            ),
+            "budget_action": self.budget_action,
+            "budget_events": list(self.budget_events)[::-1],
+            "growth_mb_per_hour": round(rate / MB, 2) if rate is not None else None,
+            "sources": await self._source_stats(),
+            "gc": {
+                "counts": gc.get_count(),
+                "objects": len(gc.get_objects()),
+            },
+            "tracemalloc": tracemalloc.is_tracing(),
+        }
+        if tracemalloc.is_tracing():
+            if diff == "baseline":
+                report["growth"], _ = await self._growth(self._baseline, limit)
+            else:
+                since = self._report_previous or self._baseline
+                report["growth"], self._report_previous = await self._growth(
+                    since, limit
+                )
+            report["diff"] = diff
+        return report
@@ -0,0 +1,482 @@
+"""
+메트릭 서비스
+Prometheus 텍스트 포맷 호환 카운터/게이지/히스토그램 및 /metrics 노출
+
+기록 경로는 락 없이 dict/list 갱신만 수행합니다.
+(단일 이벤트 루프 + GIL 환경에서 요청당 수 마이크로초 수준)
+
+값은 워커 프로세스마다 따로 쌓이며 /metrics 는 응답한 워커의 값만 노출합니다.
+모든 시리즈에 worker="<pid>" 라벨을 붙이므로 워커별 시리즈가 섞이지 않으며,
+Prometheus 에서 모든 워커를 수집한 뒤 sum without (worker) 로 합산해야 전체 값이 됩니다.
+WORKERS>1 인 프로세스는 워커들이 한 포트를 나눠 쓰므로 한 번의 수집에 임의의 워커 하나만 잡힙니다.
+전체를 보려면 WORKERS=1 프로세스를 포트별로 여러 개 띄우고 각 포트를 수집 대상으로 등록합니다.
+"""
+
+import os
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+# 기본 히스토그램 버킷 (초) - PRD 목표인 30초 전후를 세밀하게 관찰
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    20.0,
+    30.0,
+    45.0,
+    60.0,
+)
+
+
+def _format_labels(
+    labelnames: Tuple[str, ...], values: Tuple[str, ...], worker=None, extra=None
+) -> str:
+    pairs = list(zip(labelnames, values))
+    if worker:
+        pairs.append(worker)
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = []
+    for name, value in pairs:
+        value = (
+            str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        )
+        escaped.append(f'{name}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+class Counter:
+    """단조 증가 카운터"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        values = self._values
+        values[labels] = values.get(labels, 0) + amount
+
+    def get(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self, worker=None) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+        ]
+        for labels, value in sorted(self._values.items()):
+            lines.append(
+                f"{self.name}{_format_labels(self.labelnames, labels, worker)} {value}"
+            )
+        return lines
+
+
+class Gauge:
+    """마지막으로 설정한 값 (메모리 사용량 등)"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    def get(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self, worker=None) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} gauge",
+        ]
+        for labels, value in sorted(self._values.items()):
+            lines.append(
+                f"{self.name}{_format_labels(self.labelnames, labels, worker)} {value}"
+            )
+        return lines
+
+
+class Histogram:
+    """고정 버킷 히스토그램 (버킷별 비누적 카운트를 저장하고 노출 시 누적)"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        # labels -> [버킷별 카운트..., +Inf 카운트, 합계]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._values.get(labels)
+        if series is None:
+            series = [0] * (len(self.buckets) + 1) + [0.0]
+            self._values[labels] = series
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def get_count(self, *labels: str) -> int:
+        series = self._values.get(labels)
+        return int(sum(series[:-1])) if series else 0
+
+    def render(self, worker=None) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for labels, series in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = _format_labels(
+                    self.labelnames, labels, worker, ("le", repr(float(bound)))
+                )
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            cumulative += series[len(self.buckets)]
+            le = _format_labels(self.labelnames, labels, worker, ("le", "+Inf"))
+            lines.append(f"{self.name}_bucket{le} {cumulative}")
+            label_str = _format_labels(self.labelnames, labels, worker)
+            lines.append(f"{self.name}_sum{label_str} {series[-1]}")
+            lines.append(f"{self.name}_count{label_str} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """메트릭 레지스트리"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()
+    ) -> Counter:
+        if name not in self._metrics:
+            self._metrics[name] = Counter(name, documentation, labelnames)
+        return self._metrics[name]
+
+    def gauge(
+        self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()
+    ) -> Gauge:
+        if name not in self._metrics:
+            self._metrics[name] = Gauge(name, documentation, labelnames)
+        return self._metrics[name]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        if name not in self._metrics:
+            self._metrics[name] = Histogram(name, documentation, labelnames, buckets)
+        return self._metrics[name]
+
+    def render(self) -> str:
+        """Prometheus 텍스트 포맷(0.0.4)으로 직렬화 (모든 시리즈에 worker 라벨)"""
+        worker = ("worker", str(os.getpid()))
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render(worker))
+        return "\n".join(lines) + "\n"
+
+
+# 프로세스 전역 레지스트리
+metrics = MetricsRegistry()
+
+http_requests_total = metrics.counter(
+    "conflusum_http_requests_total",
+    "HTTP requests by endpoint and status code",
+    ("method", "path", "status"),
+)
+http_request_duration = metrics.histogram(
+    "conflusum_http_request_duration_seconds",
+    "HTTP request latency by endpoint",
+    ("method", "path"),
+)
+stage_duration = metrics.histogram(
+    "conflusum_stage_duration_seconds",
+    "Summarization pipeline stage latency",
+    ("stage",),
+)
+cache_requests_total = metrics.counter(
+    "conflusum_cache_requests_total",
+    "Cache lookups by cache name and result (hit/miss)",
+    ("cache", "result"),
+)
+mock_fallback_total = metrics.counter(
+    "conflusum_mock_fallback_total",
+    "Responses that fell back to mock data",
+    ("source", "reason"),
+)
+upstream_responses_total = metrics.counter(
+    "conflusum_upstream_responses_total",
+    "Upstream (Confluence/Claude) responses by status code",
+    ("upstream", "status"),
+)
+speculative_summaries_total = metrics.counter(
+    "conflusum_speculative_summaries_total",
+    "Speculative summaries by outcome (started/completed/joined/hit/cancelled/preempted/skipped_*)",
+    ("result",),
+)
+cache_warmer_jobs_total = metrics.counter(
+    "conflusum_cache_warmer_jobs_total",
+    "Off-peak cache warmer jobs by outcome (warmed/fresh/failed/skipped_*)",
+    ("result",),
+)
+cpu_tasks_total = metrics.counter(
+    "conflusum_cpu_tasks_total",
+    "CPU-heavy tasks by stage and where they ran (inline/thread/process)",
+    ("stage", "executor"),
+)
+event_loop_lag = metrics.histogram(
+    "conflusum_event_loop_lag_seconds",
+    "Event loop scheduling lag measured by the loop monitor heartbeat",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+event_loop_stalls_total = metrics.counter(
+    "conflusum_event_loop_stalls_total",
+    "Event loop stalls over the threshold by the code path sampled during the stall",
+    ("path",),
+)
+process_resident_memory = metrics.gauge(
+    "conflusum_process_resident_memory_bytes",
+    "Worker resident set size at the last memory monitor sample",
+)
+tracemalloc_traced_memory = metrics.gauge(
+    "conflusum_tracemalloc_traced_bytes",
+    "Python allocations traced by tracemalloc (current/peak)",
+    ("kind",),
+)
+memory_budget_exceeded_total = metrics.counter(
+    "conflusum_memory_budget_exceeded_total",
+    "Memory budget overruns by the action taken (trim/restart)",
+    ("action",),
+)
+scheduler_requests_total = metrics.counter(
+    "conflusum_scheduler_requests_total",
+    "Upstream slot requests by priority and outcome (immediate/queued/preempted/promoted/cancelled)",
+    ("upstream", "priority", "result"),
+)
+scheduler_wait = metrics.histogram(
+    "conflusum_scheduler_wait_seconds",
+    "Time spent queued for an upstream slot",
+    ("upstream", "priority"),
+)
+scheduler_queue_depth = metrics.gauge(
+    "conflusum_scheduler_queue_depth",
+    "Requests waiting for an upstream slot",
+    ("upstream", "priority"),
+)
+scheduler_active = metrics.gauge(
+    "conflusum_scheduler_active",
+    "Upstream calls holding a slot",
+    ("upstream", "priority"),
+)
+client_disconnects_total = metrics.counter(
+    "conflusum_client_disconnects_total",
+    "Requests whose client disconnected before the response, by endpoint",
+    ("path",),
+)
+cancelled_upstream_total = metrics.counter(
+    "conflusum_cancelled_upstream_total",
+    "In-flight upstream calls cancelled because nobody was waiting for the result",
+    ("upstream",),
+)
+stale_summaries_total = metrics.counter(
+    "conflusum_stale_summaries_total",
+    "Stale-while-revalidate events (served_version_changed/served_upstream_error/refreshed/refresh_failed)",
+    ("event",),
+)
+summary_deadline_exceeded_total = metrics.counter(
+    "conflusum_summary_deadline_exceeded_total",
+    "Summaries that hit the request deadline by stage and partial result source",
+    ("stage", "partial"),
+)
+
+
+# 요청 단위 단계별 소요 시간 수집 (프로파일링 등에서 활성화, 평소에는 None)
+stage_trace: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar(
+    "stage_trace", default=None
+)
+
+
+class stage_timer:
+    """
+    파이프라인 단계 소요 시간 측정 컨텍스트 매니저
+
+    with stage_timer("parse_structure"):
+        ...
+    """
+
+    __slots__ = ("stage", "started_at")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.started_at = 0.0
+
+    def __enter__(self):
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record_stage(self.stage, time.perf_counter() - self.started_at)
+        return False
+
+
+def record_stage(stage: str, elapsed: float) -> None:
+    """단계 소요 시간 기록 (다른 단계와 섞여 실행되어 따로 잰 시간 등)"""
+    stage_duration.observe(elapsed, stage)
+    trace = stage_trace.get()
+    if trace is not None:
+        trace.append((stage, elapsed))
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """캐시 조회 결과 기록"""
+    cache_requests_total.inc(cache, "hit" if hit else "miss")
+
+
+def record_fallback(source: str, reason: str) -> None:
+    """Mock 데이터 폴백 기록"""
+    mock_fallback_total.inc(source, reason)
+
+
+def record_upstream(upstream: str, status: int) -> None:
+    """업스트림 응답 상태 코드 기록"""
+    upstream_responses_total.inc(upstream, str(status))
+
+
+def record_speculation(result: str) -> None:
+    """추측 요약 결과 기록"""
+    speculative_summaries_total.inc(result)
+
+
+def record_warm(result: str) -> None:
+    """캐시 워머 작업 결과 기록"""
+    cache_warmer_jobs_total.inc(result)
+
+
+def record_cpu_task(stage: str, executor: str) -> None:
+    """CPU 작업 실행 위치 기록"""
+    cpu_tasks_total.inc(stage, executor)
+
+
+def record_loop_lag(lag: float) -> None:
+    """이벤트 루프 지연 기록"""
+    event_loop_lag.observe(lag)
+
+
+def record_loop_stall(path: str) -> None:
+    """이벤트 루프 정지 기록 (정지 중 샘플링한 코드 위치)"""
+    event_loop_stalls_total.inc(path)
+
+
+def record_memory(rss: int, traced: Optional[Tuple[int, int]] = None) -> None:
+    """메모리 사용량 기록 (traced: tracemalloc 현재/최대, 추적 중이 아니면 None)"""
+    process_resident_memory.set(rss)
+    if traced is not None:
+        tracemalloc_traced_memory.set(traced[0], "current")
+        tracemalloc_traced_memory.set(traced[1], "peak")
+
+
+def record_memory_budget(action: str) -> None:
+    """메모리 예산 초과 기록"""
+    memory_budget_exceeded_total.inc(action)
+
+
+def record_scheduler(
+    upstream: str, priority: str, result: str, wait: Optional[float] = None
+) -> None:
+    """스케줄러 슬롯 요청 결과 기록 (wait: 대기열에서 기다린 시간)"""
+    scheduler_requests_total.inc(upstream, priority, result)
+    if wait is not None:
+        scheduler_wait.observe(wait, upstream, priority)
+
+
+def record_scheduler_depth(
+    upstream: str, priority: str, queued: int, active: int
+) -> None:
+    scheduler_queue_depth.set(queued, upstream, priority)
+    scheduler_active.set(active, upstream, priority)
+
+
+def record_disconnect(path: str) -> None:
+    """클라이언트 연결 끊김으로 작업을 취소한 요청 기록"""
+    client_disconnects_total.inc(path)
+
+
+def record_cancelled(upstream: str) -> None:
+    """기다리는 쪽이 없어 취소한 업스트림 호출 기록 (confluence/claude)"""
+    cancelled_upstream_total.inc(upstream)
+
+
+def record_stale(event: str) -> None:
+    """stale-while-revalidate 이벤트 기록"""
+    stale_summaries_total.inc(event)
+
+
+def record_deadline(stage: str, partial: str) -> None:
+    """요청 데드라인 초과 기록 (초과 단계, 부분 결과 종류)"""
+    summary_deadline_exceeded_total.inc(stage or "unknown", partial)
+
+
+class MetricsMiddleware:
+    """
+    엔드포인트별 요청 수/지연 시간을 기록하는 순수 ASGI 미들웨어
+    (BaseHTTPMiddleware보다 오버헤드가 작음)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        status_holder = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            if route is not None:
+                path = route.path
+            elif scope["path"].startswith("/api/"):
+                path = "unmatched"
+            else:
+                path = "static"
+            method = scope["method"]
+            http_request_duration.observe(
+                time.perf_counter() - started_at, method, path
+            )
+            http_requests_total.inc(method, path, str(status_holder[0]))
@@ -0,0 +1,135 @@
+"""
+프로파일링 서비스
+단일 /api/summarize 요청에 대한 온디맨드 cProfile 프로파일링 및 단계별 소요 시간 기록
+
+PROFILING_ENABLED=true 일 때만 동작하며, 요청 시
+`X-Profile: 1` 헤더 또는 `?profile=1` 쿼리로 활성화합니다.
+(`return` 값을 주면 결과 요약을 응답에 포함)
+"""
+
+import hmac
+import io
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from .metrics_service import stage_trace
+
+
+class ProfileSession:
+    """프로파일링 1회분 결과"""
+
+    def __init__(self, profile_id: str, label: Dict[str, str]):
+        self.profile_id = profile_id
+        self.label = label
+        import cProfile  # 프로파일링 요청 시에만 로드
+
+        self.profiler = cProfile.Profile()
+        self.stages = []
+        self.total_ms = 0.0
+        self.profile_path = ""
+        self.top_functions = ""
+
+    def report(self, inline: bool = False) -> Dict[str, Any]:
+        report = {
+            "profile_id": self.profile_id,
+            "path": self.profile_path,
+            "total_ms": round(self.total_ms, 1),
+            "stages": [
+                {"stage": stage, "ms": round(elapsed * 1000, 1)}
+                for stage, elapsed in self.stages
+            ],
+        }
+        if inline:
+            report["top_functions"] = self.top_functions
+        return report
+
+
+class ProfilingService:
+    def __init__(self):
+        self.enabled = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+        self.token = os.getenv("PROFILING_TOKEN", "")
+        self.profile_dir = os.getenv("PROFILE_DIR", "profiles")
+        self.top_n = int(os.getenv("PROFILE_TOP_FUNCTIONS", "30"))
+        # cProfile은 스레드 전역이라 동시에 하나만 실행
+        self._active = False
+
+    def requested_mode(self, headers, query_params) -> Optional[str]:
+        """
+        요청에서 프로파일링 모드 추출 ("file" / "return"), 비활성 시 None
+        """
+        if not self.enabled:
+            return None
+
+        value = headers.get("x-profile") or query_params.get("profile") or ""
+        value = value.lower()
+        if value not in ("1", "true", "file", "return"):
+            return None
+
+        if self.token and not hmac.compare_digest(
+            headers.get("x-profile-token", "").encode(), self.token.encode()
+        ):
+            print("프로파일링 요청 거부: 토큰 불일치")
+            return None
+
+        return "return" if value == "return" else "file"
+
+    @contextmanager
+    def profile(self, **label: str):
+        """
+        컨텍스트 내부 실행을 cProfile로 측정하고 결과를 PROFILE_DIR에 저장
+
+        주의: 이벤트 루프의 다른 요청 코드도 같은 스레드에서 실행되므로
+        프로파일에 함께 섞일 수 있습니다. (stage 타이밍은 이 요청 것만 기록)
+        """
+        if self._active:
+            print("다른 프로파일링이 진행 중이라 이번 요청은 프로파일링하지 않습니다.")
+            yield None
+            return
+
+        session = ProfileSession(
+            f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}", label
+        )
+        trace_token = stage_trace.set(session.stages)
+        self._active = True
+        started_at = time.perf_counter()
+        session.profiler.enable()
+        try:
+            yield session
+        finally:
+            session.profiler.disable()
+            session.total_ms = (time.perf_counter() - started_at) * 1000
+            self._active = False
+            stage_trace.reset(trace_token)
+            self._save(session)
+
+    def _save(self, session: ProfileSession) -> None:
+        try:
+            import pstats
+
+            stream = io.StringIO()
+            stats = pstats.Stats(session.profiler, stream=stream)
+            stats.sort_stats("cumulative").print_stats(self.top_n)
+            session.top_functions = stream.getvalue()
+
+            os.makedirs(self.profile_dir, exist_ok=True)
+            base_path = os.path.join(
+                self.profile_dir, f"summarize-{session.profile_id}"
+            )
+            session.profile_path = f"{base_path}.prof"
+            stats.dump_stats(session.profile_path)
+
+            with open(f"{base_path}.json", "w", encoding="utf-8") as f:
+                json.dump(
+                    {**session.report(inline=True), "label": session.label},
+                    f,
+                    ensure_ascii=False,
+                    indent=2,
+                )
+            print(f"프로파일 저장: {session.profile_path}")
+        except Exception as e:
+            print(f"프로파일 저장 오류: {str(e)}")
@@ -0,0 +1,359 @@
+"""
+우선순위 스케줄러
+Claude / Confluence 호출의 동시 실행 수를 요청 우선순위별로 나눠 씁니다.
+
+- interactive: /api/summarize 등 사용자가 기다리는 요청 (기본값)
+- batch: 대량 요약/스페이스 크롤처럼 끝나기만 하면 되는 작업
+- background: 캐시 워밍, 추측 요약, stale 요약 갱신처럼 버려도 되는 작업
+
+우선순위는 contextvar 로 전파되므로 작업을 시작하는 쪽에서만 지정합니다.
+
+with request_priority("background"):
+    await summary_service.regenerate(url, persona)   # 내부의 Claude/Confluence 호출이 background 로 대기
+
+슬롯이 모자라면 우선순위별 대기열에 들어가고, 슬롯이 비면 가중치(SCHEDULER_WEIGHTS) 비율로
+대기열을 번갈아 꺼냅니다 (stride 방식 가중 공정 분배).
+- 전체 슬롯 중 SCHEDULER_INTERACTIVE_RESERVED 비율은 interactive 전용 (크롤 중에도 바로 시작)
+- interactive 요청이 대기해야 하면 대기 중인 background 작업은 Preempted 로 취소
+  (이미 실행 중인 호출은 끝까지 진행)
+
+여러 요청이 함께 기다리는 공유 작업(추측 요약, 페이지 단일 조회)은 create_joinable_task 로 만들고
+joining 안에서 기다립니다. 우선순위가 더 높은 요청이 합류하면 그 작업(과 작업이 기다리는 다른
+공유 작업)의 우선순위를 올리고, 이미 대기열에 있던 슬롯 요청도 높은 대기열로 옮깁니다.
+(background 작업에 합류한 interactive 요청이 크롤 대기열 뒤에서 기다리는 우선순위 역전 방지)
+"""
+
+import asyncio
+import os
+import time
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, Coroutine, Deque, Dict, List, Optional
+
+from .deadline import within_deadline
+from .metrics_service import record_scheduler, record_scheduler_depth
+
+PRIORITIES = ("interactive", "batch", "background")
+DEFAULT_WEIGHTS = "interactive=8,batch=3,background=1"
+
+
+class _PriorityState:
+    """
+    우선순위 값 (request_priority 블록마다 하나, 그 안에서 만든 태스크가 같은 객체를 공유)
+    합류한 요청에 따라 올라갈 수 있으므로 문자열 대신 객체로 전파
+    """
+
+    __slots__ = ("priority", "joined", "__weakref__")
+
+    def __init__(self, priority: str):
+        self.priority = priority
+        # 이 작업이 지금 기다리는 공유 작업들 (우선순위가 오르면 함께 올림)
+        self.joined: List["_PriorityState"] = []
+
+
+# 현재 컨텍스트의 요청 우선순위 (기본 interactive 는 더 오를 수 없으므로 공유해도 안전)
+_priority: ContextVar[_PriorityState] = ContextVar(
+    "request_priority", default=_PriorityState("interactive")
+)
+# 공유 작업별 우선순위 (create_joinable_task 로 만든 태스크)
+_task_states: "weakref.WeakKeyDictionary[asyncio.Task, _PriorityState]" = (
+    weakref.WeakKeyDictionary()
+)
+# 합류 시 대기열을 옮길 스케줄러들
+_schedulers: "weakref.WeakSet[PriorityScheduler]" = weakref.WeakSet()
+
+
+def current_priority() -> str:
+    return _priority.get().priority
+
+
+def _higher(priority: str, other: str) -> bool:
+    return PRIORITIES.index(priority) < PRIORITIES.index(other)
+
+
+class request_priority:
+    """현재 컨텍스트의 요청 우선순위 지정 (여기서 만든 태스크도 같은 우선순위를 물려받음)"""
+
+    __slots__ = ("priority", "_token")
+
+    def __init__(self, priority: str):
+        if priority not in PRIORITIES:
+            raise ValueError(f"알 수 없는 우선순위: {priority}")
+        self.priority = priority
+        self._token = None
+
+    def __enter__(self):
+        self._token = _priority.set(_PriorityState(self.priority))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _priority.reset(self._token)
+        return False
+
+
+def create_joinable_task(coro: Coroutine) -> asyncio.Task:
+    """
+    다른 요청이 합류할 수 있는 공유 작업 시작 (현재 우선순위로, 우선순위 상태는 따로)
+    합류로 우선순위가 올라도 작업을 시작한 쪽(워머/크롤의 나머지 작업)은 그대로 유지
+    """
+    state = _PriorityState(current_priority())
+    token = _priority.set(state)
+    try:
+        task = asyncio.create_task(coro)
+    finally:
+        _priority.reset(token)
+    _task_states[task] = state
+    return task
+
+
+class joining:
+    """
+    공유 작업을 기다리는 동안 그 작업의 우선순위를 현재 우선순위 이상으로 유지
+
+    with joining(task):
+        result = await within_deadline(asyncio.shield(task), "speculation")
+    """
+
+    __slots__ = ("state", "_waiter")
+
+    def __init__(self, task: asyncio.Task):
+        self.state: Optional[_PriorityState] = _task_states.get(task)
+        self._waiter: Optional[_PriorityState] = None
+
+    def __enter__(self):
+        if self.state is None:
+            return self
+        waiter = _priority.get()
+        if waiter.priority != "interactive":
+            # 기다리는 쪽의 우선순위가 나중에 오르면 이 작업도 함께 올림
+            waiter.joined.append(self.state)
+            self._waiter = waiter
+        _promote(self.state, waiter.priority)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._waiter is not None:
+            self._waiter.joined.remove(self.state)
+        return False
+
+
+def _promote(state: _PriorityState, priority: str) -> None:
+    """작업(과 그 작업이 기다리는 공유 작업)의 우선순위를 올리고 대기 중인 슬롯 요청을 옮김"""
+    if not _higher(priority, state.priority):
+        return
+    state.priority = priority
+    for scheduler in list(_schedulers):
+        scheduler._promote(state, priority)
+    for joined in list(state.joined):
+        _promote(joined, priority)
+
+
+class Preempted(Exception):
+    """대기 중이던 background 작업이 interactive 요청에 밀려 취소됨"""
+
+    def __init__(self, upstream: str):
+        super().__init__(f"{upstream} 대기 중 우선순위가 높은 요청에 밀려 취소됨")
+        self.upstream = upstream
+
+
+def _parse_weights(value: str) -> Dict[str, float]:
+    """'interactive=8,batch=3,background=1' → 우선순위별 가중치 (잘못된 값은 기본값)"""
+    weights = {"interactive": 8.0, "batch": 3.0, "background": 1.0}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        try:
+            if name.strip() in weights and float(weight) > 0:
+                weights[name.strip()] = float(weight)
+        except ValueError:
+            pass
+    return weights
+
+
+class PriorityScheduler:
+    def __init__(self, name: str, capacity: int):
+        self.name = name
+        self.capacity = max(1, capacity)
+        self.weights = _parse_weights(os.getenv("SCHEDULER_WEIGHTS", DEFAULT_WEIGHTS))
+        reserved = float(os.getenv("SCHEDULER_INTERACTIVE_RESERVED", "0.25"))
+        # batch/background 가 쓸 수 없는 슬롯 수 (최소 1개는 누구나 사용 가능)
+        self.reserved = min(self.capacity - 1, int(self.capacity * reserved))
+        self.preempt_background = (
+            os.getenv("SCHEDULER_PREEMPT_BACKGROUND", "true").lower() == "true"
+        )
+
+        self.active = 0
+        self._running: Dict[str, int] = {priority: 0 for priority in PRIORITIES}
+        self._queues: Dict[str, Deque[asyncio.Future]] = {
+            priority: deque() for priority in PRIORITIES
+        }
+        # 대기 중인 슬롯 요청 → 요청한 작업의 우선순위 상태 (합류 시 대기열 이동용)
+        self._owners: Dict[asyncio.Future, _PriorityState] = {}
+        # stride 스케줄링 가상 시각 (대기열별 다음 차례, 꺼낼 때마다 1/가중치 증가)
+        self._pass: Dict[str, float] = {priority: 0.0 for priority in PRIORITIES}
+        self._vtime = 0.0
+        _schedulers.add(self)
+
+    @asynccontextmanager
+    async def slot(self, stage: str = ""):
+        """
+        현재 우선순위로 슬롯 하나를 잡고 실행 (대기는 요청 데드라인 안에서만)
+        stage: 데드라인 초과 시 DeadlineExceeded 단계 이름
+        """
+        state = _priority.get()
+        # 대기 중 합류로 우선순위가 오를 수 있으므로 실제로 슬롯을 받은 대기열 기준으로 반납
+        priority = await self._acquire(state, stage)
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    def _limit(self, priority: str) -> int:
+        return (
+            self.capacity
+            if priority == "interactive"
+            else self.capacity - self.reserved
+        )
+
+    async def _acquire(self, state: _PriorityState, stage: str) -> str:
+        """슬롯 확보 (반환: 슬롯을 받은 우선순위)"""
+        priority = state.priority
+        queue = self._queues[priority]
+        if not queue and self.active < self._limit(priority):
+            self._start(priority)
+            record_scheduler(self.name, priority, "immediate")
+            return priority
+
+        if priority == "interactive" and self.preempt_background:
+            self._preempt()
+        future = asyncio.get_running_loop().create_future()
+        queue.append(future)
+        self._owners[future] = state
+        self._update_depth(priority)
+        queued_at = time.monotonic()
+        try:
+            granted = await within_deadline(future, stage)
+        except Preempted:
+            raise
+        except BaseException:
+            # 데드라인 초과 또는 요청 취소
+            if future.done() and not future.cancelled() and future.exception() is None:
+                # 슬롯을 넘겨받은 직후 취소됨 - 다음 대기자에게 넘김
+                self._release(future.result())
+            else:
+                self._discard(future)
+            record_scheduler(self.name, state.priority, "cancelled")
+            raise
+        finally:
+            self._owners.pop(future, None)
+        record_scheduler(
+            self.name, granted, "queued", wait=time.monotonic() - queued_at
+        )
+        return granted
+
+    def _discard(self, future: asyncio.Future) -> None:
+        for priority, queue in self._queues.items():
+            if future in queue:
+                queue.remove(future)
+                self._update_depth(priority)
+                return
+
+    def _promote(self, state: _PriorityState, priority: str) -> None:
+        """state 의 대기 중인 슬롯 요청을 priority 대기열로 옮김 (합류한 요청의 우선순위)"""
+        moved = []
+        for lower in PRIORITIES[PRIORITIES.index(priority) + 1 :]:
+            queue = self._queues[lower]
+            waiters = [
+                future
+                for future in queue
+                if self._owners.get(future) is state and not future.done()
+            ]
+            for future in waiters:
+                queue.remove(future)
+                record_scheduler(self.name, lower, "promoted")
+            if waiters:
+                self._update_depth(lower)
+                moved.extend(waiters)
+        if not moved:
+            return
+        self._queues[priority].extend(moved)
+        self._update_depth(priority)
+        self._dispatch()
+        if (
+            priority == "interactive"
+            and self.preempt_background
+            and any(not future.done() for future in moved)
+        ):
+            # interactive 요청이 직접 대기열에 들어온 것과 같게 처리
+            self._preempt()
+
+    def _start(self, priority: str) -> None:
+        """슬롯 할당 - 쉬고 있던 대기열이 밀린 몫을 한꺼번에 쓰지 않도록 현재 가상 시각부터 계산"""
+        start = max(self._pass[priority], self._vtime)
+        self._vtime = start
+        self._pass[priority] = start + 1 / self.weights[priority]
+        self.active += 1
+        self._running[priority] += 1
+        self._update_depth(priority)
+
+    def _release(self, priority: str) -> None:
+        self.active -= 1
+        self._running[priority] -= 1
+        self._update_depth(priority)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """빈 슬롯을 가상 시각이 가장 이른 대기열부터 배분"""
+        while True:
+            candidates = [
+                priority
+                for priority in PRIORITIES
+                if self._queues[priority] and self.active < self._limit(priority)
+            ]
+            if not candidates:
+                return
+            priority = min(
+                candidates,
+                key=lambda name: (
+                    max(self._pass[name], self._vtime),
+                    PRIORITIES.index(name),
+                ),
+            )
+            future = self._queues[priority].popleft()
+            if future.done():
+                # 데드라인/취소로 이미 포기한 대기자
+                self._update_depth(priority)
+                continue
+            self._start(priority)
+            future.set_result(priority)
+
+    def _preempt(self) -> None:
+        """대기 중인 background 작업 취소 (interactive 요청이 대기해야 할 때)"""
+        queue = self._queues["background"]
+        while queue:
+            future = queue.popleft()
+            if not future.done():
+                future.set_exception(Preempted(self.name))
+                record_scheduler(self.name, "background", "preempted")
+        self._update_depth("background")
+
+    def _update_depth(self, priority: str) -> None:
+        record_scheduler_depth(
+            self.name,
+            priority,
+            len(self._queues[priority]),
+            self._running[priority],
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "interactive_reserved": self.reserved,
+            "weights": self.weights,
+            "active": self.active,
+            "running": dict(self._running),
+            "queued": {
+                priority: len(queue) for priority, queue in self._queues.items()
+            },
+        }
@@ -0,0 +1,348 @@
+"""
+검색 서비스
+조회한 Confluence 페이지의 로컬 전문 검색 색인 (역색인, SQLite 에 저장)
+
+- ConfluenceService 가 실제 페이지를 조회/파싱할 때마다 색인 갱신 (같은 버전은 건너뜀)
+- 한국어는 띄어쓰기/조사와 무관하게 찾을 수 있도록 글자 바이그램, 영문/숫자는 단어 단위 토큰
+- 제목/섹션 단위 게시 목록(postings)에 tf 를 저장하고 조회 시 tf-idf 로 순위 계산
+- 결과에는 페이지, 일치한 섹션, 캐시에 남아 있는 페르소나별 요약을 함께 반환
+
+Confluence 검색 API 를 거치지 않고 "그 X 관련 페이지"를 로컬에서 바로 찾고,
+캐시된 요약이 있으면 다시 요약하지 않아도 되도록 하기 위함입니다.
+"""
+
+import asyncio
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .cache_service import CacheService
+from .document_snapshot import FALLBACK_SECTION, DocumentSnapshot
+
+_WORD = re.compile(r"[가-힣]+|[a-z0-9]+")
+
+# 제목에 나온 토큰 가중치, 섹션 번호 -1 = 제목
+TITLE_WEIGHT = 3.0
+TITLE_SECTION = -1
+SNIPPET_CHARS = 160
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    검색 토큰 분리
+    한글 연속 구간은 글자 바이그램(1글자면 그대로), 영문/숫자는 소문자 단어 (1글자 영문 제외)
+    """
+    tokens: List[str] = []
+    for match in _WORD.finditer(text.lower()):
+        word = match.group()
+        if "가" <= word[0] <= "힣":
+            if len(word) == 1:
+                tokens.append(word)
+            else:
+                tokens.extend(word[i : i + 2] for i in range(len(word) - 1))
+        elif len(word) > 1 or word.isdigit():
+            tokens.append(word)
+    return tokens
+
+
+class SearchService:
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS pages (
+        page_key TEXT PRIMARY KEY,
+        page_id TEXT NOT NULL,
+        url TEXT NOT NULL,
+        title TEXT NOT NULL,
+        version INTEGER,
+        indexed_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS sections (
+        page_key TEXT NOT NULL,
+        section_no INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        snippet TEXT NOT NULL,
+        PRIMARY KEY (page_key, section_no)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS postings (
+        token TEXT NOT NULL,
+        page_key TEXT NOT NULL,
+        section_no INTEGER NOT NULL,
+        tf INTEGER NOT NULL,
+        PRIMARY KEY (token, page_key, section_no)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_postings_page ON postings(page_key);
+    """
+
+    def __init__(self, cache_service: Optional[CacheService] = None):
+        self.cache_service = cache_service
+        self.enabled = os.getenv("SEARCH_ENABLED", "true").lower() == "true"
+        self.db_path = os.getenv("SEARCH_DB_PATH", "search_index.db")
+        # 매우 큰 페이지는 앞부분만 색인 (색인 시간/크기 제한)
+        self.max_index_chars = int(os.getenv("SEARCH_MAX_INDEX_CHARS", "200000"))
+        self._local = threading.local()
+
+        if self.enabled:
+            self._connection().executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """스레드별 연결 (sqlite3 연결은 스레드 간 공유 불가)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    async def index_snapshot(
+        self, page_key: str, url: str, snapshot: DocumentSnapshot
+    ) -> bool:
+        """페이지 스냅샷 색인 (이미 같은 버전이 색인되어 있으면 False)"""
+        if not self.enabled or not page_key:
+            return False
+        try:
+            return await asyncio.to_thread(self._index, page_key, url, snapshot)
+        except Exception as e:
+            print(f"검색 색인 오류: {str(e)}")
+            return False
+
+    def _index(self, page_key: str, url: str, snapshot: DocumentSnapshot) -> bool:
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT version FROM pages WHERE page_key = ?", (page_key,)
+        ).fetchone()
+        if row and snapshot.version is not None and row[0] == snapshot.version:
+            return False
+
+        started_at = time.perf_counter()
+        sections = list(self._sections(snapshot))
+        postings = [
+            (token, TITLE_SECTION, tf)
+            for token, tf in Counter(tokenize(snapshot.title)).items()
+        ]
+        for section_no, name, text in sections:
+            counts = Counter(tokenize(name))
+            counts.update(tokenize(text))
+            postings.extend((token, section_no, tf) for token, tf in counts.items())
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for table in ("postings", "sections", "pages"):
+                conn.execute(f"DELETE FROM {table} WHERE page_key = ?", (page_key,))
+            conn.execute(
+                "INSERT INTO pages (page_key, page_id, url, title, version, indexed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    page_key,
+                    snapshot.page_id,
+                    url,
+                    snapshot.title,
+                    snapshot.version,
+                    time.time(),
+                ),
+            )
+            conn.executemany(
+                "INSERT INTO sections (page_key, section_no, name, snippet) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (page_key, section_no, name[:SNIPPET_CHARS], _snippet(text or name))
+                    for section_no, name, text in sections
+                ],
+            )
+            conn.executemany(
+                "INSERT INTO postings (token, page_key, section_no, tf) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (token, page_key, section_no, tf)
+                    for token, section_no, tf in postings
+                ],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        print(
+            f"검색 색인 완료: {page_key} (섹션 {len(sections)}개, 토큰 {len(postings)}개, "
+            f"{(time.perf_counter() - started_at) * 1000:.1f}ms)"
+        )
+        return True
+
+    def _sections(self, snapshot: DocumentSnapshot) -> Iterable[Tuple[int, str, str]]:
+        """(섹션 번호, 이름, 본문) - 섹션이 없으면 전체 텍스트를 하나의 섹션으로"""
+        budget = self.max_index_chars
+        if not len(snapshot):
+            yield 0, FALLBACK_SECTION, snapshot.text[:budget]
+            return
+        for section_no, section in enumerate(snapshot.iter_sections()):
+            if budget <= 0:
+                return
+            # 줄바꿈 없이 정리된 본문은 헤더 줄 하나가 문서 전체인 경우도 있음
+            name = section.name[:budget]
+            budget -= len(name)
+            text = snapshot.text[
+                section.start : min(section.end, section.start + max(budget, 0))
+            ]
+            budget -= len(text)
+            yield section_no, name, text
+
+    async def search(
+        self, query: str, limit: int = 10, personas: Iterable[str] = ()
+    ) -> Dict[str, Any]:
+        """
+        검색어와 일치하는 페이지/섹션과 캐시된 페르소나별 요약 반환
+        순위: 일치한 검색 토큰 비율 → tf-idf 점수
+        """
+        started_at = time.perf_counter()
+        if not self.enabled:
+            return {"query": query, "total": 0, "results": [], "took_ms": 0.0}
+
+        total, results = await asyncio.to_thread(self._search, query, limit)
+        if self.cache_service and personas:
+            await asyncio.gather(
+                *(self._attach_summaries(result, personas) for result in results)
+            )
+        return {
+            "query": query,
+            "total": total,
+            "results": results,
+            "took_ms": round((time.perf_counter() - started_at) * 1000, 2),
+        }
+
+    def _search(self, query: str, limit: int) -> Tuple[int, List[Dict[str, Any]]]:
+        tokens = sorted(set(tokenize(query)))
+        if not tokens:
+            return 0, []
+
+        conn = self._connection()
+        section_count = conn.execute("SELECT COUNT(*) FROM sections").fetchone()[0]
+        placeholders = ",".join("?" * len(tokens))
+        rows = conn.execute(
+            "SELECT token, page_key, section_no, tf FROM postings "
+            f"WHERE token IN ({placeholders})",
+            tokens,
+        ).fetchall()
+
+        document_frequency = Counter(
+            token for token, _, section_no, _ in rows if section_no != TITLE_SECTION
+        )
+        page_tokens: Dict[str, set] = defaultdict(set)
+        page_scores: Dict[str, float] = defaultdict(float)
+        section_scores: Dict[str, Dict[int, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+        for token, page_key, section_no, tf in rows:
+            idf = math.log(1 + section_count / (1 + document_frequency[token]))
+            score = idf * (1 + math.log(tf))
+            if section_no == TITLE_SECTION:
+                score *= TITLE_WEIGHT
+            else:
+                section_scores[page_key][section_no] += score
+            page_tokens[page_key].add(token)
+            page_scores[page_key] += score
+
+        ranked = sorted(
+            page_scores,
+            key=lambda key: (len(page_tokens[key]), page_scores[key]),
+            reverse=True,
+        )[:limit]
+
+        results = []
+        for page_key in ranked:
+            page = conn.execute(
+                "SELECT page_id, url, title, version FROM pages WHERE page_key = ?",
+                (page_key,),
+            ).fetchone()
+            if page is None:
+                continue
+            best_sections = sorted(
+                (
+                    (score, section_no)
+                    for section_no, score in section_scores[page_key].items()
+                ),
+                reverse=True,
+            )[:3]
+            sections = []
+            for score, section_no in best_sections:
+                section = conn.execute(
+                    "SELECT name, snippet FROM sections "
+                    "WHERE page_key = ? AND section_no = ?",
+                    (page_key, section_no),
+                ).fetchone()
+                if section:
+                    sections.append(
+                        {
+                            "name": section[0],
+                            "snippet": section[1],
+                            "score": round(score, 3),
+                        }
+                    )
+            results.append(
+                {
+                    "page_id": page[0],
+                    "url": page[1],
+                    "title": page[2],
+                    "version": page[3],
+                    "score": round(page_scores[page_key], 3),
+                    "matched": round(len(page_tokens[page_key]) / len(tokens), 3),
+                    "sections": sections,
+                    "summaries": {},
+                }
+            )
+        return len(page_scores), results
+
+    async def _attach_summaries(
+        self, result: Dict[str, Any], personas: Iterable[str]
+    ) -> None:
+        """
+        요약 캐시에 남아 있는 이 페이지 버전의 페르소나별 요약 첨부
+        요약 요청이 아닌 탐색성 조회이므로 page_summary 히트율에 집계하지 않음
+        """
+        page_key = CacheService.page_key(result["url"], result["page_id"])
+        personas = list(personas)
+        summaries = await asyncio.gather(
+            *(
+                self.cache_service.get_json(
+                    "page_summary",
+                    CacheService.page_summary_key(page_key, result["version"], persona),
+                    record=False,
+                )
+                for persona in personas
+            )
+        )
+        for persona, cached in zip(personas, summaries):
+            if cached:
+                result["summaries"][persona] = cached["summary"]
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """색인 상태 (페이지/섹션/게시 목록 수, 파일 크기)"""
+        if not self.enabled:
+            return {"enabled": False}
+
+        def _stats():
+            conn = self._connection()
+            return {
+                "enabled": True,
+                "pages": conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0],
+                "sections": conn.execute("SELECT COUNT(*) FROM sections").fetchone()[0],
+                "postings": conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0],
+                # WAL 에 남아 있는 (체크포인트 전) 변경분 포함
+                "size_bytes": sum(
+                    os.path.getsize(path)
+                    for path in (self.db_path, self.db_path + "-wal")
+                    if os.path.exists(path)
+                ),
+            }
+
+        return await asyncio.to_thread(_stats)
+
+
+def _snippet(text: str) -> str:
+    text = " ".join(text.split())
+    if len(text) <= SNIPPET_CHARS:
+        return text
+    return text[:SNIPPET_CHARS].rstrip() + "…"
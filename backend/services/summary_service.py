@@ -0,0 +1,585 @@
+"""
+요약 서비스
+문서 조회 → 요약 생성 파이프라인과 검증 직후의 추측(speculative) 요약
+
+사용자는 대부분 지난번과 같은 페르소나를 고르므로, URL 검증이 성공하면
+예상 페르소나(클라이언트의 마지막 선택 → 페이지에서 가장 많이 선택된 것)로
+요약을 미리 생성해 두고 실제 /api/summarize 요청이 그 결과를 이어받습니다.
+
+추측 요약은 실제 요청을 굶기지 않도록 제한됩니다.
+- 동시 실행 수(SPECULATIVE_MAX_CONCURRENCY), 실제 요약 요청이 많으면 시작하지 않음
+- 시간당 Claude 호출 수 상한(SPECULATIVE_MAX_PER_HOUR) - 호출당 토큰이 제한되어 있어 비용 상한이 됨
+- 클라이언트가 다른 페르소나를 고르면 아무도 기다리지 않는 추측 요약은 취소
+- Claude/Confluence 호출은 background 우선순위로 대기 (실제 요청이 밀리면 대기 중에 취소됨)
+
+실제 요청은 SUMMARY_DEADLINE_SECONDS 데드라인 안에서 처리되며, 시간이 초과되면
+이전 버전 요약 → 문서 섹션 목차 → 안내 메시지 순으로 가능한 부분 결과를 반환합니다.
+
+SUMMARY_STALE_WHILE_REVALIDATE=true 이면 문서가 수정되었을 때 이전 버전 요약을 바로 반환하고
+(stale=True) 새 버전 요약은 백그라운드에서 만들어 다음 요청부터 제공합니다.
+Claude API 오류 시에도 Mock 요약 대신 이전 요약을 반환합니다.
+"""
+
+import asyncio
+import os
+import time
+from collections import Counter, OrderedDict, deque
+from typing import Any, Dict, Optional, Tuple
+
+from .cache_service import CacheService
+from .claude_service import ClaudeService, SummaryUnavailable
+from .confluence_service import ConfluenceService
+from .deadline import (
+    DeadlineExceeded,
+    default_deadline_seconds,
+    request_deadline,
+    within_deadline,
+    without_deadline,
+)
+from .document_snapshot import DocumentSnapshot
+from .json_stream import PageTooLarge
+from .metrics_service import (
+    record_deadline,
+    record_fallback,
+    record_speculation,
+    record_stale,
+)
+from .scheduler import (
+    Preempted,
+    create_joinable_task,
+    joining,
+    request_priority,
+)
+from .usage_service import track_usage
+
+SpeculationKey = Tuple[str, str]
+
+# 부분 결과 목차에 보여줄 최대 섹션 수 / 섹션별 미리보기 길이
+OUTLINE_SECTIONS = 20
+OUTLINE_PREVIEW_CHARS = 120
+
+
+class SummaryService:
+    def __init__(
+        self,
+        confluence_service: ConfluenceService,
+        claude_service: ClaudeService,
+        cache_service: Optional[CacheService] = None,
+    ):
+        self.confluence_service = confluence_service
+        self.claude_service = claude_service
+        self.cache_service = cache_service
+
+        self.speculation_enabled = (
+            os.getenv("SPECULATIVE_SUMMARY_ENABLED", "false").lower() == "true"
+        )
+        self.max_concurrency = int(os.getenv("SPECULATIVE_MAX_CONCURRENCY", "2"))
+        self.max_per_hour = int(os.getenv("SPECULATIVE_MAX_PER_HOUR", "60"))
+        self.max_active_requests = int(
+            os.getenv("SPECULATIVE_MAX_ACTIVE_REQUESTS", "8")
+        )
+        self.timeout = float(os.getenv("SPECULATIVE_TIMEOUT", "60"))
+        # 요청 전체 처리 시간 상한 (문서 조회/파싱/요약 단계가 남은 시간을 나눠 씀)
+        self.deadline_seconds = default_deadline_seconds()
+        # 문서 수정/API 오류 시 이전 요약을 먼저 반환하고 백그라운드에서 갱신
+        self.stale_while_revalidate = (
+            os.getenv("SUMMARY_STALE_WHILE_REVALIDATE", "false").lower() == "true"
+        )
+
+        self._active_requests = 0
+        self._pending = 0
+        self._spend_window = deque()
+        self._speculations: Dict[SpeculationKey, asyncio.Task] = {}
+        self._joiners: Counter = Counter()
+        self._client_speculation: Dict[str, SpeculationKey] = {}
+        self._completed: "OrderedDict[SpeculationKey, float]" = OrderedDict()
+        self._background_tasks = set()
+        self._revalidating: Dict[SpeculationKey, asyncio.Task] = {}
+
+    async def summarize(self, url: str, persona: str, client_id: str = "") -> dict:
+        """
+        요약 생성 - 같은 페이지/페르소나의 추측 요약이 진행 중이면 그 결과를 사용
+        데드라인을 넘기면 부분 결과 반환 (partial=True)
+        stale-while-revalidate 사용 시 문서가 수정되었으면 이전 요약 반환 (stale=True)
+        """
+        key = (self._page_key(url), persona)
+        if self.speculation_enabled:
+            self._cancel_client_speculation(client_id, keep=key)
+            self._spawn(self._remember_choice(client_id, key))
+
+        self._active_requests += 1
+        try:
+            with request_deadline(self.deadline_seconds):
+                try:
+                    if self.stale_while_revalidate:
+                        stale = await self._serve_stale(url, persona, key)
+                        if stale is not None:
+                            return stale
+
+                    task = self._speculations.get(key)
+                    if task is not None:
+                        result = await self._join(task, key)
+                        if result is not None:
+                            return {**result, "url": url}
+                    elif self._completed.pop(key, None):
+                        # 추측 요약 결과가 요약 캐시에 들어 있음
+                        record_speculation("hit")
+
+                    return await self._run(url, persona)
+                except DeadlineExceeded as e:
+                    return await self._partial_result(url, persona, e.stage)
+                except PageTooLarge as e:
+                    # Mock 요약 대신 요약할 수 없는 이유를 그대로 안내
+                    print(f"문서 크기 상한 초과로 요약 불가: {url}")
+                    return {
+                        "summary": f"## 📄 요약할 수 없는 문서\n{str(e)} "
+                        "문서를 나누거나 관리자에게 CONFLUENCE_MAX_RESPONSE_BYTES 조정을 요청해주세요.",
+                        "title": "",
+                        "url": url,
+                        "persona": persona,
+                        "too_large": True,
+                    }
+        finally:
+            self._active_requests -= 1
+
+    async def _join(self, task: asyncio.Task, key: SpeculationKey) -> Optional[dict]:
+        """
+        진행 중인 추측 요약 결과 대기 (추측이 취소/실패하면 None)
+        기다리는 동안 추측 요약은 이 요청의 우선순위(보통 interactive)로 올라감
+        """
+        record_speculation("joined")
+        self._joiners[key] += 1
+        try:
+            # 데드라인이 지나도 추측 요약은 계속 진행되어 캐시를 채움
+            with joining(task):
+                return await within_deadline(asyncio.shield(task), "speculation")
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                raise
+            return None
+        except (DeadlineExceeded, PageTooLarge):
+            raise
+        except Exception:
+            return None
+        finally:
+            self._joiners[key] -= 1
+            if self._joiners[key] <= 0:
+                del self._joiners[key]
+
+    async def _run(self, url: str, persona: str) -> dict:
+        """요약 파이프라인 실행 (문서 조회 → 요약 생성)"""
+        print(f"=== 요약 요청 시작 ===")
+        print(f"URL: {url}")
+        print(f"페르소나: {persona}")
+
+        # 1. Confluence 문서 콘텐츠 가져오기
+        print("1. Confluence 문서 콘텐츠 가져오기 시작...")
+        document_content = await self.confluence_service.get_document_content(url)
+        print(f"문서 제목: {document_content.get('title', '없음')}")
+        print(f"문서 내용 길이: {len(document_content.get('content', ''))}")
+
+        # 2. Claude AI로 페르소나별 요약 생성 (헤더 구조 활용)
+        print("2. Claude AI 요약 생성 시작...")
+        try:
+            summary = await self.claude_service.generate_summary(
+                content=document_content["content"],
+                persona=persona,
+                title=document_content.get("title", ""),
+                document_structure=document_content.get("snapshot"),
+                page_url=url,
+                fallback_to_mock=not self.stale_while_revalidate,
+            )
+        except DeadlineExceeded as e:
+            # 이미 가져온 문서 구조로 부분 결과 구성
+            return await self._partial_result(
+                url, persona, e.stage, document_content.get("snapshot")
+            )
+        except SummaryUnavailable as e:
+            # Claude 오류 - 이전 요약이 있으면 그것으로, 없으면 기존처럼 Mock 요약
+            snapshot = document_content.get("snapshot")
+            previous = await self._last_summary(self._page_key(url), persona)
+            if previous:
+                print(f"Claude 오류로 이전 요약 반환: {str(e)}")
+                return self._stale_result(
+                    url,
+                    persona,
+                    previous,
+                    "upstream_error",
+                    snapshot.version if snapshot else None,
+                )
+            record_fallback("claude", e.reason)
+            summary = self.claude_service._generate_mock_summary(
+                persona, document_content.get("title", "")
+            )
+        print(f"생성된 요약 길이: {len(summary)}")
+
+        # 문서 구조 정보 출력 (디버깅용)
+        snapshot = document_content.get("snapshot")
+        if snapshot is not None:
+            print(f"문서 섹션 수: {len(snapshot)}")
+            print(f"주요 섹션: {list(snapshot.names[:5])}")  # 처음 5개 섹션만 출력
+
+        result = {
+            "summary": summary,
+            "title": document_content.get("title", ""),
+            "url": url,
+            "persona": persona,
+        }
+        if document_content.get("truncated"):
+            # 응답 크기 상한에서 잘린 문서 - 뒷부분이 빠진 요약임을 알림
+            result["summary"] = (
+                "> ✂️ 문서가 너무 커서 앞부분만 요약했습니다. "
+                "뒷부분 내용은 요약에 포함되지 않았습니다.\n\n" + summary
+            )
+            result["truncated"] = True
+
+        print("=== 요약 요청 완료 ===")
+        return result
+
+    async def _partial_result(
+        self,
+        url: str,
+        persona: str,
+        stage: str,
+        snapshot: Optional[DocumentSnapshot] = None,
+    ) -> dict:
+        """
+        데드라인 초과 시 가능한 부분 결과
+        우선순위: 이 페이지/페르소나의 마지막 요약(이전 버전일 수 있음) → 섹션 목차 → 안내 메시지
+        """
+        print(f"요청 데드라인 초과 ({stage}) - 부분 결과 반환: {url}")
+        if snapshot is None:
+            snapshot = await self._cached_snapshot(url)
+        previous = await self._last_summary(self._page_key(url), persona)
+
+        seconds = f"{self.deadline_seconds:g}"
+        result = {
+            "title": snapshot.title if snapshot else "",
+            "url": url,
+            "persona": persona,
+            "partial": True,
+            "deadline_stage": stage,
+        }
+        if previous:
+            version = previous.get("version")
+            current = snapshot.version if snapshot else None
+            stale = current is None or version != current
+            notice = (
+                f"이전에 생성된 요약(버전 {version})을 보여드립니다."
+                if stale
+                else "이 버전에 대해 이전에 생성된 요약을 보여드립니다."
+            )
+            result.update(
+                summary=f"> ⏱️ {seconds}초 안에 새 요약을 완성하지 못해 {notice} "
+                "잠시 후 다시 시도하면 최신 요약을 받을 수 있습니다.\n\n"
+                + previous["summary"],
+                title=result["title"] or previous.get("title", ""),
+                partial_source="previous_summary",
+                summary_version=version,
+            )
+        elif snapshot is not None:
+            result.update(
+                summary=self._outline_summary(snapshot, seconds),
+                partial_source="outline",
+            )
+        else:
+            result.update(
+                summary=f"## ⏱️ 요약 준비 중\n{seconds}초 안에 문서를 가져오지 못했습니다. "
+                "잠시 후 다시 시도해주세요.",
+                partial_source="none",
+            )
+        record_deadline(stage, result["partial_source"])
+        return result
+
+    async def _serve_stale(
+        self, url: str, persona: str, key: SpeculationKey
+    ) -> Optional[dict]:
+        """
+        마지막 요약이 현재 문서 버전과 다르면 그 요약을 반환하고 백그라운드 갱신 시작
+        (같은 버전이거나 요약/버전 정보가 없으면 None - 일반 처리)
+        """
+        previous = await self._last_summary(self._page_key(url), persona)
+        if not previous:
+            return None
+        # 페이지 캐시는 TTL 동안 이전 버전일 수 있으므로 메타데이터(본문 제외)로 현재 버전 확인
+        info = await within_deadline(
+            self.confluence_service.get_page_info(url), "metadata"
+        )
+        version = info.get("version")
+        if info.get("status") != 200 or version is None:
+            return None
+        if previous.get("version") == version:
+            return None
+
+        print(
+            f"이전 버전 요약 반환 (버전 {previous.get('version')} → {version}), "
+            f"백그라운드 갱신: {url}"
+        )
+        self._revalidate(url, persona, key, version)
+        return self._stale_result(url, persona, previous, "version_changed", version)
+
+    def _revalidate(self, url: str, persona: str, key: SpeculationKey, version) -> None:
+        """새 버전 요약 백그라운드 생성 (같은 페이지/페르소나는 한 번만, 추측 요약 중이면 생략)"""
+        if key in self._revalidating or key in self._speculations:
+            return
+        task = asyncio.create_task(self._refresh(url, persona, key, version))
+        self._revalidating[key] = task
+
+        def _done(finished: asyncio.Task) -> None:
+            if self._revalidating.get(key) is finished:
+                del self._revalidating[key]
+
+        task.add_done_callback(_done)
+
+    async def _refresh(
+        self, url: str, persona: str, key: SpeculationKey, version
+    ) -> None:
+        # 요청 컨텍스트를 복사한 태스크이므로 요청 데드라인을 풀고 끝까지 진행
+        with without_deadline(), request_priority("background"):
+            try:
+                result, _ = await asyncio.wait_for(
+                    self.regenerate(url, persona, version), self.timeout
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"요약 갱신 오류: {str(e)}")
+                record_stale("refresh_failed")
+                return
+        record_stale("refresh_failed" if result.get("stale") else "refreshed")
+
+    async def regenerate(
+        self, url: str, persona: str, version: Any = None
+    ) -> Tuple[dict, int]:
+        """
+        요약 새로 생성 (stale 요약 갱신, 캐시 워머용 - 데드라인/우선순위는 호출한 쪽 컨텍스트)
+        version: 현재 문서 버전 - 캐시된 본문이 다른 버전이면 제거하고 다시 조회
+        반환: (결과, 이 생성에서 사용한 Claude 토큰 수)
+        """
+        page_key = self._page_key(url)
+        if self.cache_service and version is not None:
+            cached = await self.cache_service.get_json("page", page_key)
+            if cached and cached.get("version") != version:
+                await self.cache_service.delete("page", page_key)
+        with track_usage() as usage:
+            result = await self._run(url, persona)
+        return result, usage["tokens"]
+
+    def _stale_result(
+        self, url: str, persona: str, previous: dict, reason: str, current_version
+    ) -> dict:
+        """
+        이전 요약 응답 (stale=True)
+        reason: version_changed (문서 수정, 갱신 중) / upstream_error (Claude 오류)
+        """
+        version = previous.get("version")
+        if reason == "version_changed":
+            notice = (
+                f"> 🔄 문서가 수정되어(버전 {version} → {current_version}) "
+                "새 요약을 만드는 중입니다. 이전 버전 요약을 먼저 보여드립니다.\n\n"
+            )
+        else:
+            notice = (
+                "> ⚠️ 지금은 요약을 새로 만들 수 없어 "
+                f"이전에 생성된 요약(버전 {version})을 보여드립니다.\n\n"
+            )
+        record_stale(f"served_{reason}")
+        return {
+            "summary": notice + previous["summary"],
+            "title": previous.get("title", ""),
+            "url": url,
+            "persona": persona,
+            "stale": True,
+            "stale_reason": reason,
+            "summary_version": version,
+            "current_version": current_version,
+        }
+
+    async def _last_summary(self, page_key: str, persona: str) -> Optional[dict]:
+        """이 페이지/페르소나의 마지막 요약 (버전 무관, page_key: 호스트 + 페이지 ID)"""
+        if not self.cache_service or not page_key:
+            return None
+        return await self.cache_service.get_json(
+            "last_summary", CacheService.last_summary_key(page_key, persona)
+        )
+
+    async def _cached_snapshot(self, url: str) -> Optional[DocumentSnapshot]:
+        """페이지 캐시에 있는 문서 스냅샷 (공유 조회/추측 요약이 그 사이 채웠을 수 있음)"""
+        if not self.cache_service:
+            return None
+        cached = await self.cache_service.get_json("page", self._page_key(url))
+        if cached and "text" in cached:
+            return DocumentSnapshot.from_dict(cached)
+        return None
+
+    def _outline_summary(self, snapshot: DocumentSnapshot, seconds: str) -> str:
+        """문서 섹션 목차와 섹션별 앞부분 미리보기"""
+        lines = [
+            "## ⏱️ 요약 준비 중",
+            f"{seconds}초 안에 요약을 완성하지 못해 문서 구조를 먼저 보여드립니다. "
+            "잠시 후 다시 시도해주세요.",
+            "",
+            "## 📑 문서 구조",
+        ]
+        for section in snapshot.iter_sections(OUTLINE_SECTIONS):
+            preview = " ".join(section.head(OUTLINE_PREVIEW_CHARS).split())
+            # 줄바꿈 없이 정리된 본문은 헤더 줄 하나가 문서 전체일 수 있음
+            name = section.name[:OUTLINE_PREVIEW_CHARS]
+            lines.append(f"- **{name}**" + (f": {preview}" if preview else ""))
+        if len(snapshot) > OUTLINE_SECTIONS:
+            lines.append(f"- … 외 {len(snapshot) - OUTLINE_SECTIONS}개 섹션")
+        if not len(snapshot):
+            lines.append(snapshot.text[: OUTLINE_PREVIEW_CHARS * 3].strip())
+        return "\n".join(lines)
+
+    def speculate(self, url: str, client_id: str) -> bool:
+        """
+        URL 검증 성공 후 예상 페르소나로 요약을 백그라운드에서 시작
+        (제한에 걸리면 시작하지 않고 False 반환)
+        """
+        if not self.speculation_enabled or not self.claude_service.api_key:
+            return False
+
+        skip_reason = self._skip_reason()
+        if skip_reason:
+            record_speculation(skip_reason)
+            return False
+
+        self._pending += 1
+        self._spawn(self._speculate(url, client_id))
+        return True
+
+    def _spawn(self, coro) -> None:
+        """응답과 무관한 백그라운드 작업 (참조를 보관해 GC 로 사라지지 않게 함)"""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    def _skip_reason(self) -> Optional[str]:
+        running = len(self._speculations) + self._pending
+        if (
+            running >= self.max_concurrency
+            or self._active_requests >= self.max_active_requests
+        ):
+            return "skipped_busy"
+
+        cutoff = time.monotonic() - 3600
+        while self._spend_window and self._spend_window[0] < cutoff:
+            self._spend_window.popleft()
+        if len(self._spend_window) >= self.max_per_hour:
+            return "skipped_budget"
+        return None
+
+    async def _speculate(self, url: str, client_id: str) -> None:
+        page_key = self._page_key(url)
+        try:
+            persona = await self._predict_persona(client_id, page_key)
+        except Exception as e:
+            print(f"페르소나 예측 오류: {str(e)}")
+            persona = None
+        finally:
+            self._pending -= 1
+
+        if not persona:
+            record_speculation("skipped_no_history")
+            return
+        key = (page_key, persona)
+        if key in self._speculations:
+            return
+
+        print(f"추측 요약 시작 - 페르소나: {persona}, URL: {url}")
+        self._spend_window.append(time.monotonic())
+        record_speculation("started")
+        with request_priority("background"):
+            task = create_joinable_task(
+                asyncio.wait_for(self._run(url, persona), self.timeout)
+            )
+        self._speculations[key] = task
+        if client_id:
+            self._client_speculation[client_id] = key
+
+        try:
+            await task
+            self._completed[key] = time.monotonic()
+            while len(self._completed) > 1000:
+                self._completed.popitem(last=False)
+            record_speculation("completed")
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                task.cancel()
+                raise
+        except Preempted:
+            record_speculation("preempted")
+        except Exception as e:
+            print(f"추측 요약 오류: {str(e)}")
+            record_speculation("failed")
+        finally:
+            if self._speculations.get(key) is task:
+                del self._speculations[key]
+            if client_id and self._client_speculation.get(client_id) == key:
+                del self._client_speculation[client_id]
+
+    def _cancel_client_speculation(self, client_id: str, keep: SpeculationKey) -> None:
+        """클라이언트가 다른 페르소나를 골랐으면 아무도 기다리지 않는 추측 요약 취소"""
+        if not client_id:
+            return
+        key = self._client_speculation.get(client_id)
+        if key is None or key == keep or self._joiners.get(key):
+            return
+        task = self._speculations.get(key)
+        if task is not None and not task.done():
+            task.cancel()
+            record_speculation("cancelled")
+            print(f"추측 요약 취소 - 페르소나: {key[1]}")
+
+    async def _remember_choice(self, client_id: str, key: SpeculationKey) -> None:
+        """
+        클라이언트 마지막 선택과 페이지별 선택 횟수를 공유 캐시에 기록
+        (워커 간 동시 갱신 시 일부 횟수가 유실될 수 있으나 예측용이라 허용)
+        """
+        if not self.cache_service:
+            return
+        page_key, persona = key
+        if client_id:
+            await self.cache_service.set_json("persona", f"client:{client_id}", persona)
+        counts = await self.cache_service.get_json("persona", f"page:{page_key}") or {}
+        counts[persona] = counts.get(persona, 0) + 1
+        await self.cache_service.set_json("persona", f"page:{page_key}", counts)
+
+    async def _predict_persona(self, client_id: str, page_key: str) -> Optional[str]:
+        if not self.cache_service:
+            return None
+        if client_id:
+            persona = await self.cache_service.get_json(
+                "persona", f"client:{client_id}"
+            )
+            if persona in self.claude_service.persona_prompts:
+                return persona
+        counts = await self.cache_service.get_json("persona", f"page:{page_key}")
+        if counts:
+            persona = max(counts, key=counts.get)
+            if persona in self.claude_service.persona_prompts:
+                return persona
+        return None
+
+    def _page_key(self, url: str) -> str:
+        return self.confluence_service.page_key(url) or url
+
+    def memory_stats(self) -> Dict[str, int]:
+        """메모리 모니터용 진행 중 작업/추적 항목 수"""
+        return {
+            "speculations": len(self._speculations),
+            "revalidating": len(self._revalidating),
+            "background_tasks": len(self._background_tasks),
+            "client_speculations": len(self._client_speculation),
+            "completed_speculations": len(self._completed),
+        }
+
+    async def aclose(self) -> None:
+        """진행 중인 추측 요약/요약 갱신/백그라운드 작업 취소"""
+        for task in (
+            list(self._background_tasks)
+            + list(self._speculations.values())
+            + list(self._revalidating.values())
+        ):
+            task.cancel()
@@ -0,0 +1,323 @@
+"""
+사용량 서비스
+Claude API 토큰 사용량 및 비용 집계
+
+호출 1건마다 한 행을 SQLite(WAL, USAGE_DB_PATH)에 기록하고 조회 시 집계합니다.
+여러 uvicorn 워커가 같은 파일을 쓰므로 /api/usage 는 어느 워커가 응답해도 전체 사용량이며,
+워커가 재시작되어도 누적값이 유지됩니다.
+기록은 메모리에 모았다가 백그라운드 스레드에서 한 트랜잭션으로 반영합니다.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# 현재 컨텍스트에서 기록된 사용량 합계 (track_usage 안에서만 설정)
+_tracker: ContextVar[Optional[Dict[str, Any]]] = ContextVar(
+    "usage_tracker", default=None
+)
+
+
+class track_usage:
+    """
+    이 컨텍스트에서 발생한 Claude 호출 사용량 합산 (캐시 워머 토큰 예산 등)
+    같은 페이지의 다른 요청 사용량은 포함되지 않음
+
+    with track_usage() as usage:
+        await summary_service.summarize(url, persona)
+    usage["tokens"], usage["cost_usd"]
+    """
+
+    __slots__ = ("usage", "_token")
+
+    def __init__(self):
+        self.usage = {"requests": 0, "tokens": 0, "cost_usd": 0.0}
+        self._token = None
+
+    def __enter__(self) -> Dict[str, Any]:
+        self._token = _tracker.set(self.usage)
+        return self.usage
+
+    def __exit__(self, exc_type, exc, tb):
+        _tracker.reset(self._token)
+        return False
+
+
+USAGE_COLUMNS = (
+    "timestamp",
+    "model",
+    "persona",
+    "page_url",
+    "success",
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+    "cost_usd",
+    "latency_ms",
+    "pid",
+)
+
+# 집계 항목 (_empty_bucket 과 같은 이름)
+_BUCKET_SQL = """
+    COUNT(*) AS requests,
+    SUM(success = 0) AS failed_requests,
+    SUM(input_tokens) AS input_tokens,
+    SUM(output_tokens) AS output_tokens,
+    SUM(cache_creation_input_tokens) AS cache_creation_input_tokens,
+    SUM(cache_read_input_tokens) AS cache_read_input_tokens,
+    SUM(cost_usd) AS cost_usd,
+    SUM(latency_ms) AS latency_ms_total
+"""
+
+
+class UsageService:
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS usage (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT NOT NULL,
+        model TEXT NOT NULL,
+        persona TEXT NOT NULL,
+        page_url TEXT NOT NULL,
+        success INTEGER NOT NULL,
+        input_tokens INTEGER NOT NULL,
+        output_tokens INTEGER NOT NULL,
+        cache_creation_input_tokens INTEGER NOT NULL,
+        cache_read_input_tokens INTEGER NOT NULL,
+        cost_usd REAL NOT NULL,
+        latency_ms REAL NOT NULL,
+        pid INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_usage_timestamp ON usage (timestamp);
+    """
+
+    # 모델별 단가 (USD / 100만 토큰)
+    MODEL_PRICING = {
+        "claude-3-haiku-20240307": {
+            "input": 0.25,
+            "output": 1.25,
+            "cache_write": 0.30,
+            "cache_read": 0.03,
+        },
+        "claude-3-5-haiku-20241022": {
+            "input": 0.80,
+            "output": 4.00,
+            "cache_write": 1.00,
+            "cache_read": 0.08,
+        },
+        "claude-3-5-sonnet-20241022": {
+            "input": 3.00,
+            "output": 15.00,
+            "cache_write": 3.75,
+            "cache_read": 0.30,
+        },
+    }
+
+    def __init__(self, db_path: Optional[str] = None, recent_limit: int = 10):
+        self.db_path = db_path or os.getenv("USAGE_DB_PATH", "usage_data.db")
+        self.recent_limit = recent_limit
+        # 아직 SQLite 에 반영하지 않은 기록
+        self._pending: List[Dict[str, Any]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._local = threading.local()
+        self._connection().executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """스레드별 연결 (sqlite3 연결은 스레드 간 공유 불가)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def _empty_bucket(self) -> Dict[str, Any]:
+        return {
+            "requests": 0,
+            "failed_requests": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+            "cost_usd": 0.0,
+            "latency_ms_total": 0.0,
+        }
+
+    def calculate_cost(self, model: str, usage: Dict[str, Any]) -> float:
+        """토큰 사용량 기반 비용 계산 (USD)"""
+        pricing = self.MODEL_PRICING.get(model)
+        if not pricing:
+            return 0.0
+
+        cost = (
+            usage.get("input_tokens", 0) * pricing["input"]
+            + usage.get("output_tokens", 0) * pricing["output"]
+            + usage.get("cache_creation_input_tokens", 0) * pricing["cache_write"]
+            + usage.get("cache_read_input_tokens", 0) * pricing["cache_read"]
+        )
+        return cost / 1_000_000
+
+    def record_usage(
+        self,
+        model: str,
+        persona: str,
+        page_url: str,
+        usage: Optional[Dict[str, Any]],
+        latency_ms: float,
+        success: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Claude API 호출 1건의 사용량 기록 (SQLite 반영은 백그라운드)
+        """
+        usage = usage or {}
+        entry = {
+            "model": model,
+            "persona": persona,
+            "page_url": page_url or "",
+            "success": success,
+            "input_tokens": usage.get("input_tokens", 0) or 0,
+            "output_tokens": usage.get("output_tokens", 0) or 0,
+            "cache_creation_input_tokens": usage.get("cache_creation_input_tokens", 0)
+            or 0,
+            "cache_read_input_tokens": usage.get("cache_read_input_tokens", 0) or 0,
+            "latency_ms": round(latency_ms, 1),
+            "timestamp": datetime.now().isoformat(),
+        }
+        entry["cost_usd"] = self.calculate_cost(model, entry)
+        self._pending.append(entry)
+        self._schedule_flush()
+
+        tracked = _tracker.get()
+        if tracked is not None:
+            tracked["requests"] += 1
+            tracked["tokens"] += (
+                entry["input_tokens"]
+                + entry["output_tokens"]
+                + entry["cache_creation_input_tokens"]
+                + entry["cache_read_input_tokens"]
+            )
+            tracked["cost_usd"] += entry["cost_usd"]
+        return entry
+
+    def _schedule_flush(self) -> None:
+        """백그라운드 반영 시작 (이미 진행 중이면 그 작업이 이어서 반영)"""
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 이벤트 루프 밖 - 다음 조회/종료 시 반영
+            return
+        self._flush_task = loop.create_task(self._flush())
+
+    async def _flush(self) -> None:
+        while self._pending:
+            rows, self._pending = self._pending, []
+            try:
+                await asyncio.to_thread(self._insert, rows)
+            except Exception as e:
+                print(f"사용량 저장 오류: {str(e)}")
+
+    async def flush(self) -> None:
+        """모아 둔 기록을 모두 SQLite 에 반영"""
+        task = self._flush_task
+        if task is not None and not task.done():
+            await asyncio.shield(task)
+        await self._flush()
+
+    def _insert(self, entries: List[Dict[str, Any]]) -> None:
+        pid = os.getpid()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                f"INSERT INTO usage ({', '.join(USAGE_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in USAGE_COLUMNS)})",
+                [
+                    tuple(
+                        pid if column == "pid" else entry[column]
+                        for column in USAGE_COLUMNS
+                    )
+                    for entry in entries
+                ],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    async def aclose(self) -> None:
+        """남은 기록 반영"""
+        try:
+            await self.flush()
+        except Exception as e:
+            print(f"사용량 저장 오류: {str(e)}")
+
+    def _format_bucket(self, bucket: Dict[str, Any]) -> Dict[str, Any]:
+        bucket = {
+            key: bucket.get(key) or empty for key, empty in self._empty_bucket().items()
+        }
+        requests = bucket["requests"]
+        formatted = {k: v for k, v in bucket.items() if k != "latency_ms_total"}
+        formatted["cost_usd"] = round(bucket["cost_usd"], 6)
+        formatted["avg_latency_ms"] = (
+            round(bucket["latency_ms_total"] / requests, 1) if requests else 0
+        )
+        return formatted
+
+    async def get_usage_stats(self) -> Dict[str, Any]:
+        """
+        토큰 사용량 통계 조회 (모든 워커의 기록 기준)
+        """
+        try:
+            await self.flush()
+            stats = await asyncio.to_thread(self._load_stats)
+            stats["last_updated"] = datetime.now().isoformat()
+            return stats
+        except Exception as e:
+            raise Exception(f"사용량 통계 조회 실패: {str(e)}")
+
+    def _load_stats(self) -> Dict[str, Any]:
+        """전체/페르소나/페이지/일/모델별 집계와 최근 기록 (한 읽기 트랜잭션에서 일관되게)"""
+        conn = self._connection()
+        groups = {
+            "by_persona": "persona",
+            "by_page": "CASE page_url WHEN '' THEN 'unknown' ELSE page_url END",
+            "by_day": "substr(timestamp, 1, 10)",
+            "by_model": "model",
+        }
+        conn.execute("BEGIN")
+        try:
+            stats: Dict[str, Any] = {
+                "totals": self._format_bucket(
+                    dict(conn.execute(f"SELECT {_BUCKET_SQL} FROM usage").fetchone())
+                )
+            }
+            for name, key in groups.items():
+                stats[name] = {
+                    row["key"]: self._format_bucket(dict(row))
+                    for row in conn.execute(
+                        f"SELECT {key} AS key, {_BUCKET_SQL} FROM usage GROUP BY 1"
+                    )
+                }
+            stats["recent_usage"] = [
+                {**dict(row), "success": bool(row["success"])}
+                for row in conn.execute(
+                    f"SELECT {', '.join(USAGE_COLUMNS)} FROM usage "
+                    "ORDER BY seq DESC LIMIT ?",
+                    (self.recent_limit,),
+                )
+            ]
+        finally:
+            conn.execute("COMMIT")
+        return stats
+
+    def memory_stats(self) -> Dict[str, int]:
+        """메모리 모니터용 - SQLite 에 아직 반영하지 않은 기록 수"""
+        return {"pending": len(self._pending)}
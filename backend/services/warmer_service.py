@@ -0,0 +1,463 @@
+"""
+캐시 워머 서비스
+요청 이력에서 자주 요청되는 (페이지, 페르소나) 조합을 골라, 한가한 시간대(off-peak)에
+Confluence 버전을 다시 확인하고 오래된 요약을 미리 다시 생성해 둡니다.
+출근 시간대 요청이 따뜻한 캐시를 만나도록 하기 위함입니다.
+
+- 요청 이력: /api/summarize 요청을 메모리에 모았다가 주기적으로 SQLite 에 반영
+  (워커 간 공유, 점수는 반감기(WARMER_HALF_LIFE_HOURS) 기반으로 감쇠)
+- 실행 시간대: WARMER_WINDOWS (예: "01:00-05:00,13:00-13:30", 서버 로컬 시각, 자정 넘김 가능)
+- 워커가 여러 개여도 시간대마다 한 번만 실행 (runs 테이블에 시간대 키를 먼저 기록한 워커가 실행)
+- 실행당 토큰 예산(WARMER_TOKEN_BUDGET), 동시 실행 수(WARMER_CONCURRENCY) 제한
+- Claude/Confluence 호출은 background 우선순위 (실제 요청이 몰리면 대기 중인 워밍은 건너뜀)
+- 실행 결과(워밍/최신/실패/건너뜀)는 runs 테이블에 저장하고 /api/warmer 로 조회
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from .cache_service import CacheService
+from .claude_service import ClaudeService
+from .confluence_service import ConfluenceService
+from .metrics_service import record_warm
+from .scheduler import Preempted, request_priority
+from .summary_service import SummaryService
+
+Window = Tuple[int, int]  # (시작 분, 종료 분) - 자정 기준 분
+
+
+def parse_windows(value: str) -> List[Window]:
+    """ "01:00-05:00,22:30-23:00" → [(60, 300), (1350, 1380)]"""
+    windows = []
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, end = part.split("-")
+        windows.append((_minutes(start), _minutes(end)))
+    return windows
+
+
+def _minutes(value: str) -> int:
+    hour, minute = value.strip().split(":")
+    return int(hour) * 60 + int(minute)
+
+
+def current_window(
+    windows: List[Window], now: datetime
+) -> Optional[Tuple[str, datetime]]:
+    """now 가 속한 시간대의 (키, 종료 시각), 시간대 밖이면 None"""
+    minute = now.hour * 60 + now.minute
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    for start, end in windows:
+        if start < end:
+            if not start <= minute < end:
+                continue
+            day = midnight
+        elif minute >= start:
+            day = midnight
+        elif minute < end:
+            # 자정을 넘기는 시간대의 다음 날 부분
+            day = midnight - timedelta(days=1)
+        else:
+            continue
+        started_at = day + timedelta(minutes=start)
+        ends_at = day + timedelta(minutes=end if start < end else end + 24 * 60)
+        return started_at.strftime("%Y-%m-%dT%H:%M"), ends_at
+    return None
+
+
+class WarmerService:
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS request_history (
+        page_key TEXT NOT NULL,
+        persona TEXT NOT NULL,
+        url TEXT NOT NULL,
+        score REAL NOT NULL,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (page_key, persona)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS runs (
+        window_key TEXT PRIMARY KEY,
+        pid INTEGER NOT NULL,
+        started_at TEXT NOT NULL,
+        finished_at TEXT,
+        report TEXT
+    );
+    """
+
+    def __init__(
+        self,
+        confluence_service: ConfluenceService,
+        claude_service: ClaudeService,
+        summary_service: SummaryService,
+        cache_service: Optional[CacheService] = None,
+    ):
+        self.confluence_service = confluence_service
+        self.claude_service = claude_service
+        self.summary_service = summary_service
+        self.cache_service = cache_service
+
+        self.enabled = os.getenv("WARMER_ENABLED", "false").lower() == "true"
+        self.db_path = os.getenv("WARMER_DB_PATH", "warmer_data.db")
+        self.windows_spec = os.getenv("WARMER_WINDOWS", "02:00-05:00")
+        self.windows = parse_windows(self.windows_spec)
+        self.check_interval = float(os.getenv("WARMER_CHECK_INTERVAL", "60"))
+        self.token_budget = int(os.getenv("WARMER_TOKEN_BUDGET", "200000"))
+        self.concurrency = int(os.getenv("WARMER_CONCURRENCY", "2"))
+        self.max_pairs = int(os.getenv("WARMER_MAX_PAIRS", "50"))
+        self.min_score = float(os.getenv("WARMER_MIN_SCORE", "2"))
+        self.half_life_s = float(os.getenv("WARMER_HALF_LIFE_HOURS", "72")) * 3600
+        # 첫 작업의 사용량을 알기 전 요약 1건의 토큰 추정치 (입력 + 최대 출력)
+        self.estimated_tokens = int(os.getenv("WARMER_ESTIMATED_TOKENS", "4000"))
+        # 반영 전 요청 이력이 이 개수를 넘으면 주기를 기다리지 않고 바로 반영
+        self.max_pending = int(os.getenv("WARMER_MAX_PENDING", "10000"))
+
+        # 아직 SQLite 에 반영하지 않은 요청 수와 URL (키: (page_key, persona))
+        self._pending: Counter = Counter()
+        self._pending_urls: Dict[Tuple[str, str], str] = {}
+        self._local = threading.local()
+        self._task: Optional[asyncio.Task] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._connection().executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """스레드별 연결 (sqlite3 연결은 스레드 간 공유 불가)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def start(self) -> None:
+        """스케줄러 시작 (WARMER_ENABLED=true 일 때만)"""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+            print(f"캐시 워머 스케줄러 시작 - 시간대: {self.windows_spec}")
+
+    async def aclose(self) -> None:
+        """스케줄러 중지 및 남은 요청 이력 반영"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        if self._flush_task is not None:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        await self.flush_history()
+
+    def record_request(self, url: str, persona: str) -> None:
+        """
+        요약 요청 이력 기록 (메모리에만 모아 두고 주기적으로 반영)
+        워머를 쓰지 않으면 반영할 루프가 없으므로 기록하지 않음
+        """
+        if not self.enabled:
+            return
+        page_key = self.confluence_service.page_key(url)
+        if not page_key:
+            # Confluence 페이지가 아닌 URL 은 워밍 대상이 아님
+            return
+        key = (page_key, persona)
+        self._pending[key] += 1
+        self._pending_urls[key] = url
+        if len(self._pending) >= self.max_pending and (
+            self._flush_task is None or self._flush_task.done()
+        ):
+            self._flush_task = asyncio.create_task(self.flush_history())
+
+    async def flush_history(self) -> None:
+        if not self._pending:
+            return
+        pending, urls = self._pending, self._pending_urls
+        self._pending, self._pending_urls = Counter(), {}
+        try:
+            await asyncio.to_thread(self._flush, pending, urls)
+        except Exception as e:
+            print(f"요청 이력 저장 오류: {str(e)}")
+
+    def _flush(self, pending: Counter, urls: Dict[Tuple[str, str], str]) -> None:
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for (page_key, persona), count in pending.items():
+                row = conn.execute(
+                    "SELECT score, updated_at FROM request_history "
+                    "WHERE page_key = ? AND persona = ?",
+                    (page_key, persona),
+                ).fetchone()
+                score = self._decayed(row[0], row[1], now) if row else 0.0
+                conn.execute(
+                    "INSERT OR REPLACE INTO request_history "
+                    "(page_key, persona, url, score, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (page_key, persona, urls[(page_key, persona)], score + count, now),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _decayed(self, score: float, updated_at: float, now: float) -> float:
+        return score * 0.5 ** (max(now - updated_at, 0) / self.half_life_s)
+
+    def _top_pairs(self, limit: int) -> List[Dict[str, Any]]:
+        """감쇠 점수 기준 상위 (페이지, 페르소나) 조합"""
+        now = time.time()
+        rows = (
+            self._connection()
+            .execute(
+                "SELECT page_key, persona, url, score, updated_at FROM request_history"
+            )
+            .fetchall()
+        )
+        pairs = [
+            {
+                "page_key": page_key,
+                "persona": persona,
+                "url": url,
+                "score": round(self._decayed(score, updated_at, now), 3),
+            }
+            for page_key, persona, url, score, updated_at in rows
+        ]
+        pairs = [pair for pair in pairs if pair["score"] >= self.min_score]
+        pairs.sort(key=lambda pair: pair["score"], reverse=True)
+        return pairs[:limit]
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                await self.flush_history()
+                window = current_window(self.windows, datetime.now())
+                if window is None:
+                    continue
+                window_key, ends_at = window
+                if await asyncio.to_thread(self._claim, window_key):
+                    await self.run_once(window_key, ends_at)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"캐시 워머 오류: {str(e)}")
+
+    def _claim(self, window_key: str) -> bool:
+        """이 시간대의 실행권 획득 (먼저 기록한 워커만 True)"""
+        cursor = self._connection().execute(
+            "INSERT OR IGNORE INTO runs (window_key, pid, started_at) VALUES (?, ?, ?)",
+            (window_key, os.getpid(), datetime.now().isoformat()),
+        )
+        return cursor.rowcount == 1
+
+    async def run_once(
+        self, window_key: Optional[str] = None, ends_at: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        상위 조합의 Confluence 버전을 확인하고 오래된 요약 재생성
+        시간대가 끝나거나 토큰 예산이 소진되면 남은 작업은 건너뜀
+        """
+        window_key = (
+            window_key or f"manual:{datetime.now().isoformat(timespec='seconds')}"
+        )
+        report: Dict[str, Any] = {
+            "window": window_key,
+            "started_at": datetime.now().isoformat(),
+            "token_budget": self.token_budget,
+            "tokens_spent": 0,
+            "candidates": 0,
+            "warmed": [],
+            "fresh": [],
+            "failed": [],
+            "skipped": [],
+        }
+        if not self.claude_service.api_key or not self.confluence_service.auth_header:
+            report["skipped_reason"] = "not_configured"
+        else:
+            await self.flush_history()
+            pairs = await asyncio.to_thread(self._top_pairs, self.max_pairs)
+            report["candidates"] = len(pairs)
+            print(f"캐시 워밍 시작 - 시간대: {window_key}, 대상 {len(pairs)}건")
+
+            pages: Dict[str, Dict[str, Any]] = {}
+            for pair in pairs:
+                page = pages.setdefault(
+                    pair["page_key"], {"url": pair["url"], "personas": []}
+                )
+                page["personas"].append(pair["persona"])
+
+            semaphore = asyncio.Semaphore(self.concurrency)
+            budget = {"spent": 0, "reserved": 0, "samples": []}
+            with request_priority("background"):
+                await asyncio.gather(
+                    *(
+                        self._warm_page(
+                            page_key, page, semaphore, budget, report, ends_at
+                        )
+                        for page_key, page in pages.items()
+                    )
+                )
+            report["tokens_spent"] = budget["spent"]
+
+        report["finished_at"] = datetime.now().isoformat()
+        print(
+            f"캐시 워밍 완료 - 워밍 {len(report['warmed'])}건, 최신 {len(report['fresh'])}건, "
+            f"실패 {len(report['failed'])}건, 건너뜀 {len(report['skipped'])}건, "
+            f"토큰 {report['tokens_spent']}"
+        )
+        try:
+            await asyncio.to_thread(self._save_report, window_key, report)
+        except Exception as e:
+            print(f"워밍 결과 저장 오류: {str(e)}")
+        return report
+
+    async def _warm_page(
+        self,
+        page_key: str,
+        page: Dict[str, Any],
+        semaphore: asyncio.Semaphore,
+        budget: Dict[str, Any],
+        report: Dict[str, Any],
+        ends_at: Optional[datetime],
+    ) -> None:
+        url = page["url"]
+
+        def _result(kind: str, persona: str, **extra) -> None:
+            report[kind].append({"url": url, "persona": persona, **extra})
+            record_warm(kind if kind != "skipped" else f"skipped_{extra['reason']}")
+
+        async with semaphore:
+            if ends_at is not None and datetime.now() >= ends_at:
+                for persona in page["personas"]:
+                    _result("skipped", persona, reason="window_closed")
+                return
+
+            try:
+                info = await self.confluence_service.get_page_info(url)
+            except Preempted:
+                for persona in page["personas"]:
+                    _result("skipped", persona, reason="preempted")
+                return
+            if info.get("status") != 200:
+                for persona in page["personas"]:
+                    _result("failed", persona, reason=f"status_{info.get('status')}")
+                return
+            version = info.get("version")
+
+            stale = []
+            for persona in page["personas"]:
+                if await self._has_summary(page_key, version, persona):
+                    _result("fresh", persona, version=version)
+                else:
+                    stale.append(persona)
+            if not stale:
+                return
+
+            for persona in stale:
+                estimate = self._estimate(budget)
+                if budget["spent"] + budget["reserved"] + estimate > self.token_budget:
+                    _result("skipped", persona, reason="budget")
+                    continue
+                if ends_at is not None and datetime.now() >= ends_at:
+                    _result("skipped", persona, reason="window_closed")
+                    continue
+
+                budget["reserved"] += estimate
+                try:
+                    # 캐시된 본문이 이전 버전이면 다시 조회, 사용량은 이 생성분만 집계
+                    _, used = await self.summary_service.regenerate(
+                        url, persona, version
+                    )
+                except Preempted:
+                    _result("skipped", persona, reason="preempted")
+                    continue
+                except Exception as e:
+                    _result("failed", persona, reason=str(e))
+                    continue
+                finally:
+                    budget["reserved"] -= estimate
+                budget["spent"] += used
+                if used:
+                    budget["samples"].append(used)
+
+                if await self._has_summary(page_key, version, persona):
+                    _result("warmed", persona, version=version, tokens=used)
+                else:
+                    # Mock 요약으로 폴백한 경우 (API 오류 등) 캐시에 남지 않음
+                    _result("failed", persona, reason="not_cached")
+
+    async def _has_summary(self, page_key: str, version: Any, persona: str) -> bool:
+        if not self.cache_service or version is None:
+            return False
+        cached = await self.cache_service.get_json(
+            "page_summary", CacheService.page_summary_key(page_key, version, persona)
+        )
+        return bool(cached)
+
+    def _estimate(self, budget: Dict[str, Any]) -> int:
+        """요약 1건 토큰 추정치 (이번 실행에서 관측한 평균, 없으면 설정값)"""
+        samples = budget["samples"]
+        if samples:
+            return int(sum(samples) / len(samples))
+        return self.estimated_tokens
+
+    def _save_report(self, window_key: str, report: Dict[str, Any]) -> None:
+        self._connection().execute(
+            "INSERT INTO runs (window_key, pid, started_at, finished_at, report) "
+            "VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(window_key) DO UPDATE SET "
+            "finished_at = excluded.finished_at, report = excluded.report",
+            (
+                window_key,
+                os.getpid(),
+                report["started_at"],
+                report["finished_at"],
+                json.dumps(report, ensure_ascii=False),
+            ),
+        )
+
+    async def get_report(self, limit: int = 5) -> Dict[str, Any]:
+        """워머 설정, 현재 상위 조합, 최근 실행 결과"""
+
+        def _load():
+            rows = (
+                self._connection()
+                .execute(
+                    "SELECT window_key, pid, started_at, finished_at, report FROM runs "
+                    "ORDER BY started_at DESC LIMIT ?",
+                    (limit,),
+                )
+                .fetchall()
+            )
+            runs = []
+            for window_key, pid, started_at, finished_at, report in rows:
+                if report:
+                    runs.append(json.loads(report))
+                else:
+                    # 다른 워커가 실행 중이거나 실행 도중 종료됨
+                    runs.append(
+                        {"window": window_key, "pid": pid, "started_at": started_at}
+                    )
+            return runs, self._top_pairs(10)
+
+        await self.flush_history()
+        runs, top = await asyncio.to_thread(_load)
+        window = current_window(self.windows, datetime.now())
+        return {
+            "enabled": self.enabled,
+            "windows": self.windows_spec,
+            "in_window": window is not None,
+            "token_budget": self.token_budget,
+            "concurrency": self.concurrency,
+            "top_pairs": top,
+            "runs": runs,
+        }
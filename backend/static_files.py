@@ -0,0 +1,104 @@
+"""
+React 빌드 정적 파일 서빙
+- 빌드 시 생성된 .br / .gz 파일을 Accept-Encoding 에 맞춰 그대로 전송 (요청마다 압축하지 않음)
+- 해시가 붙은 자산은 immutable 장기 캐시, index.html 등은 ETag 재검증(no-cache)
+- ETag / Last-Modified 기반 304 응답
+- 서버가 http.response.pathsend 확장을 지원하면 FileResponse 가 파일 경로만 넘겨
+  커널 sendfile 로 전송 (이벤트 루프에서 파일 내용을 읽지 않음)
+"""
+
+import mimetypes
+import os
+import re
+
+from responses import accepted_encodings
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+# 선호 순서대로 (Content-Encoding, 파일 확장자)
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# CRA 빌드 결과의 해시 파일명 (예: main.3f9a1c2b.js, 453.8c1d2e3f.chunk.css)
+HASHED_ASSET_PATTERN = re.compile(r"\.[0-9a-f]{8,}\.(chunk\.)?[a-z0-9]+$")
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    빌드 타임에 미리 압축된 파일을 우선 제공하는 StaticFiles
+
+    react-app/scripts/precompress.js 가 `npm run build` 후 (postbuild)
+    각 텍스트 자산 옆에 .br / .gz 파일을 생성합니다.
+    """
+
+    def __init__(self, *args, immutable: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        # True 면 디렉터리 내 모든 파일을 해시 자산으로 취급 (예: build/static)
+        self.immutable = immutable
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        media_type = mimetypes.guess_type(full_path)[0] or "text/plain"
+        headers = {"Cache-Control": self._cache_control(full_path)}
+
+        encoding, path, stat = self._select_variant(
+            full_path, stat_result, request_headers
+        )
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        if encoding or self._has_variants(full_path):
+            headers["Vary"] = "Accept-Encoding"
+
+        # 압축본 stat 기준으로 ETag 가 생성되므로 인코딩별 ETag 가 서로 다름
+        response = FileResponse(
+            path,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+            stat_result=stat,
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    def _select_variant(self, full_path: str, stat_result, request_headers: Headers):
+        """클라이언트가 허용하는 압축본이 있으면 (인코딩, 경로, stat) 반환"""
+        # Range 요청은 원본 바이트 기준이어야 하므로 압축본을 쓰지 않음
+        if "range" in request_headers:
+            return None, full_path, stat_result
+
+        suffixes = dict(PRECOMPRESSED_ENCODINGS)
+        # API 응답 압축과 같은 협상 규칙 (q 값 순서, 같으면 br > gzip)
+        for encoding in accepted_encodings(
+            request_headers.get("accept-encoding", ""), list(suffixes)
+        ):
+            suffix = suffixes[encoding]
+            try:
+                variant_stat = os.stat(full_path + suffix)
+            except OSError:
+                continue
+            # 원본보다 오래된 압축본은 빌드가 꼬인 것이므로 무시
+            if variant_stat.st_mtime >= stat_result.st_mtime:
+                return encoding, full_path + suffix, variant_stat
+        return None, full_path, stat_result
+
+    def _has_variants(self, full_path: str) -> bool:
+        return any(
+            os.path.exists(full_path + suffix) for _, suffix in PRECOMPRESSED_ENCODINGS
+        )
+
+    def _cache_control(self, full_path: str) -> str:
+        if self.immutable or HASHED_ASSET_PATTERN.search(os.path.basename(full_path)):
+            return IMMUTABLE_CACHE_CONTROL
+        return REVALIDATE_CACHE_CONTROL
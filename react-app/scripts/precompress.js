@@ -0,0 +1,67 @@
+/*
+ * 빌드 결과 사전 압축 스크립트 (npm run build 후 postbuild 로 실행)
+ *
+ * build/ 아래 텍스트 자산마다 최고 압축률의 .br / .gz 파일을 생성합니다.
+ * 백엔드(PrecompressedStaticFiles)는 Accept-Encoding 에 맞춰 이 파일을 그대로 전송하므로
+ * 요청마다 압축하는 비용이 없습니다.
+ *
+ * 사용법: node scripts/precompress.js [빌드 디렉터리]
+ */
+const fs = require('fs');
+const path = require('path');
+const zlib = require('zlib');
+
+const COMPRESSIBLE = new Set(['.js', '.css', '.html', '.json', '.svg', '.txt', '.map', '.ico']);
+const MIN_SIZE = 1024;
+
+function walk(dir) {
+  return fs.readdirSync(dir, { withFileTypes: true }).flatMap((entry) => {
+    const fullPath = path.join(dir, entry.name);
+    return entry.isDirectory() ? walk(fullPath) : [fullPath];
+  });
+}
+
+function writeIfSmaller(filePath, original, compressed) {
+  // 압축 효과가 없으면 만들지 않음 (서버는 원본을 전송)
+  if (compressed.length < original.length) {
+    fs.writeFileSync(filePath, compressed);
+    return compressed.length;
+  }
+  return null;
+}
+
+function main() {
+  const buildDir = path.resolve(process.argv[2] || 'build');
+  let originalTotal = 0;
+  let brotliTotal = 0;
+  let count = 0;
+
+  for (const filePath of walk(buildDir)) {
+    if (!COMPRESSIBLE.has(path.extname(filePath))) continue;
+    const original = fs.readFileSync(filePath);
+    if (original.length < MIN_SIZE) continue;
+
+    writeIfSmaller(`${filePath}.gz`, original, zlib.gzipSync(original, { level: 9 }));
+    const brotliSize = writeIfSmaller(
+      `${filePath}.br`,
+      original,
+      zlib.brotliCompressSync(original, {
+        params: {
+          [zlib.constants.BROTLI_PARAM_QUALITY]: zlib.constants.BROTLI_MAX_QUALITY,
+          [zlib.constants.BROTLI_PARAM_SIZE_HINT]: original.length,
+        },
+      }),
+    );
+
+    originalTotal += original.length;
+    brotliTotal += brotliSize || original.length;
+    count += 1;
+  }
+
+  console.log(
+    `사전 압축 완료: ${count}개 파일, ${(originalTotal / 1024).toFixed(1)}KB -> ` +
+      `${(brotliTotal / 1024).toFixed(1)}KB (brotli)`,
+  );
+}
+
+main();
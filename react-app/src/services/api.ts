@@ -21,6 +21,17 @@ export interface SummaryResponse {
   title: string;
   url: string;
   persona: string;
+  // 요청 데드라인 초과 시 부분 결과 (이전 요약 / 문서 구조 / 안내 메시지)
+  partial?: boolean;
+  partial_source?: 'previous_summary' | 'outline' | 'none';
+  summary_version?: number;
+  // stale-while-revalidate: 문서 수정(갱신 중) 또는 Claude 오류로 이전 요약 반환
+  stale?: boolean;
+  stale_reason?: 'version_changed' | 'upstream_error';
+  current_version?: number;
+  // 문서가 응답 크기 상한을 넘어 앞부분만 요약(truncated) / 요약 거부(too_large)
+  truncated?: boolean;
+  too_large?: boolean;
 }
 
 export interface FeedbackResponse {